@@ -6,12 +6,16 @@ Create engaging educational videos with kids and teacher voices
 
 import cv2
 import numpy as np
-import soundfile as sf
 from pathlib import Path
 import random
 import math
-import subprocess
 import os
+from collection_runner import CollectionRunner, RenderJob, DONE, SKIPPED, estimate_frames
+from layer_compositor import TileGridLayer
+from video_writer import FFmpegVideoWriter
+from text_cache import TextStampCache
+from audio_probe import probe_audio
+from letter_timing import LetterTimeline
 
 class ABCVideoGenerator:
     """Generate educational ABC videos with kids and teacher voices"""
@@ -25,6 +29,7 @@ class ABCVideoGenerator:
         self.width = 1920
         self.height = 1080
         self.fps = 30
+        self.text = TextStampCache()
         
         # Colors (BGR format for OpenCV)
         self.colors = {
@@ -44,6 +49,13 @@ class ABCVideoGenerator:
         # Letter positions for alphabet display
         self.letter_positions = self._generate_letter_positions()
         
+        # Cached alphabet grid: tiles rasterised once per state
+        self.grid_layer = TileGridLayer(
+            self._draw_grid_tile,
+            [self.letter_positions[letter] for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"],
+            tile_radius=100
+        )
+        
         # ABC song lyrics for different styles
         self.lyrics_database = {
             'abc_real_girl_singing.wav': [
@@ -146,28 +158,28 @@ class ABCVideoGenerator:
         title_thickness = 8
         
         # Get text size for centering
-        (text_width, text_height), _ = cv2.getTextSize(title, font, title_size, title_thickness)
+        (text_width, text_height), _ = self.text.get_text_size(title, font, title_size, title_thickness)
         title_x = (self.width - text_width) // 2
         title_y = 100
         
         # Draw title shadow
-        cv2.putText(frame, title, (title_x + 5, title_y + 5), font, title_size, 
-                   (50, 50, 50), title_thickness)
+        self.text.put_text(frame, title, (title_x + 5, title_y + 5), font, title_size, 
+                          (50, 50, 50), title_thickness)
         
         # Draw main title with gradient effect
-        cv2.putText(frame, title, (title_x, title_y), font, title_size, 
-                   self.colors['primary'], title_thickness)
+        self.text.put_text(frame, title, (title_x, title_y), font, title_size, 
+                          self.colors['primary'], title_thickness)
         
         # Subtitle
         if subtitle:
             subtitle_size = 1.5
             subtitle_thickness = 3
-            (sub_width, sub_height), _ = cv2.getTextSize(subtitle, font, subtitle_size, subtitle_thickness)
+            (sub_width, sub_height), _ = self.text.get_text_size(subtitle, font, subtitle_size, subtitle_thickness)
             sub_x = (self.width - sub_width) // 2
             sub_y = title_y + 80
             
-            cv2.putText(frame, subtitle, (sub_x, sub_y), font, subtitle_size, 
-                       self.colors['secondary'], subtitle_thickness)
+            self.text.put_text(frame, subtitle, (sub_x, sub_y), font, subtitle_size, 
+                              self.colors['secondary'], subtitle_thickness)
         
         return frame
     
@@ -191,39 +203,38 @@ class ABCVideoGenerator:
         font_size = 3.0
         font_thickness = 8
         
-        (text_width, text_height), _ = cv2.getTextSize(letter, font, font_size, font_thickness)
+        (text_width, text_height), _ = self.text.get_text_size(letter, font, font_size, font_thickness)
         text_x = x - text_width // 2
         text_y = y + text_height // 2
         
-        cv2.putText(frame, letter, (text_x, text_y), font, font_size, color, font_thickness)
+        self.text.put_text(frame, letter, (text_x, text_y), font, font_size, color, font_thickness)
         
         return frame
     
+    def _draw_grid_tile(self, canvas, index, state, x, y):
+        """Draw one alphabet grid letter in state 'current', 'done' or 'pending'"""
+        color = {
+            'current': self.colors['red'],   # Current letter being taught
+            'done': self.colors['green'],    # Letter has been "learned"
+            'pending': self.colors['text']   # Not yet learned
+        }[state]
+        letter = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[index]
+        self.draw_letter(canvas, letter, x, y, size=60, color=color, highlight=(state == 'current'))
+    
     def draw_alphabet_grid(self, frame, current_letter=None, progress=0):
-        """Draw the full alphabet in a grid"""
-        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        """Draw the full alphabet in a grid
         
-        for i, letter in enumerate(letters):
-            if letter in self.letter_positions:
-                x, y = self.letter_positions[letter]
-                
-                # Determine if this letter should be highlighted
-                highlight = (letter == current_letter)
-                
-                # Add animation based on progress
-                if progress > i / len(letters):
-                    # Letter has been "learned"
-                    color = self.colors['green']
-                elif letter == current_letter:
-                    # Current letter being taught
-                    color = self.colors['red']
-                else:
-                    # Not yet learned
-                    color = self.colors['text']
-                
-                self.draw_letter(frame, letter, x, y, size=60, color=color, highlight=highlight)
-        
-        return frame
+        The grid comes from a cached layer that is only re-composited when a
+        letter changes state.
+        """
+        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        states = tuple(
+            'current' if letter == current_letter
+            else 'done' if progress > i / len(letters)
+            else 'pending'
+            for i, letter in enumerate(letters)
+        )
+        return self.grid_layer.blit(frame, states)
     
     def draw_lyrics(self, frame, lyrics, progress):
         """Draw current lyrics on screen with karaoke-style highlighting"""
@@ -260,17 +271,17 @@ class ABCVideoGenerator:
         font_size = 1.5
         font_thickness = 3
         
-        (text_width, text_height), _ = cv2.getTextSize(current_line, font, font_size, font_thickness)
+        (text_width, text_height), _ = self.text.get_text_size(current_line, font, font_size, font_thickness)
         text_x = (self.width - text_width) // 2
         text_y = lyrics_y
         
         # Draw text shadow
-        cv2.putText(frame, current_line, (text_x + 3, text_y + 3), font, font_size, 
-                   (0, 0, 0), font_thickness)
+        self.text.put_text(frame, current_line, (text_x + 3, text_y + 3), font, font_size, 
+                          (0, 0, 0), font_thickness)
         
         # Draw main text
-        cv2.putText(frame, current_line, (text_x, text_y), font, font_size, 
-                   self.colors['white'], font_thickness)
+        self.text.put_text(frame, current_line, (text_x, text_y), font, font_size, 
+                          self.colors['white'], font_thickness)
         
         # Show next line preview if available
         if current_line_index + 1 < len(lines):
@@ -278,12 +289,12 @@ class ABCVideoGenerator:
             if next_line:
                 font_size_small = 1.0
                 font_thickness_small = 2
-                (next_width, next_height), _ = cv2.getTextSize(next_line, font, font_size_small, font_thickness_small)
+                (next_width, next_height), _ = self.text.get_text_size(next_line, font, font_size_small, font_thickness_small)
                 next_x = (self.width - next_width) // 2
                 next_y = text_y + 50
                 
-                cv2.putText(frame, next_line, (next_x, next_y), font, font_size_small, 
-                           self.colors['secondary'], font_thickness_small)
+                self.text.put_text(frame, next_line, (next_x, next_y), font, font_size_small, 
+                                  self.colors['secondary'], font_thickness_small)
         
         return frame
     
@@ -314,11 +325,10 @@ class ABCVideoGenerator:
         print(f"🎥 Creating ABC Video: {title}")
         print(f"🎵 Audio: {audio_file}")
         
-        # Load audio to get duration
+        # Duration from the audio headers (no decoding)
         try:
-            audio_data, sample_rate = sf.read(audio_file)
             if duration is None:
-                duration = len(audio_data) / sample_rate
+                duration = probe_audio(audio_file).duration
         except Exception as e:
             print(f"❌ Error loading audio: {e}")
             duration = 30  # Default duration
@@ -329,126 +339,106 @@ class ABCVideoGenerator:
         audio_filename = Path(audio_file).name
         lyrics = self.lyrics_database.get(audio_filename, [])
         
-        # Video setup
+        # Video setup: frames and audio are encoded together in a single ffmpeg pass
         video_path = self.output_dir / f"{output_name}.mp4"
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(str(video_path), fourcc, self.fps, (self.width, self.height))
+        final_video_path = self.output_dir / f"{output_name}_with_audio.mp4"
         
         total_frames = int(duration * self.fps)
         letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
         
+        # Letter onsets detected once over the whole file
+        try:
+            timeline = LetterTimeline.from_file(audio_file)
+        except Exception as e:
+            print(f"⚠️ Letter detection failed ({e}); spacing letters evenly")
+            timeline = LetterTimeline.evenly_spaced(duration)
+        print(f"🔤 Letter timing: {'detected from audio' if timeline.detected else 'evenly spaced'}")
+        
         print(f"🎬 Generating {total_frames} frames...")
         
-        for frame_num in range(total_frames):
-            # Create base frame
-            frame = self.create_background_frame()
-            
-            # Calculate progress
-            progress = frame_num / total_frames
-            
-            # Determine current letter being highlighted
-            letter_index = int(progress * len(letters)) % len(letters)
-            current_letter = letters[letter_index]
-            
-            # Draw title (first 3 seconds)
-            if frame_num < self.fps * 3:
-                frame = self.draw_title(frame, "🎵 ABC Learning Song 🎵", title)
-            else:
-                # Draw smaller title at top
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                title_text = f"🎵 {title}"
-                title_size = 1.2
-                title_thickness = 3
-                (title_width, title_height), _ = cv2.getTextSize(title_text, font, title_size, title_thickness)
-                title_x = (self.width - title_width) // 2
-                title_y = 50
+        with FFmpegVideoWriter(final_video_path, self.width, self.height, self.fps,
+                               audio_path=audio_file, fallback_path=video_path) as writer:
+            for frame_num in range(total_frames):
+                # Create base frame
+                frame = self.create_background_frame()
                 
-                cv2.putText(frame, title_text, (title_x, title_y), font, title_size, 
-                           self.colors['primary'], title_thickness)
-            
-            # Draw alphabet grid
-            frame = self.draw_alphabet_grid(frame, current_letter, progress)
-            
-            # Draw floating elements
-            frame = self.draw_floating_elements(frame, frame_num)
-            
-            # Add current letter display (large) - after title phase
-            if frame_num >= self.fps * 3:
-                center_x, center_y = self.width // 2, 400
-                self.draw_letter(frame, current_letter, center_x, center_y, size=120, 
-                               color=self.colors['primary'], highlight=True)
+                # Calculate progress
+                progress = frame_num / total_frames
                 
-                # Add "Current Letter" text
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                text = f"Learning Letter: {current_letter}"
-                text_size = 1.8
-                text_thickness = 4
-                (text_width, text_height), _ = cv2.getTextSize(text, font, text_size, text_thickness)
-                text_x = (self.width - text_width) // 2
-                text_y = center_y - 150
+                # Determine current letter being highlighted (the last one stays lit after the song)
+                letters_spoken = timeline.letters_spoken(frame_num / self.fps)
+                current_letter = letters[min(letters_spoken, len(letters) - 1)]
                 
-                cv2.putText(frame, text, (text_x, text_y), font, text_size, 
-                           self.colors['secondary'], text_thickness)
-            
-            # Draw lyrics (after title phase)
-            if frame_num >= self.fps * 3 and lyrics:
-                # Adjust progress for lyrics (starts after title)
-                lyrics_progress = (frame_num - self.fps * 3) / (total_frames - self.fps * 3)
-                frame = self.draw_lyrics(frame, lyrics, lyrics_progress)
-            
-            # Add progress indicator
-            progress_width = int(progress * (self.width - 100))
-            cv2.rectangle(frame, (50, self.height - 30), (50 + progress_width, self.height - 10), 
-                         self.colors['accent'], -1)
-            cv2.rectangle(frame, (50, self.height - 30), (self.width - 50, self.height - 10), 
-                         self.colors['text'], 2)
-            
-            # Write frame
-            video_writer.write(frame)
-            
-            # Progress indicator
-            if frame_num % (self.fps * 2) == 0:
-                print(f"📹 Progress: {progress*100:.1f}% ({frame_num}/{total_frames} frames)")
-        
-        video_writer.release()
-        print(f"✅ Video created: {video_path}")
-        
-        # Combine video with audio using ffmpeg
-        final_video_path = self.output_dir / f"{output_name}_with_audio.mp4"
-        
-        try:
-            cmd = [
-                'ffmpeg', '-y',  # -y to overwrite output files
-                '-i', str(video_path),  # Video input
-                '-i', str(audio_file),  # Audio input
-                '-c:v', 'libx264',      # Video codec
-                '-c:a', 'aac',          # Audio codec
-                '-shortest',            # Finish when shortest input ends
-                str(final_video_path)
-            ]
-            
-            print("🎬 Combining video with audio...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"✅ Final video with audio: {final_video_path}")
-                # Remove temporary video without audio
-                video_path.unlink()
-                return final_video_path
-            else:
-                print(f"❌ FFmpeg error: {result.stderr}")
-                print(f"📁 Video without audio saved as: {video_path}")
-                return video_path
+                # Draw title (first 3 seconds)
+                if frame_num < self.fps * 3:
+                    frame = self.draw_title(frame, "🎵 ABC Learning Song 🎵", title)
+                else:
+                    # Draw smaller title at top
+                    font = cv2.FONT_HERSHEY_SIMPLEX
+                    title_text = f"🎵 {title}"
+                    title_size = 1.2
+                    title_thickness = 3
+                    (title_width, title_height), _ = self.text.get_text_size(title_text, font, title_size, title_thickness)
+                    title_x = (self.width - title_width) // 2
+                    title_y = 50
+                    
+                    self.text.put_text(frame, title_text, (title_x, title_y), font, title_size, 
+                                      self.colors['primary'], title_thickness)
+                
+                # Draw alphabet grid
+                frame = self.draw_alphabet_grid(frame, current_letter, letters_spoken / len(letters))
                 
-        except FileNotFoundError:
-            print("⚠️  FFmpeg not found. Video created without audio.")
-            print(f"📁 Video file: {video_path}")
+                # Draw floating elements
+                frame = self.draw_floating_elements(frame, frame_num)
+                
+                # Add current letter display (large) - after title phase
+                if frame_num >= self.fps * 3:
+                    center_x, center_y = self.width // 2, 400
+                    self.draw_letter(frame, current_letter, center_x, center_y, size=120, 
+                                   color=self.colors['primary'], highlight=True)
+                    
+                    # Add "Current Letter" text
+                    font = cv2.FONT_HERSHEY_SIMPLEX
+                    text = f"Learning Letter: {current_letter}"
+                    text_size = 1.8
+                    text_thickness = 4
+                    (text_width, text_height), _ = self.text.get_text_size(text, font, text_size, text_thickness)
+                    text_x = (self.width - text_width) // 2
+                    text_y = center_y - 150
+                    
+                    self.text.put_text(frame, text, (text_x, text_y), font, text_size, 
+                                      self.colors['secondary'], text_thickness)
+                
+                # Draw lyrics (after title phase)
+                if frame_num >= self.fps * 3 and lyrics:
+                    # Adjust progress for lyrics (starts after title)
+                    lyrics_progress = (frame_num - self.fps * 3) / (total_frames - self.fps * 3)
+                    frame = self.draw_lyrics(frame, lyrics, lyrics_progress)
+                
+                # Add progress indicator
+                progress_width = int(progress * (self.width - 100))
+                cv2.rectangle(frame, (50, self.height - 30), (50 + progress_width, self.height - 10), 
+                             self.colors['accent'], -1)
+                cv2.rectangle(frame, (50, self.height - 30), (self.width - 50, self.height - 10), 
+                             self.colors['text'], 2)
+                
+                # Write frame
+                writer.write(frame)
+                
+                # Progress indicator
+                if frame_num % (self.fps * 2) == 0:
+                    print(f"📹 Progress: {progress*100:.1f}% ({frame_num}/{total_frames} frames)")
+        
+        if writer.has_audio:
+            print(f"✅ Final video with audio: {writer.path}")
+        else:
+            print(f"📁 Video file: {writer.path}")
             print(f"🎵 Audio file: {audio_file}")
             print("💡 You can combine them manually with video editing software.")
-            return video_path
+        return writer.path
     
-    def create_video_collection(self):
-        """Create a collection of ABC videos with different voices"""
+    def create_video_collection(self, max_workers=None):
+        """Create a collection of ABC videos with different voices (rendered in parallel)"""
         
         print("🎥 ABC Video Generator - Kids & Teacher Edition")
         print("=" * 60)
@@ -493,30 +483,34 @@ class ABCVideoGenerator:
             }
         ]
         
-        created_videos = []
-        
+        queued = []
         for video_info in videos:
             audio_path = self.audio_dir / video_info['audio']
             
             if audio_path.exists():
-                print(f"\n🎬 Creating video: {video_info['title']}")
-                print(f"📝 {video_info['description']}")
-                
-                video_path = self.create_abc_video(
-                    audio_path,
-                    video_info['title'],
-                    video_info['output']
+                print(f"🎬 Queued: {video_info['title']} - {video_info['description']}")
+                job = RenderJob(
+                    title=video_info['title'],
+                    method='create_abc_video',
+                    args=(audio_path, video_info['title'], video_info['output']),
+                    output_path=self.output_dir / f"{video_info['output']}_with_audio.mp4",
+                    inputs=(audio_path,),
+                    estimated_frames=estimate_frames(audio_path, self.fps)
                 )
-                
-                created_videos.append({
-                    'title': video_info['title'],
-                    'description': video_info['description'],
-                    'file': video_path,
-                    'audio_source': video_info['audio']
-                })
+                queued.append((video_info, job))
             else:
                 print(f"❌ Audio file not found: {audio_path}")
         
+        # Render the collection across worker processes
+        CollectionRunner(self, max_workers=max_workers).run([job for _, job in queued])
+        
+        created_videos = [{
+            'title': video_info['title'],
+            'description': video_info['description'],
+            'file': Path(job.result),
+            'audio_source': video_info['audio']
+        } for video_info, job in queued if job.status in (DONE, SKIPPED)]
+        
         print("\n🎉 ABC Video Collection Complete!")
         print("=" * 60)
         print(f"✅ Created {len(created_videos)} educational videos")
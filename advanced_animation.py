@@ -13,12 +13,21 @@ Features:
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFilter
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple, Union
 import math
-import random
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 
+# Column order of CompiledAnimation.expression
+EXPRESSION_FEATURES = ('mouth_curve', 'eye_opening', 'eyebrow_height', 'cheek_raise')
+
+# Character sprite canvas and the point in it that maps to the keyframe position
+SPRITE_SIZE = (240, 216)
+SPRITE_ANCHOR = (120, 66)
+# Where animation sequences place the character before their motion offsets
+CHARACTER_BASE_POSITION = (200, 200)
+
 class AnimationType(Enum):
     IDLE = "idle"
     WALKING = "walking"
@@ -43,6 +52,54 @@ class AnimationKeyframe:
     scale: float = 1.0
     alpha: float = 1.0
 
+class CompiledAnimation(Sequence):
+    """
+    Structure-of-arrays animation track.
+
+    All per-frame values live in float32 NumPy columns computed in one
+    vectorised pass; ``AnimationKeyframe`` objects are only built when a
+    frame is indexed, so existing list-style callers keep working.
+    """
+    
+    def __init__(self, frame_numbers: np.ndarray, positions: np.ndarray, rotation: np.ndarray,
+                 scale: np.ndarray, alpha: np.ndarray, expression: np.ndarray,
+                 hand_positions: np.ndarray, gesture_intensity: np.ndarray):
+        self.frame_numbers = frame_numbers          # (N,) int32
+        self.positions = positions                  # (N, 2) float32
+        self.rotation = rotation                    # (N,) float32
+        self.scale = scale                          # (N,) float32
+        self.alpha = alpha                          # (N,) float32
+        self.expression = expression                # (N, len(EXPRESSION_FEATURES)) float32
+        self.hand_positions = hand_positions        # (N, 2) float32
+        self.gesture_intensity = gesture_intensity  # (N,) float32
+    
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+    
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.keyframe(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("animation frame index out of range")
+        return self.keyframe(index)
+    
+    def keyframe(self, i: int) -> AnimationKeyframe:
+        """Materialise the dataclass view of frame ``i``."""
+        x, y = self.positions[i]
+        hand_x, hand_y = self.hand_positions[i]
+        return AnimationKeyframe(
+            frame_number=int(self.frame_numbers[i]),
+            character_position=(float(x), float(y)),
+            character_rotation=float(self.rotation[i]),
+            facial_expression=dict(zip(EXPRESSION_FEATURES, self.expression[i].tolist())),
+            gesture_state={'hand_position': (float(hand_x), float(hand_y)),
+                           'intensity': float(self.gesture_intensity[i])},
+            scale=float(self.scale[i]),
+            alpha=float(self.alpha[i])
+        )
+
 @dataclass
 class CharacterRig:
     """Character rigging for advanced animation."""
@@ -52,11 +109,191 @@ class CharacterRig:
     right_arm: List[Tuple[int, int]]
     facial_landmarks: Dict[str, Tuple[int, int]]
 
+def _particle_stamp(shape: str, radius: int) -> np.ndarray:
+    """Precomputed float32 alpha mask of side 2 * radius + 1 for one particle shape."""
+    coords = np.arange(-radius, radius + 1, dtype=np.float32) / max(radius, 1)
+    x, y = np.meshgrid(coords, coords)
+    if shape == 'star':
+        # Four-pointed sparkle: thin cross arms plus a soft core
+        arms = np.maximum(np.clip(1 - np.abs(x) * 4, 0, 1) * (1 - np.abs(y)),
+                          np.clip(1 - np.abs(y) * 4, 0, 1) * (1 - np.abs(x)))
+        core = np.clip(1 - np.hypot(x, y) * 2, 0, 1)
+        alpha = np.maximum(arms, core)
+    elif shape == 'heart':
+        # Implicit heart curve, flipped so the point faces down
+        hx, hy = x * 1.25, -y * 1.25 + 0.25
+        alpha = ((hx * hx + hy * hy - 1) ** 3 - hx * hx * hy ** 3 <= 0).astype(np.float32)
+    else:  # 'disc'
+        alpha = np.clip((1 - np.hypot(x, y)) * radius, 0, 1)
+    return alpha.astype(np.float32)
+
+class ParticleSystem:
+    """
+    Persistent particle emitter with vectorised physics and rasterisation.
+    
+    Particle state lives in fixed-capacity NumPy arrays; each frame integrates
+    all live particles at once and splats them with precomputed alpha stamps
+    accumulated through np.bincount.
+    """
+    
+    # Emitter presets: shape, colours, spawn spread, velocity, life and size range
+    PRESETS = {
+        'sparkles': {
+            'shape': 'star', 'colors': [(255, 255, 0), (255, 255, 200), (255, 255, 255)],
+            'count': 10, 'spread': 50.0, 'velocity': (0.0, -10.0), 'jitter': 20.0,
+            'gravity': 0.0, 'life': 0.6, 'radius': (2, 6), 'swirl': 0.0
+        },
+        'magic': {
+            'shape': 'disc', 'colors': [(255, 0, 255), (0, 255, 255), (255, 255, 0), (255, 0, 0)],
+            'count': 15, 'spread': 30.0, 'velocity': (0.0, 0.0), 'jitter': 10.0,
+            'gravity': 0.0, 'life': 1.2, 'radius': (3, 8), 'swirl': 60.0
+        },
+        'emotion_burst': {
+            'shape': 'heart', 'colors': [(255, 0, 0), (255, 60, 90)],
+            'count': 8, 'spread': 40.0, 'velocity': (0.0, -40.0), 'jitter': 15.0,
+            'gravity': -10.0, 'life': 1.0, 'radius': (5, 8), 'swirl': 0.0
+        }
+    }
+    
+    def __init__(self, effect_type: str, capacity: int = 4096, seed: Optional[int] = None):
+        self.preset = self.PRESETS[effect_type]
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)       # Seconds remaining, <= 0 is dead
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.float32)
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.center = np.zeros((capacity, 2), dtype=np.float32)  # Swirl origin per particle
+        self._emit_remainder = 0.0
+        self._started = False  # The first step emits a full burst instead of a trickle
+        low, high = self.preset['radius']
+        self.stamps = {r: _particle_stamp(self.preset['shape'], r) for r in range(low, high + 1)}
+    
+    @property
+    def alive(self) -> np.ndarray:
+        return self.life > 0
+    
+    def emit(self, center: Tuple[float, float], count: int):
+        """Spawn up to ``count`` particles into free slots."""
+        free = np.flatnonzero(self.life <= 0)[:count]
+        n = len(free)
+        if n == 0:
+            return
+        p = self.preset
+        rng = self.rng
+        offsets = rng.uniform(-p['spread'], p['spread'], size=(n, 2)).astype(np.float32)
+        self.position[free] = np.asarray(center, dtype=np.float32) + offsets
+        self.velocity[free] = np.asarray(p['velocity'], dtype=np.float32) + \
+            rng.normal(0.0, p['jitter'], size=(n, 2)).astype(np.float32)
+        life = p['life'] * rng.uniform(0.7, 1.3, size=n).astype(np.float32)
+        self.life[free] = life
+        self.max_life[free] = life
+        palette = np.asarray(p['colors'], dtype=np.float32)
+        self.color[free] = palette[rng.integers(0, len(palette), size=n)]
+        self.radius[free] = rng.integers(p['radius'][0], p['radius'][1] + 1, size=n)
+        self.center[free] = center
+    
+    def update(self, dt: float):
+        """Integrate every live particle by ``dt`` seconds."""
+        alive = self.alive
+        if not alive.any():
+            return
+        p = self.preset
+        if p['swirl']:
+            # Tangential velocity around the emitter centre
+            rel = self.position[alive] - self.center[alive]
+            dist = np.maximum(np.hypot(rel[:, 0], rel[:, 1]), 1.0)[:, None]
+            tangent = np.stack([-rel[:, 1], rel[:, 0]], axis=1) / dist
+            self.position[alive] += tangent * (p['swirl'] * dt)
+        self.velocity[alive, 1] += p['gravity'] * dt
+        self.position[alive] += self.velocity[alive] * dt
+        self.life[alive] -= dt
+    
+    def render(self, frame: np.ndarray) -> np.ndarray:
+        """Alpha-blend all live particles into an (H, W, 3) uint8 frame in place."""
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return frame
+        height, width = frame.shape[:2]
+        fade = np.clip(self.life[idx] / self.max_life[idx], 0.0, 1.0)
+        centers = np.rint(self.position[idx]).astype(np.int64)
+        radii = self.radius[idx]
+        max_r = int(radii.max())
+        
+        # Work only inside the bounding box of all stamps
+        x0 = max(0, int(centers[:, 0].min()) - max_r)
+        y0 = max(0, int(centers[:, 1].min()) - max_r)
+        x1 = min(width, int(centers[:, 0].max()) + max_r + 1)
+        y1 = min(height, int(centers[:, 1].max()) + max_r + 1)
+        if x0 >= x1 or y0 >= y1:
+            return frame
+        box_w, box_h = x1 - x0, y1 - y0
+        pixels = box_w * box_h
+        acc_alpha = np.zeros(pixels, dtype=np.float64)
+        acc_color = np.zeros((3, pixels), dtype=np.float64)
+        
+        for r, stamp in self.stamps.items():
+            bucket = radii == r
+            if not bucket.any():
+                continue
+            side = 2 * r + 1
+            dy, dx = np.divmod(np.arange(side * side), side)
+            xs = centers[bucket, 0:1] - r + dx - x0        # (k, side*side)
+            ys = centers[bucket, 1:2] - r + dy - y0
+            weights = fade[bucket, None] * stamp.ravel()[None, :]
+            inside = (xs >= 0) & (xs < box_w) & (ys >= 0) & (ys < box_h) & (weights > 0)
+            flat = (ys * box_w + xs)[inside]
+            w = weights[inside]
+            acc_alpha += np.bincount(flat, weights=w, minlength=pixels)
+            colors = np.broadcast_to(self.color[idx][bucket][:, None, :], inside.shape + (3,))[inside]
+            for c in range(3):
+                acc_color[c] += np.bincount(flat, weights=w * colors[:, c], minlength=pixels)
+        
+        alpha = np.clip(acc_alpha, 0.0, 1.0).reshape(box_h, box_w, 1)
+        color = (acc_color / np.maximum(acc_alpha, 1e-6)).T.reshape(box_h, box_w, 3)
+        region = frame[y0:y1, x0:x1].astype(np.float32)
+        frame[y0:y1, x0:x1] = np.clip(region * (1 - alpha) + color * alpha, 0, 255).astype(np.uint8)
+        return frame
+    
+    def step(self, frame: Optional[np.ndarray], center: Tuple[float, float], intensity: float,
+             dt: float, fps: float) -> Optional[np.ndarray]:
+        """Emit, integrate and draw one frame (``frame=None`` only simulates)."""
+        if not self._started:
+            # Start with the steady-state population so the effect is visible on its first frame
+            self._started = True
+            count = int(round(self.preset['count'] * intensity))
+        else:
+            # Emit at a rate that keeps about ``count * intensity`` particles alive
+            life_frames = max(1.0, self.preset['life'] * fps)
+            self._emit_remainder += self.preset['count'] * intensity / life_frames * (dt * fps)
+            count = int(self._emit_remainder)
+            self._emit_remainder -= count
+        self.update(dt)
+        self.emit(center, count)
+        return self.render(frame) if frame is not None else frame
+
 class AdvancedAnimationEngine:
     """Advanced animation system for character movements and expressions."""
     
-    def __init__(self):
-        self.animation_cache = {}
+    def __init__(self, sprite_cache_size: int = 256, expression_resolution: float = 0.05,
+                 gesture_resolution: float = 0.05):
+        """
+        Args:
+            sprite_cache_size: Maximum number of rendered character sprites kept
+            expression_resolution: Quantisation step for expression features
+            gesture_resolution: Quantisation step for hand position and intensity
+        """
+        # LRU of rendered RGBA character sprites keyed by quantised pose
+        self.animation_cache: OrderedDict = OrderedDict()
+        self.sprite_cache_size = sprite_cache_size
+        self.expression_resolution = expression_resolution
+        self.gesture_resolution = gesture_resolution
+        self.sprite_cache_hits = 0
+        self.sprite_cache_misses = 0
+        # Persistent particle emitters keyed by effect type
+        self.particle_systems: Dict[str, ParticleSystem] = {}
         self.expression_templates = self._create_expression_templates()
         self.gesture_patterns = self._create_gesture_patterns()
         self.physics_enabled = True
@@ -175,25 +412,73 @@ class AdvancedAnimationEngine:
     def create_animation_sequence(self, animation_type: AnimationType, 
                                 duration_frames: int, 
                                 character_info: Dict,
-                                emotion: str = 'neutral') -> List[AnimationKeyframe]:
-        """Create a sequence of animation keyframes."""
-        keyframes = []
-        
-        for frame in range(duration_frames):
-            progress = frame / duration_frames
-            
-            keyframe = self._generate_keyframe(
-                frame, progress, animation_type, character_info, emotion
-            )
-            keyframes.append(keyframe)
+                                emotion: str = 'neutral') -> CompiledAnimation:
+        """Create a sequence of animation keyframes.
         
-        return keyframes
+        Returns a CompiledAnimation: indexing it yields AnimationKeyframe
+        objects, while renderers can read its NumPy columns directly.
+        """
+        return self.compile_animation_sequence(animation_type, duration_frames, emotion)
+    
+    def compile_animation_sequence(self, animation_type: AnimationType, duration_frames: int,
+                                   emotion: str = 'neutral') -> CompiledAnimation:
+        """Compute every keyframe of a sequence at once with vectorised NumPy.
+        
+        Matches _generate_keyframe frame for frame (up to float32 precision).
+        """
+        n = max(0, duration_frames)
+        progress = np.arange(n, dtype=np.float64) / max(1, n)
+        phase = progress * math.pi
+        base_x, base_y = CHARACTER_BASE_POSITION
+        
+        # Animation-specific positioning
+        if animation_type == AnimationType.WALKING:
+            x_offset = np.sin(phase * 4) * 10
+            y_offset = np.abs(np.sin(phase * 8)) * 5
+        elif animation_type == AnimationType.TALKING:
+            x_offset = np.sin(phase * 6) * 3
+            y_offset = np.cos(phase * 4) * 2
+        elif animation_type == AnimationType.GESTURING:
+            x_offset = np.sin(phase * 3) * 8
+            y_offset = np.cos(phase * 2) * 4
+        else:  # IDLE or other: subtle breathing
+            x_offset = np.zeros(n)
+            y_offset = np.sin(phase * 2) * 2
+        positions = np.stack([base_x + x_offset, base_y + y_offset], axis=1).astype(np.float32)
+        
+        # Facial expression: template plus shared sinusoidal variation
+        template = self.expression_templates.get(emotion, self.expression_templates['neutral'])
+        base_expression = np.array([template.get(f, 0.0) for f in EXPRESSION_FEATURES], dtype=np.float64)
+        variation = np.sin(phase * 4) * 0.1
+        expression = (base_expression[None, :] + variation[:, None]).astype(np.float32)
+        
+        # Gesture pattern cycling
+        if animation_type == AnimationType.TALKING:
+            pattern = self.gesture_patterns['talking']
+        elif animation_type == AnimationType.GESTURING:
+            pattern = self.gesture_patterns['explaining']
+        else:
+            pattern = [{'hand_position': (0.0, 0.0), 'intensity': 0.0}]
+        pattern_hands = np.array([g['hand_position'] for g in pattern], dtype=np.float32)
+        pattern_intensity = np.array([g['intensity'] for g in pattern], dtype=np.float32)
+        pattern_index = (progress * len(pattern)).astype(np.int64) % len(pattern)
+        
+        return CompiledAnimation(
+            frame_numbers=np.arange(n, dtype=np.int32),
+            positions=positions,
+            rotation=np.zeros(n, dtype=np.float32),
+            scale=(1.0 + np.sin(phase * 2) * 0.02).astype(np.float32),  # Subtle scaling
+            alpha=np.ones(n, dtype=np.float32),
+            expression=expression,
+            hand_positions=pattern_hands[pattern_index],
+            gesture_intensity=pattern_intensity[pattern_index]
+        )
     
     def _generate_keyframe(self, frame_num: int, progress: float, 
                          animation_type: AnimationType, character_info: Dict,
                          emotion: str) -> AnimationKeyframe:
         """Generate a single animation keyframe."""
-        base_position = (200, 200)  # Default character position
+        base_position = CHARACTER_BASE_POSITION
         
         # Animation-specific positioning
         if animation_type == AnimationType.WALKING:
@@ -263,25 +548,63 @@ class AdvancedAnimationEngine:
     
     def render_animated_character(self, img: Image.Image, character_rig: CharacterRig,
                                 keyframe: AnimationKeyframe, character_info: Dict) -> Image.Image:
-        """Render an animated character on the image."""
-        draw = ImageDraw.Draw(img)
-        
-        # Apply keyframe transformations
-        position = keyframe.character_position
-        expression = keyframe.facial_expression
-        gesture = keyframe.gesture_state
-        
-        # Render head with expression
-        self._render_animated_head(draw, character_rig, position, expression, character_info)
-        
-        # Render body
-        self._render_animated_body(draw, character_rig, position, gesture)
-        
-        # Render arms with gestures
-        self._render_animated_arms(draw, character_rig, position, gesture)
-        
+        """Render an animated character on the image.
+        
+        The character is drawn once per quantised expression/gesture into a
+        cached RGBA sprite, which is then blitted at the keyframe position.
+        """
+        sprite = self.get_character_sprite(character_rig, keyframe, character_info)
+        x, y = keyframe.character_position
+        img.paste(sprite, (int(round(x)) - SPRITE_ANCHOR[0], int(round(y)) - SPRITE_ANCHOR[1]), sprite)
         return img
     
+    def _quantize(self, value: float, resolution: float) -> float:
+        return round(round(value / resolution) * resolution, 6) if resolution > 0 else value
+    
+    def get_character_sprite(self, character_rig: CharacterRig, keyframe: AnimationKeyframe,
+                             character_info: Dict) -> Image.Image:
+        """Return the cached RGBA sprite for a keyframe's pose, rendering it on a miss."""
+        expression = {
+            feature: self._quantize(value, self.expression_resolution)
+            for feature, value in keyframe.facial_expression.items()
+        }
+        hand_x, hand_y = keyframe.gesture_state.get('hand_position', (0.0, 0.0))
+        gesture = {
+            'hand_position': (self._quantize(hand_x, self.gesture_resolution),
+                              self._quantize(hand_y, self.gesture_resolution)),
+            'intensity': self._quantize(keyframe.gesture_state.get('intensity', 0.0), self.gesture_resolution)
+        }
+        colors = tuple(tuple(character_info.get(k, ())) for k in ('skin_tone', 'hair_color', 'eye_color'))
+        key = (tuple(sorted(expression.items())), gesture['hand_position'], gesture['intensity'], colors)
+        
+        sprite = self.animation_cache.get(key)
+        if sprite is not None:
+            self.animation_cache.move_to_end(key)
+            self.sprite_cache_hits += 1
+            return sprite
+        
+        self.sprite_cache_misses += 1
+        sprite = Image.new('RGBA', SPRITE_SIZE, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        self._render_animated_head(draw, character_rig, SPRITE_ANCHOR, expression, character_info)
+        self._render_animated_body(draw, character_rig, SPRITE_ANCHOR, gesture)
+        self._render_animated_arms(draw, character_rig, SPRITE_ANCHOR, gesture)
+        
+        self.animation_cache[key] = sprite
+        while len(self.animation_cache) > self.sprite_cache_size:
+            self.animation_cache.popitem(last=False)
+        return sprite
+    
+    def sprite_cache_info(self) -> Dict[str, float]:
+        """Sprite cache statistics."""
+        lookups = self.sprite_cache_hits + self.sprite_cache_misses
+        return {
+            'hits': self.sprite_cache_hits,
+            'misses': self.sprite_cache_misses,
+            'size': len(self.animation_cache),
+            'hit_rate': self.sprite_cache_hits / lookups if lookups else 0.0
+        }
+    
     def _render_animated_head(self, draw: ImageDraw.Draw, rig: CharacterRig,
                             position: Tuple[int, int], expression: Dict,
                             character_info: Dict):
@@ -366,8 +689,8 @@ class AdvancedAnimationEngine:
             ], 0, 180, fill=(200, 100, 100), width=3)
         elif mouth_curve < 0:  # Frown
             draw.arc([
-                head_x - mouth_width, mouth_y + int(abs(mouth_curve) * 15),
-                head_x + mouth_width, mouth_y - int(abs(mouth_curve) * 15)
+                head_x - mouth_width, mouth_y - int(abs(mouth_curve) * 15),
+                head_x + mouth_width, mouth_y + int(abs(mouth_curve) * 15)
             ], 180, 360, fill=(200, 100, 100), width=3)
         else:  # Neutral
             draw.ellipse([
@@ -431,90 +754,37 @@ class AdvancedAnimationEngine:
         ], fill=(255, 220, 177), outline=(0, 0, 0), width=1)
     
     def create_particle_effect(self, img: Image.Image, effect_type: str,
-                             center: Tuple[int, int], intensity: float = 1.0) -> Image.Image:
-        """Add particle effects to the image."""
-        draw = ImageDraw.Draw(img)
-        
-        if effect_type == 'sparkles':
-            self._render_sparkles(draw, center, intensity)
-        elif effect_type == 'magic':
-            self._render_magic_particles(draw, center, intensity)
-        elif effect_type == 'emotion_burst':
-            self._render_emotion_particles(draw, center, intensity)
-        
+                             center: Tuple[int, int], intensity: float = 1.0,
+                             fps: float = 30.0) -> Image.Image:
+        """Add particle effects to the image.
+        
+        Each call advances the effect's persistent particle system by one
+        frame, so particles move and fade across consecutive frames.
+        """
+        if effect_type not in ParticleSystem.PRESETS:
+            return img
+        frame = np.array(img.convert('RGB'))
+        self.apply_particle_effect(frame, effect_type, center, intensity, fps)
+        img.paste(Image.fromarray(frame), (0, 0))
         return img
     
-    def _render_sparkles(self, draw: ImageDraw.Draw, center: Tuple[int, int], intensity: float):
-        """Render sparkle particles."""
-        cx, cy = center
-        num_sparkles = int(10 * intensity)
-        
-        for _ in range(num_sparkles):
-            # Random position around center
-            offset_x = random.randint(-50, 50)
-            offset_y = random.randint(-50, 50)
-            
-            sparkle_x = cx + offset_x
-            sparkle_y = cy + offset_y
-            
-            # Random sparkle size
-            size = random.randint(2, 6)
-            
-            # Draw sparkle as star shape
-            points = []
-            for i in range(8):
-                angle = i * math.pi / 4
-                if i % 2 == 0:
-                    radius = size
-                else:
-                    radius = size // 2
-                
-                x = sparkle_x + radius * math.cos(angle)
-                y = sparkle_y + radius * math.sin(angle)
-                points.append((x, y))
-            
-            draw.polygon(points, fill=(255, 255, 0), outline=(255, 255, 255))
-    
-    def _render_magic_particles(self, draw: ImageDraw.Draw, center: Tuple[int, int], intensity: float):
-        """Render magical particle effects."""
-        cx, cy = center
-        num_particles = int(15 * intensity)
-        
-        colors = [(255, 0, 255), (0, 255, 255), (255, 255, 0), (255, 0, 0)]
-        
-        for i in range(num_particles):
-            # Spiral pattern
-            angle = i * 2 * math.pi / num_particles
-            radius = 30 + i * 2
-            
-            particle_x = cx + radius * math.cos(angle)
-            particle_y = cy + radius * math.sin(angle)
-            
-            color = random.choice(colors)
-            size = random.randint(3, 8)
-            
-            draw.ellipse([
-                particle_x - size, particle_y - size,
-                particle_x + size, particle_y + size
-            ], fill=color, outline=(255, 255, 255))
-    
-    def _render_emotion_particles(self, draw: ImageDraw.Draw, center: Tuple[int, int], intensity: float):
-        """Render emotion-based particle effects."""
-        cx, cy = center
-        num_particles = int(8 * intensity)
-        
-        # Heart shapes for positive emotions
-        for i in range(num_particles):
-            offset_x = random.randint(-40, 40)
-            offset_y = random.randint(-40, 40)
-            
-            heart_x = cx + offset_x
-            heart_y = cy + offset_y
-            
-            # Simple heart shape using two circles and a triangle
-            draw.ellipse([heart_x - 5, heart_y - 3, heart_x + 1, heart_y + 3], fill=(255, 0, 0))
-            draw.ellipse([heart_x - 1, heart_y - 3, heart_x + 5, heart_y + 3], fill=(255, 0, 0))
-            draw.polygon([(heart_x - 5, heart_y + 1), (heart_x + 5, heart_y + 1), (heart_x, heart_y + 8)], fill=(255, 0, 0))
+    def apply_particle_effect(self, frame: Optional[np.ndarray], effect_type: str,
+                              center: Tuple[int, int], intensity: float = 1.0,
+                              fps: float = 30.0) -> Optional[np.ndarray]:
+        """NumPy variant of create_particle_effect: draws into an (H, W, 3) uint8 frame in place.
+        
+        With ``frame=None`` the effect is advanced one frame without drawing.
+        """
+        if effect_type not in ParticleSystem.PRESETS:
+            return frame
+        system = self.particle_systems.get(effect_type)
+        if system is None:
+            system = self.particle_systems[effect_type] = ParticleSystem(effect_type)
+        return system.step(frame, center, intensity, dt=1.0 / fps, fps=fps)
+    
+    def reset_particles(self):
+        """Drop all live particles (e.g. at a scene cut)."""
+        self.particle_systems.clear()
 
 # Test the advanced animation system
 def test_advanced_animations():
@@ -571,6 +841,7 @@ def test_advanced_animations():
         animated_img.save(output_path)
         print(f"    ✅ Saved test frame: {output_path}")
     
+    print(f"  Sprite cache: {engine.sprite_cache_info()}")
     print("🎭 Advanced animation system test completed!")
 
 if __name__ == "__main__":
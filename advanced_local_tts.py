@@ -28,6 +28,7 @@ import soundfile as sf
 
 # Import simplified TTS as fallback
 from simplified_local_tts import SimplifiedLocalTTS, SimpleVoiceProfile
+from tts_cache import shared_tts_cache
 
 @dataclass
 class AdvancedVoiceProfile:
@@ -48,6 +49,9 @@ class AdvancedVoiceProfile:
 class AdvancedLocalTTS:
     """Advanced local TTS engine with multiple high-quality backends."""
     
+    # Engines synthesised here; anything else goes to the simplified TTS
+    NEURAL_ENGINES = ('tortoise', 'coqui', 'espnet', 'vits')
+    
     def __init__(self, enable_gpu: bool = True):
         self.logger = logging.getLogger(__name__)
         self.enable_gpu = enable_gpu
@@ -66,6 +70,9 @@ class AdvancedLocalTTS:
         # Model cache
         self.model_cache = {}
         
+        # Synthesised speech shared with the other TTS engines
+        self.cache = shared_tts_cache()
+        
         self.logger.info(f"Advanced Local TTS initialized with {len(self.engines)} engines")
         if self.enable_gpu and self._has_gpu():
             self.logger.info("🚀 GPU acceleration enabled")
@@ -238,7 +245,7 @@ class AdvancedLocalTTS:
     
     def synthesize_speech(self, text: str, voice_profile: Union[str, AdvancedVoiceProfile], 
                          output_path: str, quality_override: Optional[str] = None) -> Optional[str]:
-        """Synthesize speech using the best available engine for the requested quality."""
+        """Synthesize speech using the best available engine for the requested quality (cached on disk)."""
         try:
             # Get voice profile
             if isinstance(voice_profile, str):
@@ -260,19 +267,8 @@ class AdvancedLocalTTS:
             # Select engine based on quality and language
             engine_name = self._select_best_engine(profile, quality)
             
-            self.logger.info(f"Using {engine_name} engine for {quality} quality synthesis")
-            
-            # Synthesize with selected engine
-            if engine_name == 'tortoise' and self.engines['tortoise']['available']:
-                return self._synthesize_tortoise(text, profile, output_path)
-            elif engine_name == 'coqui' and self.engines['coqui']['available']:
-                return self._synthesize_coqui(text, profile, output_path)
-            elif engine_name == 'espnet' and self.engines['espnet']['available']:
-                return self._synthesize_espnet(text, profile, output_path)
-            elif engine_name == 'vits' and self.engines['vits']['available']:
-                return self._synthesize_vits(text, profile, output_path)
-            else:
-                # Fallback to simplified TTS
+            if engine_name not in self.NEURAL_ENGINES or not self.engines[engine_name]['available']:
+                # Fallback to simplified TTS (which caches its own results)
                 simple_profile = SimpleVoiceProfile(
                     name=profile.name,
                     gender=profile.gender,
@@ -281,6 +277,14 @@ class AdvancedLocalTTS:
                     volume=profile.volume
                 )
                 return self.fallback_tts.synthesize_speech(text, simple_profile, output_path)
+            
+            # Identical requests are served from the shared disk cache
+            key = self.cache.key(text, profile, f"advanced:{engine_name}", self.sample_rate,
+                                 profile.emotion, quality=quality)
+            return self.cache.synthesize(
+                key, output_path,
+                lambda: (self._synthesize_with_engine(engine_name, text, profile, output_path, quality), engine_name)
+            )
                 
         except Exception as e:
             self.logger.error(f"Advanced TTS synthesis failed: {e}")
@@ -290,6 +294,21 @@ class AdvancedLocalTTS:
             except:
                 return None
     
+    def _synthesize_with_engine(self, engine_name: str, text: str, profile: AdvancedVoiceProfile,
+                                output_path: str, quality: str) -> Optional[str]:
+        """Synthesize with the selected (available) engine."""
+        self.logger.info(f"Using {engine_name} engine for {quality} quality synthesis")
+        
+        if engine_name == 'tortoise':
+            return self._synthesize_tortoise(text, profile, output_path)
+        elif engine_name == 'coqui':
+            return self._synthesize_coqui(text, profile, output_path)
+        elif engine_name == 'espnet':
+            return self._synthesize_espnet(text, profile, output_path)
+        elif engine_name == 'vits':
+            return self._synthesize_vits(text, profile, output_path)
+        return None
+    
     def _clean_text(self, text: str) -> str:
         """Clean and prepare text for synthesis."""
         # Remove extra whitespace
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+In-process Audio Effects for the podcast generators
+- Highpass, lowpass (scipy sosfilt) and echo streamed block by block, then polyphase
+  resampling; filter and delay-line state carry across blocks, so memory stays bounded
+- Frame-wise peak normalisation (ffmpeg dynaudnorm stand-in) on the filtered signal
+- Encodes fed to ffmpeg over a pipe by a bounded pool of worker threads; no WAV round trip
+"""
+
+import os
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Set
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+from video_writer import FFMPEG_BINARY
+
+# ffmpeg's highpass/lowpass default: two-pole Butterworth
+FILTER_Q = 1 / np.sqrt(2)
+# Samples per block of the streamed filters and resampler
+BLOCK_SAMPLES = 1 << 16
+# Normalisation (ffmpeg dynaudnorm defaults): 500 ms frames, 31-frame gaussian, peak 0.95, gain <= 10
+NORMALIZE_FRAME_SECONDS = 0.5
+NORMALIZE_WINDOW_FRAMES = 31
+NORMALIZE_PEAK = 0.95
+NORMALIZE_MAX_GAIN = 10.0
+# Encodes running at once, and encodes waiting (holding their audio in memory) before submit blocks
+ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+MAX_PENDING_ENCODES = 2 * ENCODE_WORKERS
+
+@dataclass(frozen=True)
+class EffectChain:
+    """
+    Effects applied to an episode; any combination runs as one pass.
+
+    The echo follows ffmpeg's ``aecho=in_gain:out_gain:delay:decay`` and
+    lengthens the audio by its delay. Normalisation always runs last.
+    """
+    highpass: Optional[float] = None      # Cutoff in Hz
+    lowpass: Optional[float] = None
+    echo_delay: float = 0.0               # Seconds
+    echo_decay: float = 0.0
+    echo_in_gain: float = 1.0
+    echo_out_gain: float = 1.0
+    normalize: bool = False
+    sample_rate: Optional[int] = None     # Output rate; None keeps the input rate
+
+    def sos(self, sample_rate: int) -> np.ndarray:
+        """High/lowpass stages as second-order sections, shape (sections, 6)"""
+        sections = [_biquad_section(cutoff, sample_rate, highpass)
+                    for cutoff, highpass in ((self.highpass, True), (self.lowpass, False))
+                    if cutoff and 0 < cutoff < sample_rate / 2]
+        return np.array(sections, dtype=np.float64).reshape(-1, 6)
+
+    @property
+    def is_linear_identity(self) -> bool:
+        return not (self.highpass or self.lowpass or self.echo_decay)
+
+# The ffmpeg filter chains the generators used, by effect type
+EFFECT_CHAINS = {
+    # dynaudnorm,highpass=f=80,lowpass=f=10000
+    'podcast': EffectChain(highpass=80, lowpass=10000, normalize=True, sample_rate=44100),
+    # aecho=0.8:0.9:1000:0.3,dynaudnorm
+    'interview': EffectChain(echo_delay=1.0, echo_decay=0.3, echo_in_gain=0.8, echo_out_gain=0.9,
+                             normalize=True, sample_rate=44100),
+    # dynaudnorm
+    'default': EffectChain(normalize=True, sample_rate=44100),
+}
+
+def _biquad_section(cutoff: float, sample_rate: int, highpass: bool) -> np.ndarray:
+    """RBJ cookbook high/lowpass biquad (as ffmpeg's filters) as one normalised sos row"""
+    w0 = 2 * np.pi * cutoff / sample_rate
+    cos, alpha = np.cos(w0), np.sin(w0) / (2 * FILTER_Q)
+    if highpass:
+        b = ((1 + cos) / 2, -(1 + cos), (1 + cos) / 2)
+    else:
+        b = ((1 - cos) / 2, 1 - cos, (1 - cos) / 2)
+    a = (1 + alpha, -2 * cos, 1 - alpha)
+    return np.array(b + a) / a[0]
+
+def _as_frames(audio) -> np.ndarray:
+    audio = np.asarray(audio, dtype=np.float32)
+    return audio[:, None] if audio.ndim == 1 else audio
+
+def filter_blocks(audio: np.ndarray, sample_rate: int, chain: EffectChain) -> np.ndarray:
+    """
+    High/lowpass and echo of ``chain`` over ``audio``, BLOCK_SAMPLES at a
+    time with the filter state and the echo's delay line carried across
+    blocks. The output is longer than the input by the echo delay.
+    """
+    audio = _as_frames(audio)
+    sos = chain.sos(sample_rate)
+    delay = int(round(chain.echo_delay * sample_rate)) if chain.echo_decay else 0
+    channels = audio.shape[1]
+    out = np.empty((len(audio) + delay, channels), dtype=np.float32)
+    state = np.zeros((len(sos), 2, channels))
+    history = np.zeros((delay, channels), dtype=np.float32)
+    for start in range(0, len(out), BLOCK_SAMPLES):
+        stop = min(start + BLOCK_SAMPLES, len(out))
+        block = audio[start:stop]
+        if len(block) < stop - start:
+            # The echo's tail
+            block = np.concatenate([block, np.zeros((stop - start - len(block), channels), dtype=np.float32)])
+        if len(sos):
+            block, state = signal.sosfilt(sos, block, axis=0, zi=state)
+        if chain.echo_decay:
+            delayed = np.concatenate([history, block])
+            history = delayed[len(block):].copy()
+            block = chain.echo_out_gain * (chain.echo_in_gain * block + chain.echo_decay * delayed[:len(block)])
+        out[start:stop] = block
+    return out
+
+def resample_blocks(audio: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """
+    ``scipy.signal.resample_poly`` to ``target_rate``, BLOCK_SAMPLES at a
+    time. Each block is resampled with enough neighbouring input for the
+    filter, so the result matches resampling the whole signal at once.
+    """
+    audio = _as_frames(audio)
+    ratio = Fraction(target_rate, sample_rate)
+    up, down = ratio.numerator, ratio.denominator
+    if up == down:
+        return audio
+    # resample_poly's filter reaches 10 * max(up, down) upsampled samples each way;
+    # blocks and context are whole multiples of ``down`` so outputs line up
+    context = down * -(-(10 * max(up, down) // up + 1) // down)
+    step = down * max(1, BLOCK_SAMPLES // down)
+    out = np.empty((-(-len(audio) * up // down), audio.shape[1]), dtype=np.float32)
+    for start in range(0, len(audio), step):
+        lo, hi = start - context, start + step + context
+        segment = audio[max(lo, 0):min(hi, len(audio))]
+        if lo < 0 or hi > len(audio):
+            segment = np.pad(segment, ((max(-lo, 0), max(hi - len(audio), 0)), (0, 0)))
+        resampled = signal.resample_poly(segment, up, down, axis=0)
+        first, out_start = context * up // down, start * up // down
+        count = min(step * up // down, len(out) - out_start)
+        out[out_start:out_start + count] = resampled[first:first + count]
+    return out
+
+def linear_pass(audio: np.ndarray, sample_rate: int, chain: EffectChain = EffectChain(),
+                target_rate: Optional[int] = None) -> np.ndarray:
+    """
+    Linear stages of ``chain`` plus resampling to ``target_rate``, streamed
+    in bounded memory. Returns (samples, channels) float32.
+    """
+    audio = _as_frames(audio)
+    target_rate = target_rate or sample_rate
+    if len(audio) == 0:
+        return audio
+    if not chain.is_linear_identity:
+        audio = filter_blocks(audio, sample_rate, chain)
+    return resample_blocks(audio, sample_rate, target_rate)
+
+def normalize(audio: np.ndarray, sample_rate: int, peak: float = NORMALIZE_PEAK,
+              max_gain: float = NORMALIZE_MAX_GAIN) -> np.ndarray:
+    """
+    Dynamic peak normalisation like ffmpeg's dynaudnorm: each frame's gain
+    brings its peak to ``peak``; gains are minimum-filtered and gaussian-
+    smoothed across frames, then interpolated per sample.
+    """
+    audio = _as_frames(audio)
+    frame = max(int(NORMALIZE_FRAME_SECONDS * sample_rate), 1)
+    frames = -(-len(audio) // frame)
+    if frames == 0:
+        return audio
+    peaks = np.array([np.abs(audio[start:start + frame]).max() for start in range(0, len(audio), frame)])
+    gains = np.minimum(peak / np.maximum(peaks, 1e-9), max_gain)
+
+    radius = NORMALIZE_WINDOW_FRAMES // 2
+    edged = np.pad(gains, radius, mode='edge')
+    # Minimum first, so a loud frame pulls down the gain around it before it arrives
+    gains = np.lib.stride_tricks.sliding_window_view(edged, NORMALIZE_WINDOW_FRAMES).min(axis=1)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / (NORMALIZE_WINDOW_FRAMES / 6)) ** 2)
+    gains = np.convolve(np.pad(gains, radius, mode='edge'), kernel / kernel.sum(), mode='valid')
+
+    centres = (np.arange(frames) + 0.5) * frame
+    out = np.empty_like(audio)
+    for start in range(0, len(audio), BLOCK_SAMPLES):
+        stop = min(start + BLOCK_SAMPLES, len(audio))
+        gain = np.interp(np.arange(start, stop), centres, gains).astype(np.float32)
+        np.clip(audio[start:stop] * gain[:, None], -1.0, 1.0, out=out[start:stop])
+    return out
+
+def apply_chain(audio: np.ndarray, sample_rate: int, chain: EffectChain):
+    """Run every stage of ``chain`` over ``audio``; returns (audio, sample_rate)"""
+    target_rate = chain.sample_rate or sample_rate
+    audio = linear_pass(audio, sample_rate, chain, target_rate)
+    if chain.normalize:
+        audio = normalize(audio, target_rate)
+    return audio, target_rate
+
+def load_segments(paths):
+    """
+    Read and concatenate audio files; returns (audio, sample_rate).
+
+    Segments are resampled to the first one's rate and mono segments are
+    duplicated across channels if others are stereo.
+    """
+    clips = [sf.read(str(path), dtype='float32', always_2d=True) for path in paths]
+    if not clips:
+        return np.zeros((0, 1), dtype=np.float32), 0
+    sample_rate = clips[0][1]
+    channels = max(audio.shape[1] for audio, _ in clips)
+    parts = []
+    for audio, rate in clips:
+        if rate != sample_rate:
+            audio = resample_blocks(audio, rate, sample_rate)
+        if audio.shape[1] != channels:
+            audio = np.repeat(audio[:, :1], channels, axis=1)
+        parts.append(audio)
+    return np.concatenate(parts), sample_rate
+
+def encode_audio(audio: np.ndarray, sample_rate: int, output_path, bitrate: str = '128k'):
+    """
+    Encode ``audio`` to ``output_path`` (format from the extension). The PCM
+    is piped into ffmpeg; without ffmpeg libsndfile writes the file.
+    """
+    audio = _as_frames(audio)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+    cmd = [
+        FFMPEG_BINARY, '-y', '-loglevel', 'error',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', str(audio.shape[1]),
+        '-i', 'pipe:0',
+        '-b:a', bitrate,
+        str(output_path)
+    ]
+    try:
+        subprocess.run(cmd, input=pcm.tobytes(), check=True, capture_output=True)
+    except FileNotFoundError:
+        sf.write(str(output_path), pcm, sample_rate)
+
+class EncodePool:
+    """
+    Bounded pool of encoder threads shared by the podcast generators.
+
+    ``submit`` returns as soon as a worker can take the job, so the next
+    episode is synthesised while this one encodes; it blocks once
+    ``max_pending`` encodes are queued. ``wait`` finishes everything
+    submitted so far and returns the outputs that failed.
+    """
+
+    def __init__(self, workers: int = ENCODE_WORKERS, max_pending: int = MAX_PENDING_ENCODES,
+                 bitrate: str = '128k'):
+        self.bitrate = bitrate
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='encode')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def _encode(self, audio, sample_rate, output_path) -> bool:
+        try:
+            encode_audio(audio, sample_rate, output_path, self.bitrate)
+            return True
+        except Exception as e:
+            print(f"❌ Encoding failed for {Path(output_path).name}: {e}")
+            return False
+
+    def _finished(self, future: Future):
+        self._slots.release()
+
+    def submit(self, audio: np.ndarray, sample_rate: int, output_path) -> Future:
+        """Queue ``audio`` for encoding to ``output_path``; the future's result is success"""
+        self._slots.acquire()
+        future = self._executor.submit(self._encode, audio, sample_rate, output_path)
+        future.add_done_callback(self._finished)
+        with self._lock:
+            self._pending[str(output_path)] = future
+        return future
+
+    def wait(self) -> Set[str]:
+        """Block until every submitted encode is done; returns the paths that failed"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return {path for path, future in pending.items() if not future.result()}
+
+    def close(self):
+        self.wait()
+        self._executor.shutdown()
+
+@lru_cache(maxsize=1)
+def shared_encode_pool() -> EncodePool:
+    """The process-wide encode pool (created on first use)"""
+    return EncodePool()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Decode-free Audio Probe for the generators
+- Duration, sample rate and channels read from container headers only (WAV/MP3/OGG)
+- Other formats go through libsndfile's header parser (sf.info)
+- Results cached by path, mtime and size, so batch runs never re-read a file
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import soundfile as sf
+
+# Probed files kept in memory
+PROBE_CACHE_SIZE = 4096
+# How far into an MP3 (after ID3 tags) to look for the first frame
+MP3_SYNC_SEARCH_BYTES = 1 << 16
+# Tail of an OGG stream read to find the last page (doubled until found)
+OGG_TAIL_BYTES = 1 << 16
+
+class AudioProbeError(ValueError):
+    """The file's headers don't describe a readable audio stream"""
+
+@dataclass(frozen=True)
+class AudioInfo:
+    """What the headers say about an audio file"""
+    duration: float
+    sample_rate: int
+    channels: int
+    format: str
+
+def probe_audio(path) -> AudioInfo:
+    """Header information for ``path``; cached until the file changes"""
+    path = os.path.abspath(os.fspath(path))
+    stat = os.stat(path)
+    return _probe_cached(path, stat.st_mtime_ns, stat.st_size)
+
+def audio_duration(path) -> float:
+    """Duration of ``path`` in seconds, without decoding it"""
+    return probe_audio(path).duration
+
+def clear_probe_cache():
+    _probe_cached.cache_clear()
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> AudioInfo:
+    with open(path, 'rb') as f:
+        head = f.read(12)
+        f.seek(0)
+        try:
+            if head[:4] in (b'RIFF', b'RF64') and head[8:12] == b'WAVE':
+                info = _probe_wav(f, size)
+            elif head[:4] == b'OggS':
+                info = _probe_ogg(f, size)
+            elif head[:3] == b'ID3' or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+                info = _probe_mp3(f, size)
+            else:
+                info = None
+        except (struct.error, IndexError):
+            # Damaged header: let libsndfile have a go
+            info = None
+    if info is not None:
+        return info
+    try:
+        # libsndfile parses the header only (FLAC, AIFF, ...)
+        sf_info = sf.info(path)
+    except Exception as e:
+        raise AudioProbeError(f"unsupported or corrupt audio file {path}: {e}")
+    return AudioInfo(sf_info.frames / sf_info.samplerate, sf_info.samplerate, sf_info.channels,
+                     sf_info.format.lower())
+
+def _probe_wav(f, size: int) -> Optional[AudioInfo]:
+    riff = f.read(12)
+    fmt = None
+    data_size = None
+    fact_frames = None
+    ds64_data_size = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        start = f.tell()
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack('<HHIIHH', f.read(16))
+        elif chunk_id == b'fact' and chunk_size >= 4:
+            fact_frames = struct.unpack('<I', f.read(4))[0]
+        elif chunk_id == b'ds64' and chunk_size >= 16:
+            ds64_data_size = struct.unpack('<QQ', f.read(16))[1]
+        elif chunk_id == b'data':
+            if riff[:4] == b'RF64' and ds64_data_size is not None:
+                chunk_size = ds64_data_size
+            # Streamed or truncated files: the data runs to the end of the file
+            available = size - start
+            data_size = available if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, available)
+            if fmt is not None:
+                break
+        f.seek(start + chunk_size + (chunk_size & 1))
+    if fmt is None or data_size is None:
+        return None
+
+    audio_format, channels, sample_rate, byte_rate, block_align, _ = fmt
+    if sample_rate == 0:
+        return None
+    if audio_format in (1, 3, 0xFFFE) and block_align:
+        # PCM / float / extensible: every frame is block_align bytes
+        duration = (data_size // block_align) / sample_rate
+    elif fact_frames is not None:
+        duration = fact_frames / sample_rate
+    elif byte_rate:
+        duration = data_size / byte_rate
+    else:
+        return None
+    return AudioInfo(duration, sample_rate, channels, 'wav')
+
+# MPEG audio header tables, indexed by the version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MP3_BITRATES = {
+    (3, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (3, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (3, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+def _mp3_header(data: bytes, offset: int):
+    """Decode the 4-byte frame header at ``offset``; None if it isn't one"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[offset + 1] >> 3) & 3
+    layer = (data[offset + 1] >> 1) & 3
+    bitrate_index = data[offset + 2] >> 4
+    rate_index = (data[offset + 2] >> 2) & 3
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES[(3 if version == 3 else 2, layer if version == 3 or layer == 3 else 2)][bitrate_index]
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (data[offset + 2] >> 1) & 1
+    channels = 1 if data[offset + 3] >> 6 == 3 else 2
+    if layer == 3:  # Layer I
+        samples, length = 384, (12 * bitrate * 1000 // sample_rate + padding) * 4
+    elif layer == 2 or version == 3:  # Layer II, MPEG-1 Layer III
+        samples, length = 1152, 144 * bitrate * 1000 // sample_rate + padding
+    else:  # MPEG-2/2.5 Layer III
+        samples, length = 576, 72 * bitrate * 1000 // sample_rate + padding
+    return version, layer, bitrate, sample_rate, channels, samples, length
+
+def _probe_mp3(f, size: int) -> Optional[AudioInfo]:
+    start = 0
+    tag = f.read(10)
+    if tag[:3] == b'ID3' and len(tag) == 10:
+        # Syncsafe tag size, plus the footer if present
+        start = 10 + ((tag[6] << 21) | (tag[7] << 14) | (tag[8] << 7) | tag[9])
+        if tag[5] & 0x10:
+            start += 10
+    f.seek(start)
+    data = f.read(MP3_SYNC_SEARCH_BYTES)
+
+    # First frame whose successor also starts with a valid header
+    for offset in range(len(data) - 4):
+        header = _mp3_header(data, offset)
+        if header is not None and (offset + header[6] + 4 > len(data)
+                                   or _mp3_header(data, offset + header[6]) is not None):
+            break
+    else:
+        return None
+    version, layer, bitrate, sample_rate, channels, samples, length = header
+
+    # VBR files carry a frame count in a Xing/Info or VBRI header inside the first frame
+    side_info = (32 if channels == 2 else 17) if version == 3 else (17 if channels == 2 else 9)
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12 and data[xing + 7] & 1:
+        flags = data[xing + 7]
+        frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+        total = frames * samples
+        # LAME-style tag (also written by ffmpeg) after the optional Xing fields:
+        # encoder delay and padding to trim for the gapless length
+        lame = xing + 12 + (4 if flags & 2 else 0) + (100 if flags & 4 else 0) + (4 if flags & 8 else 0)
+        if data[lame:lame + 4] in (b'LAME', b'Lavf', b'Lavc') and len(data) >= lame + 24:
+            delay = (data[lame + 21] << 4) | (data[lame + 22] >> 4)
+            padding = ((data[lame + 22] & 0x0F) << 8) | data[lame + 23]
+            if delay + padding < total:
+                total -= delay + padding
+        return AudioInfo(total / sample_rate, sample_rate, channels, 'mp3')
+    vbri = offset + 4 + 32
+    if data[vbri:vbri + 4] == b'VBRI' and len(data) >= vbri + 18:
+        frames = struct.unpack('>I', data[vbri + 14:vbri + 18])[0]
+        return AudioInfo(frames * samples / sample_rate, sample_rate, channels, 'mp3')
+
+    # Constant bitrate: the stream length follows from the byte count
+    audio_bytes = size - start - offset
+    f.seek(max(size - 128, 0))
+    if f.read(3) == b'TAG':
+        audio_bytes -= 128
+    return AudioInfo(audio_bytes * 8 / (bitrate * 1000), sample_rate, channels, 'mp3')
+
+def _probe_ogg(f, size: int) -> Optional[AudioInfo]:
+    page = f.read(27)
+    if len(page) < 27:
+        return None
+    serial = page[14:18]
+    segments = f.read(page[26])
+    packet = f.read(min(sum(segments), 64))
+    if packet[:7] == b'\x01vorbis':
+        channels, sample_rate = packet[11], struct.unpack('<I', packet[12:16])[0]
+        granule_rate, pre_skip, name = sample_rate, 0, 'ogg'
+    elif packet[:8] == b'OpusHead':
+        # Opus granule positions always count 48 kHz samples
+        channels, pre_skip = packet[9], struct.unpack('<H', packet[10:12])[0]
+        sample_rate = struct.unpack('<I', packet[12:16])[0] or 48000
+        granule_rate, name = 48000, 'opus'
+    else:
+        return None
+    if granule_rate == 0:
+        return None
+
+    # The last page of the stream holds its total sample count
+    tail = OGG_TAIL_BYTES
+    while True:
+        f.seek(max(size - tail, 0))
+        data = f.read()
+        position = data.rfind(b'OggS')
+        while position >= 0:
+            if data[position + 14:position + 18] == serial:
+                granule = struct.unpack('<q', data[position + 6:position + 14])[0]
+                if granule >= 0:
+                    duration = max(granule - pre_skip, 0) / granule_rate
+                    return AudioInfo(duration, sample_rate, channels, name)
+            position = data.rfind(b'OggS', 0, position)
+        if tail >= size:
+            return None
+        tail *= 2
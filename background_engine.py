@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Shared Background Engine for the cv2 TV-style generators
+- Gradient ramps precomputed once as NumPy column vectors, in float64 so frames
+  match the scalar loops they replaced byte for byte
+- Per-frame colour shifts applied as one broadcast add with uint8 saturation
+- Static regions (ground, solid fills) cached as ready-made layers
+"""
+
+import numpy as np
+
+def saturate(values: np.ndarray) -> np.ndarray:
+    """Clamp to [0, 255] and truncate to uint8, like max(0, min(255, int(v)))"""
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+class BackgroundEngine:
+    """Background layers for one frame size (all colours are BGR)"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._ramps = {}
+        self._layers = {}
+        self._x = np.arange(width, dtype=np.float64)
+        self._y = np.arange(height, dtype=np.float64)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Row coordinates as float64, for building per-row colour columns"""
+        return self._y
+
+    @property
+    def columns(self) -> np.ndarray:
+        """Column coordinates as float64"""
+        return self._x
+
+    def ramp(self, top_color, bottom_color, rows: int) -> np.ndarray:
+        """
+        Linear gradient from ``top_color`` to ``bottom_color`` over ``rows`` rows.
+
+        Returns a cached float64 (rows, 1, 3) column ready to broadcast across a frame.
+        """
+        key = (tuple(top_color), tuple(bottom_color), rows)
+        ramp = self._ramps.get(key)
+        if ramp is None:
+            ratio = (np.arange(rows, dtype=np.float64) / rows)[:, None]
+            top = np.asarray(top_color, dtype=np.float64)
+            bottom = np.asarray(bottom_color, dtype=np.float64)
+            ramp = (top * (1 - ratio) + bottom * ratio)[:, None, :]
+            ramp.setflags(write=False)
+            self._ramps[key] = ramp
+        return ramp
+
+    def paint_gradient(self, frame: np.ndarray, top_color, bottom_color, rows: int,
+                       time_shift: float = 0.0, start_row: int = 0) -> np.ndarray:
+        """Fill ``rows`` rows from ``start_row`` with the gradient plus ``time_shift``"""
+        ramp = self.ramp(top_color, bottom_color, rows)
+        frame[start_row:start_row + rows] = saturate(ramp + time_shift)
+        return frame
+
+    def paint_rows(self, frame: np.ndarray, column: np.ndarray, start_row: int = 0) -> np.ndarray:
+        """Broadcast a (rows, 3) per-row colour column across the frame width"""
+        column = saturate(column) if column.dtype != np.uint8 else column
+        frame[start_row:start_row + len(column)] = column[:, None, :]
+        return frame
+
+    def solid_layer(self, color, start_row: int, end_row: int = None) -> np.ndarray:
+        """Cached read-only layer of rows [start_row, end_row) in a solid colour"""
+        end_row = self.height if end_row is None else end_row
+        key = ('solid', tuple(color), start_row, end_row)
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = np.empty((end_row - start_row, self.width, 3), dtype=np.uint8)
+            layer[:] = color
+            layer.setflags(write=False)
+            self._layers[key] = layer
+        return layer
+
+    def paint_ground(self, frame: np.ndarray, color, start_row: int) -> np.ndarray:
+        """Copy the cached ground layer into rows [start_row, height)"""
+        np.copyto(frame[start_row:], self.solid_layer(color, start_row))
+        return frame
+
+    def static_layer(self, key, build) -> np.ndarray:
+        """Cache an arbitrary full frame produced by ``build()`` under ``key``"""
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = build()
+            layer.setflags(write=False)
+            self._layers[key] = layer
+        return layer
+
+    def diagonal_field(self, table: np.ndarray, offset: int = 0) -> np.ndarray:
+        """
+        Zero-copy (height, width) view with ``out[y, x] = table[offset + x + y]``.
+
+        ``table`` must hold at least ``offset + width + height - 1`` values.
+        """
+        window = np.lib.stride_tricks.sliding_window_view(table[offset:offset + self.width + self.height - 1],
+                                                          self.width)
+        return window[:self.height]
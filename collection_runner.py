@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Parallel Collection Runner for the cv2 video generators
+- Videos of a collection scheduled across a process pool sized to the CPU count
+- Longest jobs (by estimated frame count) dispatched first to balance the workers
+- Per-video status tracking; outputs with a matching input fingerprint are skipped
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from audio_probe import probe_audio
+
+PENDING, SKIPPED, RUNNING, DONE, FAILED = 'pending', 'skipped', 'running', 'done', 'failed'
+
+@dataclass
+class RenderJob:
+    """One video of a collection: ``generator.<method>(*args)`` producing ``output_path``"""
+    title: str
+    method: str
+    args: Tuple = ()
+    output_path: Optional[Path] = None
+    inputs: Tuple = ()              # Files whose contents go into the fingerprint
+    estimated_frames: int = 0
+    status: str = PENDING
+    result: Any = None
+    error: str = ''
+    elapsed: float = 0.0
+    fingerprint: str = field(default='', repr=False)
+
+def estimate_frames(audio_path, fps: float) -> int:
+    """Frame count of a video as long as ``audio_path`` (0 if it can't be read)"""
+    try:
+        return int(probe_audio(audio_path).duration * fps)
+    except Exception:
+        return 0
+
+def job_fingerprint(job: RenderJob) -> str:
+    """SHA-256 over the job's method, arguments and input file contents"""
+    digest = hashlib.sha256(json.dumps([job.method, job.args], default=str, sort_keys=True).encode())
+    for path in job.inputs:
+        digest.update(str(path).encode())
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def _fingerprint_path(output_path) -> Path:
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + '.fingerprint')
+
+def is_up_to_date(job: RenderJob) -> bool:
+    """True if the job's output exists and was rendered from the same inputs"""
+    if job.output_path is None or not Path(job.output_path).exists():
+        return False
+    try:
+        return _fingerprint_path(job.output_path).read_text().strip() == job.fingerprint
+    except OSError:
+        return False
+
+# Per-process generator instance, created once by the pool initializer
+_worker_generator = None
+
+def _init_worker(generator_class):
+    global _worker_generator
+    _worker_generator = generator_class()
+
+def _run_job(method: str, args: Tuple):
+    start = time.time()
+    return getattr(_worker_generator, method)(*args), time.time() - start
+
+class CollectionRunner:
+    """Render a list of ``RenderJob`` with one generator instance per worker process"""
+
+    def __init__(self, generator, max_workers: Optional[int] = None, skip_existing: bool = True):
+        """
+        Args:
+            generator: Generator instance; workers build their own with ``type(generator)()``
+            max_workers: Process count (default: CPU count); 1 renders in-process
+            skip_existing: Skip jobs whose output matches the input fingerprint
+        """
+        self.generator = generator
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.skip_existing = skip_existing
+        self.jobs: List[RenderJob] = []
+
+    def status_counts(self) -> dict:
+        counts = {}
+        for job in self.jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def run(self, jobs: List[RenderJob]) -> List[RenderJob]:
+        """Render all jobs (longest first) and return them with status and result filled in"""
+        self.jobs = list(jobs)
+        pending = []
+        for job in self.jobs:
+            try:
+                job.fingerprint = job_fingerprint(job)
+            except OSError as e:
+                job.status, job.error = FAILED, f"input not readable: {e}"
+                print(f"❌ {job.title}: {job.error}")
+                continue
+            if self.skip_existing and is_up_to_date(job):
+                job.status, job.result = SKIPPED, str(job.output_path)
+                print(f"⏭️  Up to date: {job.title} ({job.output_path})")
+            else:
+                pending.append(job)
+
+        # Longest-processing-time-first keeps the workers evenly loaded
+        pending.sort(key=lambda job: job.estimated_frames, reverse=True)
+        workers = min(self.max_workers, len(pending))
+        if workers > 1:
+            print(f"🚀 Rendering {len(pending)} videos on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(type(self.generator),)) as pool:
+                futures = {}
+                for job in pending:
+                    job.status = RUNNING
+                    futures[pool.submit(_run_job, job.method, job.args)] = job
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result, job.elapsed = future.result()
+                        self._finish(job, result)
+                    except Exception as e:
+                        self._fail(job, e)
+        else:
+            for job in pending:
+                job.status = RUNNING
+                start = time.time()
+                try:
+                    result = getattr(self.generator, job.method)(*job.args)
+                    job.elapsed = time.time() - start
+                    self._finish(job, result)
+                except Exception as e:
+                    self._fail(job, e)
+
+        counts = self.status_counts()
+        print(f"📊 Collection: {counts.get(DONE, 0)} rendered, {counts.get(SKIPPED, 0)} up to date, "
+              f"{counts.get(FAILED, 0)} failed")
+        return self.jobs
+
+    def _finish(self, job: RenderJob, result):
+        if not result:
+            job.status, job.error = FAILED, 'no output produced'
+            print(f"❌ {job.title}: {job.error}")
+            return
+        job.status, job.result = DONE, result
+        _fingerprint_path(result).write_text(job.fingerprint)
+        print(f"✅ {job.title} ({job.elapsed:.1f}s)")
+
+    def _fail(self, job: RenderJob, error: Exception):
+        job.status, job.error = FAILED, str(error)
+        print(f"❌ Error creating {job.title}: {error}")
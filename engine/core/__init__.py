@@ -9,6 +9,8 @@ __author__ = "AI-Empower-Cloud"
 from .video_engine import VideoGenerationEngine, VideoConfig, VideoFormat, AIModel, GenerationProgress
 from .neural_processor import NeuralProcessor
 from .render_pipeline import RenderPipeline, RenderSettings
+from .phonemizer import Phonemizer, TimedPhoneme, get_phonemizer
+from .scene_assembler import SceneAssembler, SceneSegment, concat_segments, scene_cache_key, scene_duration
 
 # Memory/context for conversation and video sessions
 class ConversationMemory:
@@ -78,6 +80,14 @@ __all__ = [
     "NeuralProcessor", 
     "RenderPipeline",
     "RenderSettings",
+    "Phonemizer",
+    "TimedPhoneme",
+    "get_phonemizer",
+    "SceneAssembler",
+    "SceneSegment",
+    "concat_segments",
+    "scene_cache_key",
+    "scene_duration",
     "ConversationMemory",
     "VoiceIntegration",
     "ConversationalResponder",
@@ -0,0 +1,232 @@
+"""
+Grapheme-to-Phoneme Engine
+Dictionary lookup with rule-based fallback, timed phonemes and viseme mapping
+"""
+
+import os
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+# ARPAbet phoneme inventory (stress markers stripped)
+PHONEMES = (
+    'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'B', 'CH', 'D', 'DH', 'EH', 'ER', 'EY',
+    'F', 'G', 'HH', 'IH', 'IY', 'JH', 'K', 'L', 'M', 'N', 'NG', 'OW', 'OY', 'P',
+    'R', 'S', 'SH', 'T', 'TH', 'UH', 'UW', 'V', 'W', 'Y', 'Z', 'ZH'
+)
+PHONEME_IDS = {p: i for i, p in enumerate(PHONEMES)}
+VOWELS = frozenset({'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW'})
+
+# Phoneme -> viseme names understood by the frame renderers
+PHONEME_TO_VISEME = {
+    'AA': 'open_mouth', 'AE': 'open_mouth', 'AH': 'open_mouth', 'AY': 'open_mouth',
+    'AW': 'round_mouth', 'AO': 'round_mouth', 'OW': 'round_mouth', 'OY': 'round_mouth',
+    'UH': 'round_mouth', 'UW': 'round_mouth', 'W': 'round_mouth', 'ER': 'round_mouth',
+    'R': 'round_mouth', 'SH': 'round_mouth', 'ZH': 'round_mouth', 'CH': 'round_mouth',
+    'JH': 'round_mouth',
+    'IY': 'smile', 'IH': 'smile', 'EY': 'smile', 'EH': 'smile', 'Y': 'smile',
+    'S': 'smile', 'Z': 'smile', 'T': 'smile', 'D': 'smile', 'N': 'smile',
+    'TH': 'smile', 'DH': 'smile', 'L': 'smile',
+    'M': 'neutral', 'B': 'neutral', 'P': 'neutral', 'F': 'neutral', 'V': 'neutral',
+    'K': 'neutral', 'G': 'neutral', 'NG': 'neutral', 'HH': 'neutral',
+    # Legacy shorthand used by the original demo pipeline
+    'EE': 'smile', 'OH': 'round_mouth',
+}
+
+# Typical phoneme durations in seconds
+VOWEL_DURATION = 0.09
+CONSONANT_DURATION = 0.06
+WORD_GAP = 0.03
+PAUSE_DURATIONS = {',': 0.15, ';': 0.2, ':': 0.2, '.': 0.35, '!': 0.35, '?': 0.35}
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?|[,;:.!?]")
+
+# Letter-to-sound fallback rules, longest graphemes first
+_GRAPHEME_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('tion', ('SH', 'AH', 'N')), ('sion', ('ZH', 'AH', 'N')), ('ough', ('AO',)),
+    ('igh', ('AY',)), ('tch', ('CH',)), ('dge', ('JH',)),
+    ('th', ('TH',)), ('sh', ('SH',)), ('ch', ('CH',)), ('ph', ('F',)), ('wh', ('W',)),
+    ('ng', ('NG',)), ('ck', ('K',)), ('qu', ('K', 'W')), ('kn', ('N',)), ('wr', ('R',)),
+    ('ee', ('IY',)), ('ea', ('IY',)), ('oo', ('UW',)), ('ai', ('EY',)), ('ay', ('EY',)),
+    ('oa', ('OW',)), ('ou', ('AW',)), ('ow', ('OW',)), ('oi', ('OY',)), ('oy', ('OY',)),
+    ('au', ('AO',)), ('aw', ('AO',)), ('ew', ('UW',)), ('ie', ('IY',)), ('ey', ('IY',)),
+    ('ar', ('AA', 'R')), ('er', ('ER',)), ('ir', ('ER',)), ('ur', ('ER',)), ('or', ('AO', 'R')),
+    ('a', ('AE',)), ('b', ('B',)), ('c', ('K',)), ('d', ('D',)), ('e', ('EH',)),
+    ('f', ('F',)), ('g', ('G',)), ('h', ('HH',)), ('i', ('IH',)), ('j', ('JH',)),
+    ('k', ('K',)), ('l', ('L',)), ('m', ('M',)), ('n', ('N',)), ('o', ('AA',)),
+    ('p', ('P',)), ('q', ('K',)), ('r', ('R',)), ('s', ('S',)), ('t', ('T',)),
+    ('u', ('AH',)), ('v', ('V',)), ('w', ('W',)), ('x', ('K', 'S')), ('y', ('IY',)),
+    ('z', ('Z',)),
+)
+_LONG_VOWELS = {'a': 'EY', 'e': 'IY', 'i': 'AY', 'o': 'OW', 'u': 'UW'}
+
+@dataclass
+class TimedPhoneme:
+    """A phoneme with its start/end time in seconds"""
+    phoneme: str
+    start: float
+    end: float
+
+class PronouncingDictionary:
+    """
+    CMUdict-style pronunciations packed into flat arrays.
+
+    Words are kept sorted for binary search; each word's phonemes are stored
+    as one-byte phoneme ids in a single shared buffer.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, List[str]]] = ()):
+        merged = {}
+        for word, phones in entries:
+            merged.setdefault(word.lower(), phones)  # First variant wins, as in CMUdict
+        self.words = sorted(merged)
+        self.offsets = array('I', [0])
+        self.phones = array('B')
+        for word in self.words:
+            self.phones.extend(PHONEME_IDS[p] for p in merged[word])
+            self.offsets.append(len(self.phones))
+
+    @classmethod
+    def from_cmudict_lines(cls, lines: Iterable[str]) -> 'PronouncingDictionary':
+        """Parse ``WORD  PH1 PH2`` / ``word(2) ...`` lines, skipping comments"""
+        def parse():
+            for line in lines:
+                if not line or line.startswith(';;;'):
+                    continue
+                parts = line.split()
+                if len(parts) < 2:
+                    continue
+                word = parts[0].split('(')[0]
+                phones = [re.sub(r'\d', '', p) for p in parts[1:]]
+                if all(p in PHONEME_IDS for p in phones):
+                    yield word, phones
+        return cls(parse())
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def lookup(self, word: str) -> Optional[List[str]]:
+        index = bisect_left(self.words, word)
+        if index == len(self.words) or self.words[index] != word:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return [PHONEMES[i] for i in self.phones[start:end]]
+
+def load_pronouncing_dictionary(path: Optional[str] = None) -> PronouncingDictionary:
+    """
+    Load a CMUdict-format dictionary.
+
+    Sources, in order: ``path``, ``$CMUDICT_PATH``, the ``cmudict`` package.
+    Returns an empty dictionary (rules only) when none is available.
+    """
+    path = path or os.getenv("CMUDICT_PATH")
+    if path and os.path.exists(path):
+        with open(path, encoding="latin-1") as f:
+            return PronouncingDictionary.from_cmudict_lines(f)
+    try:
+        import cmudict
+        with cmudict.dict_stream() as stream:
+            return PronouncingDictionary.from_cmudict_lines(
+                line.decode("latin-1") if isinstance(line, bytes) else line for line in stream
+            )
+    except Exception:
+        print("⚠️ No pronouncing dictionary found; using letter-to-sound rules only")
+        return PronouncingDictionary()
+
+def rule_based_phonemes(word: str) -> List[str]:
+    """Approximate a word's pronunciation with letter-to-sound rules"""
+    word = word.lower().replace("'", "")
+    # Silent final e lengthens the previous vowel (make, time, hope)
+    magic_e = len(word) > 3 and word.endswith('e') and word[-2] not in 'aeiouy' and word[-3] in 'aeiou'
+    if magic_e:
+        word = word[:-1]
+    phones: List[str] = []
+    i = 0
+    while i < len(word):
+        for grapheme, rule_phones in _GRAPHEME_RULES:
+            if word.startswith(grapheme, i):
+                if magic_e and i == len(word) - 2 and grapheme in _LONG_VOWELS:
+                    rule_phones = (_LONG_VOWELS[grapheme],)
+                elif grapheme == 'y' and i == 0:
+                    rule_phones = ('Y',)
+                phones.extend(rule_phones)
+                i += len(grapheme)
+                break
+        else:
+            i += 1  # Not a letter we know; skip it
+    return phones
+
+class Phonemizer:
+    """Grapheme-to-phoneme engine with per-word memoisation"""
+
+    def __init__(self, dictionary: Optional[PronouncingDictionary] = None, cache_size: int = 65536):
+        self.dictionary = dictionary if dictionary is not None else load_pronouncing_dictionary()
+        self.word_phonemes = lru_cache(maxsize=cache_size)(self._word_phonemes)
+
+    def _word_phonemes(self, word: str) -> Tuple[str, ...]:
+        phones = self.dictionary.lookup(word)
+        return tuple(phones if phones is not None else rule_based_phonemes(word))
+
+    def phonemes(self, text: str) -> List[str]:
+        """Phoneme sequence for ``text`` (punctuation dropped)"""
+        return [p for token in _TOKEN_PATTERN.findall(text) if token not in PAUSE_DURATIONS
+                for p in self.word_phonemes(token.lower())]
+
+    def timed_phonemes(self, text: str, duration: Optional[float] = None) -> List[TimedPhoneme]:
+        """
+        Timed phoneme sequence, with pauses at punctuation as silent gaps.
+
+        If ``duration`` is given, timings are scaled to fill it.
+        """
+        timed: List[TimedPhoneme] = []
+        t = 0.0
+        for token in _TOKEN_PATTERN.findall(text):
+            if token in PAUSE_DURATIONS:
+                t += PAUSE_DURATIONS[token]
+                continue
+            for phoneme in self.word_phonemes(token.lower()):
+                length = VOWEL_DURATION if phoneme in VOWELS else CONSONANT_DURATION
+                timed.append(TimedPhoneme(phoneme, t, t + length))
+                t += length
+            t += WORD_GAP
+
+        if duration and t > 0:
+            scale = duration / t
+            for item in timed:
+                item.start *= scale
+                item.end *= scale
+        return timed
+
+    def frame_visemes(self, text: str, fps: float, total_frames: int) -> List[str]:
+        """One viseme per video frame, spreading the text over ``total_frames``"""
+        if total_frames <= 0:
+            return []
+        timed = self.timed_phonemes(text, duration=total_frames / fps)
+        visemes = ['neutral'] * total_frames
+        for item in timed:
+            first = int(item.start * fps)
+            last = min(total_frames, max(first + 1, int(item.end * fps)))
+            viseme = PHONEME_TO_VISEME.get(item.phoneme, 'neutral')
+            for frame in range(first, last):
+                visemes[frame] = viseme
+        return visemes
+
+_phonemizer: Optional[Phonemizer] = None
+
+def get_phonemizer() -> Phonemizer:
+    """Return the process-wide phonemizer (dictionary loaded once)"""
+    global _phonemizer
+    if _phonemizer is None:
+        _phonemizer = Phonemizer()
+    return _phonemizer
+
+def text_to_phonemes(text: str) -> List[str]:
+    """Convert text to an ARPAbet phoneme sequence"""
+    return get_phonemizer().phonemes(text)
+
+def phonemes_to_visemes(phonemes: List[str]) -> List[str]:
+    """Convert a phoneme sequence to viseme names"""
+    return [PHONEME_TO_VISEME.get(p, 'neutral') for p in phonemes]
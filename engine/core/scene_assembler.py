@@ -0,0 +1,252 @@
+"""
+Scene Graph Assembler
+Renders story scenes as independent video segments in parallel and joins them
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Dict, List, Optional
+
+from video_writer import concat_segments
+
+from .video_engine import VideoConfig
+
+# Total size of the segment cache; least recently used segments go first
+SCENE_CACHE_MAX_BYTES = int(os.getenv("SCENE_CACHE_MAX_BYTES", str(5 << 30)))
+# Eviction trims the cache to this fraction of the cap
+SCENE_CACHE_LOW_WATER = 0.9
+# Temporary segments older than this were left by a crashed render
+STALE_TEMP_SECONDS = 3600
+# Scene length from its own text (about 16 characters of narration per second)
+SCENE_SECONDS_PER_CHAR = 0.06
+SCENE_MIN_SECONDS = 1.0
+
+@dataclass
+class SceneSegment:
+    """One node of the scene graph: a scene rendered to its own segment file"""
+    index: int
+    text: str
+    emotion: str
+    output_path: str
+    config: VideoConfig
+    avatar: Dict[str, str] = field(default_factory=dict)
+    cache_key: str = ""
+
+def scene_cache_key(text: str, emotion: str, avatar: Dict[str, str], config: VideoConfig,
+                    salt: str = "") -> str:
+    """Content address of a scene: hash of everything that affects its pixels"""
+    payload = {
+        "text": text,
+        "emotion": emotion,
+        "avatar": avatar,
+        "config": {k: getattr(v, "value", v) for k, v in asdict(config).items()},
+        "salt": salt
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+def scene_duration(text: str, fps: int, seconds_per_char: float = SCENE_SECONDS_PER_CHAR,
+                   min_seconds: float = SCENE_MIN_SECONDS) -> float:
+    """
+    Length of one scene, in whole frames, from its own text only.
+
+    It doesn't depend on the other scenes or the story's total duration, so
+    editing one sentence leaves every other scene's cache key unchanged.
+    """
+    frames = max(int(round(len(text.strip()) * seconds_per_char * fps)), math.ceil(min_seconds * fps), 1)
+    return frames / fps
+
+def _pool_context():
+    """Start method for the scene pool.
+
+    Forking a multi-threaded parent (the Streamlit server and its background
+    render thread) can deadlock the child on locks held by other threads, so
+    fork is used only when this is the sole Python thread.
+    """
+    if threading.active_count() == 1 and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+class SceneAssembler:
+    """
+    Scene graph assembler
+    Fans scene segments out to a process pool and concatenates them in order.
+    With a ``cache_dir`` segments are content addressed, so re-submitting an
+    edited script only re-renders the scenes whose inputs changed.
+    """
+
+    def __init__(self, render_segment: Callable[[SceneSegment], str],
+                 max_workers: Optional[int] = None, work_dir: str = "scene_segments",
+                 cache_dir: Optional[str] = None, cache_salt: str = "",
+                 cache_max_bytes: int = SCENE_CACHE_MAX_BYTES):
+        """
+        Args:
+            render_segment: Picklable top-level function that renders one
+                SceneSegment to ``segment.output_path`` and returns the path
+                actually written
+            max_workers: Process pool size (defaults to the CPU count)
+            work_dir: Directory for intermediate segment files
+            cache_dir: Directory of encoded segments keyed by scene hash;
+                when set, unchanged scenes are reused instead of re-rendered
+            cache_salt: Extra key material (e.g. encoder settings) so a
+                renderer change invalidates old segments
+            cache_max_bytes: Size cap of ``cache_dir``; the least recently
+                used segments are evicted once it is exceeded
+        """
+        self.render_segment = render_segment
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.work_dir = work_dir
+        self.cache_dir = cache_dir
+        self.cache_salt = cache_salt
+        self.cache_max_bytes = cache_max_bytes
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def build_segments(self, job_id: str, scenes: List[Dict[str, str]], config: VideoConfig,
+                       avatar: Optional[Dict[str, str]] = None) -> List[SceneSegment]:
+        """Create one segment node per scene, each as long as its own text needs"""
+        segment_dir = self.cache_dir or os.path.join(self.work_dir, job_id)
+        os.makedirs(segment_dir, exist_ok=True)
+        segments = []
+        for i, scene in enumerate(scenes):
+            avatar_fields = dict(avatar or {})
+            scene_config = replace(config, duration=scene_duration(scene['description'], config.fps))
+            key = scene_cache_key(scene['description'], scene['emotion'], avatar_fields,
+                                  scene_config, self.cache_salt) if self.cache_dir else ""
+            filename = f"{key}.mp4" if key else f"scene_{i:04d}.mp4"
+            segments.append(SceneSegment(
+                index=i,
+                text=scene['description'],
+                emotion=scene['emotion'],
+                output_path=os.path.join(segment_dir, filename),
+                config=scene_config,
+                avatar=avatar_fields,
+                cache_key=key
+            ))
+        return segments
+
+    def render_segments(self, segments: List[SceneSegment]) -> List[str]:
+        """Render segments in parallel, returning their paths in scene order"""
+        paths = [segment.output_path for segment in segments]
+        pending: Dict[str, SceneSegment] = {}
+        for segment in segments:
+            if segment.cache_key and os.path.exists(segment.output_path):
+                os.utime(segment.output_path)  # Mark as recently used
+                continue
+            # Identical scenes inside one story are rendered once
+            pending.setdefault(segment.output_path, segment)
+
+        if self.cache_dir:
+            print(f"♻️ Reusing {len(segments) - len(pending)} cached scene segments, "
+                  f"rendering {len(pending)}")
+        if not pending:
+            return paths
+
+        # Cached segments are written under a temporary name and moved into
+        # place only once complete, so a crashed render never poisons the cache
+        jobs = [
+            replace(segment, output_path=f"{segment.output_path[:-4]}.{uuid.uuid4().hex[:8]}.tmp.mp4")
+            if segment.cache_key else segment
+            for segment in pending.values()
+        ]
+        workers = min(self.max_workers, len(jobs))
+        if workers <= 1:
+            results = [self.render_segment(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+                results = list(executor.map(self.render_segment, jobs))
+
+        rendered: Dict[str, str] = {}
+        for final_path, job, result in zip(pending, jobs, results):
+            if job.output_path != final_path and result == job.output_path and os.path.exists(result):
+                os.replace(result, final_path)
+                result = final_path
+            rendered[final_path] = result
+        return [rendered.get(path, path) for path in paths]
+
+    def assemble(self, job_id: str, scenes: List[Dict[str, str]], config: VideoConfig,
+                 output_path: str, avatar: Optional[Dict[str, str]] = None,
+                 keep_segments: bool = False) -> str:
+        """
+        Render every scene and concatenate the segments into ``output_path``.
+
+        The joined video is trimmed to ``config.duration``, or padded to it
+        by repeating the last scene, when the scenes' own lengths differ.
+
+        Returns:
+            str: Path to the assembled video
+        """
+        segments = self.build_segments(job_id, scenes, config, avatar)
+        print(f"🎞️ Rendering {len(segments)} scene segments on up to {self.max_workers} processes")
+
+        segment_paths = self.render_segments(segments)
+        failed = [path for path in segment_paths if not path.endswith(".mp4") or not os.path.exists(path)]
+        if failed:
+            raise RuntimeError(f"{len(failed)} scene segment(s) failed to render: {failed[:3]}")
+
+        join_paths = list(segment_paths)
+        total = sum(segment.config.duration for segment in segments)
+        if config.duration and config.duration > total:
+            last = segments[-1].config.duration
+            join_paths += [segment_paths[-1]] * math.ceil((config.duration - total) / last)
+        try:
+            concat_segments(join_paths, output_path, duration=config.duration)
+            print(f"✅ Assembled {len(segment_paths)} scenes into {output_path}")
+        finally:
+            if not keep_segments and not self.cache_dir:
+                shutil.rmtree(os.path.join(self.work_dir, job_id), ignore_errors=True)
+
+        if self.cache_dir:
+            self.evict_cache(keep=segment_paths)
+        return output_path
+
+    def evict_cache(self, keep: List[str] = ()) -> int:
+        """
+        Delete least recently used segments until the cache fits ``cache_max_bytes``.
+
+        Segments in ``keep`` (the story just assembled) are never evicted.
+        Returns the number of segments removed.
+        """
+        keep = {os.path.abspath(path) for path in keep}
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or not entry.name.endswith(".mp4"):
+                continue
+            try:
+                stat = entry.stat()
+                if entry.name.endswith(".tmp.mp4"):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        os.remove(entry.path)
+                    continue
+            except OSError:
+                continue  # Removed by a concurrent render
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size <= self.cache_max_bytes:
+            return 0
+        removed = 0
+        target = self.cache_max_bytes * SCENE_CACHE_LOW_WATER
+        for _, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            size -= entry_size
+        print(f"🧹 Evicted {removed} cached scene segments")
+        return removed
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
+from .phonemizer import phonemes_to_visemes, text_to_phonemes
+
 class VideoFormat(Enum):
     MP4 = "mp4"
     WEBM = "webm"
@@ -41,13 +43,7 @@ class GenerationProgress:
     estimated_time_remaining: float
     current_stage: str
 
-# --- Lipsync and Emotion Animation Stubs ---
-PHONEME_TO_VISEME = {
-    'AH': 'open_mouth',
-    'EE': 'smile',
-    'OH': 'round_mouth',
-    # ...add more mappings
-}
+# --- Lipsync and Emotion Animation ---
 EMOTION_TO_EXPRESSION = {
     'happy': 'smile_face',
     'sad': 'frown_face',
@@ -55,13 +51,6 @@ EMOTION_TO_EXPRESSION = {
     'neutral': 'neutral_face'
 }
 
-def text_to_phonemes(text):
-    # For demo: split text into fake phonemes
-    return ['AH', 'EE', 'OH']  # Replace with real phoneme extraction
-
-def phonemes_to_visemes(phonemes):
-    return [PHONEME_TO_VISEME.get(p, 'neutral') for p in phonemes]
-
 def emotion_to_expression(emotion):
     return EMOTION_TO_EXPRESSION.get(emotion, 'neutral_face')
 
@@ -6,7 +6,6 @@ Add multiple themes, languages, and interactive elements
 
 import cv2
 import numpy as np
-import soundfile as sf
 from pathlib import Path
 import random
 import math
@@ -14,6 +13,14 @@ import subprocess
 import os
 import time
 import json
+from background_engine import BackgroundEngine
+from collection_runner import CollectionRunner, RenderJob, DONE, SKIPPED
+from video_writer import FFmpegVideoWriter
+from text_cache import TextStampCache
+from audio_probe import probe_audio
+
+# espeak narration speed
+SPEECH_WORDS_PER_MINUTE = 160
 
 class AdvancedABCVideoGenerator:
     """Enhanced ABC video generator with multiple themes and features"""
@@ -27,6 +34,8 @@ class AdvancedABCVideoGenerator:
         self.width = 1920
         self.height = 1080
         self.fps = 30
+        self.text = TextStampCache()
+        self.backgrounds = BackgroundEngine(self.width, self.height)
         
         # Theme definitions
         self.themes = {
@@ -135,18 +144,12 @@ class AdvancedABCVideoGenerator:
     
     def create_jungle_background(self, frame, frame_num, colors):
         """Create animated jungle background"""
-        # Sky gradient
-        for y in range(self.height // 2):
-            ratio = y / (self.height // 2)
-            color = colors['background']
-            b = int(color[0] * (1 - ratio * 0.3))
-            g = int(color[1] * (1 - ratio * 0.2))
-            r = int(color[2] * (1 - ratio * 0.1))
-            frame[y, :] = [b, g, r]
-        
-        # Ground
-        ground_color = colors['primary']
-        frame[self.height // 2:, :] = ground_color
+        # Sky gradient (static, darkening towards the horizon) and ground
+        horizon = self.height // 2
+        ratio = self.backgrounds.rows[:horizon, None] / horizon
+        sky = np.asarray(colors['background'], dtype=np.float64) * (1 - ratio * np.array([0.3, 0.2, 0.1]))
+        self.backgrounds.paint_rows(frame, sky)
+        self.backgrounds.paint_ground(frame, colors['primary'], horizon)
         
         # Animated trees
         tree_positions = [200, 500, 800, 1200, 1500]
@@ -280,17 +283,17 @@ class AdvancedABCVideoGenerator:
         cv2.circle(frame, (x + 30, y - 30), 60, (255, 255, 255), 3)
         
         # Draw letter
-        cv2.putText(frame, letter, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 
-                   3, (255, 255, 255), 8)
-        cv2.putText(frame, letter, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 
-                   3, (0, 0, 0), 6)
+        self.text.put_text(frame, letter, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 
+                          3, (255, 255, 255), 8)
+        self.text.put_text(frame, letter, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 
+                          3, (0, 0, 0), 6)
         
         # Draw themed word below
         word_y = y + 50
-        cv2.putText(frame, themed_word, (x - 20, word_y), cv2.FONT_HERSHEY_SIMPLEX, 
-                   0.8, theme['colors']['primary'], 3)
-        cv2.putText(frame, themed_word, (x - 20, word_y), cv2.FONT_HERSHEY_SIMPLEX, 
-                   0.8, (255, 255, 255), 2)
+        self.text.put_text(frame, themed_word, (x - 20, word_y), cv2.FONT_HERSHEY_SIMPLEX, 
+                          0.8, theme['colors']['primary'], 3)
+        self.text.put_text(frame, themed_word, (x - 20, word_y), cv2.FONT_HERSHEY_SIMPLEX, 
+                          0.8, (255, 255, 255), 2)
     
     def create_interactive_element(self, frame, mode, frame_num):
         """Add interactive elements like quiz questions or prompts"""
@@ -305,13 +308,13 @@ class AdvancedABCVideoGenerator:
             # Pulsing effect for attention
             pulse = int(255 * (0.7 + 0.3 * math.sin(frame_num * 0.2)))
             
-            cv2.putText(frame, "QUIZ TIME!", (70, 100), cv2.FONT_HERSHEY_SIMPLEX, 
-                       2, (pulse, pulse, 0), 6)
+            self.text.put_text(frame, "QUIZ TIME!", (70, 100), cv2.FONT_HERSHEY_SIMPLEX, 
+                              2, (pulse, pulse, 0), 6)
             
             # Sample question
             question = "What letter comes after A?"
-            cv2.putText(frame, question, (70, 140), cv2.FONT_HERSHEY_SIMPLEX, 
-                       1, (255, 255, 255), 3)
+            self.text.put_text(frame, question, (70, 140), cv2.FONT_HERSHEY_SIMPLEX, 
+                              1, (255, 255, 255), 3)
         
         elif mode == 'repeat':
             # "Repeat after me" prompt
@@ -321,8 +324,8 @@ class AdvancedABCVideoGenerator:
             cv2.rectangle(frame, (50, prompt_y - 50), (self.width - 50, prompt_y + 20), 
                          (255, 255, 255), 3)
             
-            cv2.putText(frame, "Now you say: A!", (70, prompt_y), cv2.FONT_HERSHEY_SIMPLEX, 
-                       1.5, (255, 255, 255), 4)
+            self.text.put_text(frame, "Now you say: A!", (70, prompt_y), cv2.FONT_HERSHEY_SIMPLEX, 
+                              1.5, (255, 255, 255), 4)
     
     def generate_enhanced_abc_scripts(self):
         """Generate enhanced ABC scripts with themes and interactivity"""
@@ -371,86 +374,61 @@ class AdvancedABCVideoGenerator:
             print(f"❌ Audio creation failed for {theme_name}")
             return None
         
-        # Load audio to get duration
-        audio_data, sample_rate = sf.read(str(audio_file))
-        duration = len(audio_data) / sample_rate
+        # Duration from the audio headers (no decoding)
+        duration = probe_audio(audio_file).duration
         total_frames = int(duration * self.fps)
         
         print(f"  📊 Duration: {duration:.1f}s, Frames: {total_frames}")
         
-        # Video files
+        # Video file
         video_name = f"enhanced_{theme_name}_abc.mp4"
-        temp_video = self.output_dir / f"temp_{video_name}"
         final_video = self.output_dir / video_name
         
-        # Create video
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(temp_video), fourcc, self.fps, (self.width, self.height))
-        
         print("  🎨 Creating enhanced themed animation...")
         
-        for frame_num in range(total_frames):
-            current_time = frame_num / self.fps
-            
-            if frame_num % 90 == 0:
-                progress = int((frame_num / total_frames) * 100)
-                print(f"    📹 Progress: {progress}%")
-            
-            # Create themed background
-            frame = self.create_themed_background(theme_name, frame_num, total_frames)
-            
-            # Draw title
-            cv2.putText(frame, title, (50, 80), cv2.FONT_HERSHEY_DUPLEX, 
-                       2, (255, 255, 255), 6)
-            cv2.putText(frame, title, (50, 80), cv2.FONT_HERSHEY_DUPLEX, 
-                       2, (0, 0, 0), 4)
-            
-            # Draw themed letters
-            letters_per_second = 26 / duration
-            current_letter_index = int(current_time * letters_per_second)
-            
-            if current_letter_index < 26:
-                letter = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[current_letter_index]
-                self.draw_themed_letter_display(frame, letter, theme_name, current_time, frame_num)
-            
-            # Add interactive elements occasionally
-            if frame_num % 300 < 60:  # Every 10 seconds for 2 seconds
-                self.create_interactive_element(frame, 'quiz', frame_num)
-            elif frame_num % 300 >= 240:  # Later in the cycle
-                self.create_interactive_element(frame, 'repeat', frame_num)
-            
-            out.write(frame)
-        
-        out.release()
-        
-        # Combine with audio
-        print("  🎵 Adding themed audio...")
-        ffmpeg_cmd = [
-            'ffmpeg', '-y',
-            '-i', str(temp_video),
-            '-i', str(audio_file),
-            '-c:v', 'libx264',
-            '-c:a', 'aac',
-            '-shortest',
-            str(final_video)
-        ]
-        
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            temp_video.unlink()
-            print(f"  🎊 Enhanced video created: {final_video}")
-            return str(final_video)
-        else:
-            print(f"  ❌ Error: {result.stderr}")
-            return str(temp_video)
+        # Frames and audio are encoded together in a single ffmpeg pass
+        with FFmpegVideoWriter(final_video, self.width, self.height, self.fps, audio_path=audio_file) as writer:
+            for frame_num in range(total_frames):
+                current_time = frame_num / self.fps
+                
+                if frame_num % 90 == 0:
+                    progress = int((frame_num / total_frames) * 100)
+                    print(f"    📹 Progress: {progress}%")
+                
+                # Create themed background
+                frame = self.create_themed_background(theme_name, frame_num, total_frames)
+                
+                # Draw title
+                self.text.put_text(frame, title, (50, 80), cv2.FONT_HERSHEY_DUPLEX, 
+                                  2, (255, 255, 255), 6)
+                self.text.put_text(frame, title, (50, 80), cv2.FONT_HERSHEY_DUPLEX, 
+                                  2, (0, 0, 0), 4)
+                
+                # Draw themed letters
+                letters_per_second = 26 / duration
+                current_letter_index = int(current_time * letters_per_second)
+                
+                if current_letter_index < 26:
+                    letter = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[current_letter_index]
+                    self.draw_themed_letter_display(frame, letter, theme_name, current_time, frame_num)
+                
+                # Add interactive elements occasionally
+                if frame_num % 300 < 60:  # Every 10 seconds for 2 seconds
+                    self.create_interactive_element(frame, 'quiz', frame_num)
+                elif frame_num % 300 >= 240:  # Later in the cycle
+                    self.create_interactive_element(frame, 'repeat', frame_num)
+                
+                writer.write(frame)
+        
+        print(f"  🎊 Enhanced video created: {writer.path}")
+        return str(writer.path)
     
     def create_enhanced_audio(self, text, output_file):
         """Create enhanced audio with espeak"""
         cmd = [
             'espeak',
             '-v', 'en+f3',
-            '-s', '160',
+            '-s', str(SPEECH_WORDS_PER_MINUTE),
             '-p', '50',
             '-a', '200',
             '-g', '8',
@@ -464,26 +442,29 @@ class AdvancedABCVideoGenerator:
         except:
             return False
     
-    def generate_all_enhanced_videos(self):
-        """Generate all enhanced ABC videos"""
+    def generate_all_enhanced_videos(self, max_workers=None):
+        """Generate all enhanced ABC videos (rendered in parallel)"""
         print("🌟 Creating Enhanced ABC Video Collection!")
         print("=" * 60)
         
         # Generate enhanced scripts
         scripts = self.generate_enhanced_abc_scripts()
         
-        created_videos = []
-        
+        jobs = []
         for theme_name, script_text in scripts:
             theme_title = self.themes[theme_name]['name']
-            
-            try:
-                video_path = self.create_enhanced_video(theme_name, script_text, theme_title)
-                if video_path:
-                    created_videos.append(video_path)
-                    
-            except Exception as e:
-                print(f"❌ Error creating {theme_name}: {e}")
+            jobs.append(RenderJob(
+                title=theme_title,
+                method='create_enhanced_video',
+                args=(theme_name, script_text, theme_title),
+                output_path=self.output_dir / f"enhanced_{theme_name}_abc.mp4",
+                # Narration is spoken at SPEECH_WORDS_PER_MINUTE
+                estimated_frames=int(len(script_text.split()) / SPEECH_WORDS_PER_MINUTE * 60 * self.fps)
+            ))
+        
+        # Render the collection across worker processes
+        CollectionRunner(self, max_workers=max_workers).run(jobs)
+        created_videos = [job.result for job in jobs if job.status in (DONE, SKIPPED)]
         
         print(f"\n🎊 Enhanced Video Collection Complete!")
         print(f"✅ Created {len(created_videos)} themed educational videos")
@@ -15,7 +15,13 @@ import imageio
 import random
 import math
 import os
+import shutil
 import tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import shared_memory
 from pathlib import Path
 
 # Import the new audio and animation modules
@@ -27,14 +33,361 @@ except ImportError:
     print("⚠️ Audio integration not available")
 
 try:
-    from advanced_animation import AdvancedAnimationEngine
+    from advanced_animation import AdvancedAnimationEngine, AnimationType, CHARACTER_BASE_POSITION
     ANIMATION_AVAILABLE = True
 except ImportError:
     ANIMATION_AVAILABLE = False
     print("⚠️ Advanced animation not available")
 
+try:
+    from lipsync_timeline import build_viseme_timeline
+    LIPSYNC_AVAILABLE = True
+except ImportError:
+    LIPSYNC_AVAILABLE = False
+    print("⚠️ Audio-driven lip-sync not available")
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+# Scene-parallel rendering (opt-in): generate_story_video's default, and frames per task
+PARALLEL_SCENES = os.getenv("PARALLEL_SCENES", "false").lower() == "true"
+SCENE_CHUNK_FRAMES = 15
+# Share of the free space in /dev/shm the backgrounds and output ring may take
+SHM_BUDGET_FRACTION = 0.5
+SHM_PATH = "/dev/shm"
+PARTICLE_EMOTIONS = ('joy', 'surprise')
+# Avatar animation cycle length, and the mouth's position on the resting 200x200 avatar
+AVATAR_ANIMATION_FRAMES = 8
+AVATAR_MOUTH_POSITION = (100, 140)
+
+@lru_cache(maxsize=16)
+def get_font(size=16):
+    """Load (once) the overlay font at ``size``."""
+    try:
+        return ImageFont.truetype(FONT_PATH, size)
+    except OSError:
+        return ImageFont.load_default()
+
+class PremultipliedLayer:
+    """
+    Sprite stored pre-multiplied by its alpha, cropped to its visible area.
+    Blending it into a frame is a single slice update: dst * (1 - a) + src * a.
+    """
+    
+    def __init__(self, premultiplied, alpha, offset=(0, 0)):
+        self.premultiplied = premultiplied      # (h, w, 3) float32, rgb * a
+        self.inverse_alpha = 1.0 - alpha        # (h, w, 1) float32
+        self.offset = offset                    # Position of the crop inside the source sprite
+    
+    @classmethod
+    def from_image(cls, image):
+        image = image.convert('RGBA')
+        bbox = image.getchannel('A').getbbox() or (0, 0, 1, 1)
+        rgba = np.asarray(image.crop(bbox), dtype=np.float32)
+        alpha = rgba[:, :, 3:4] / 255.0
+        return cls(rgba[:, :, :3] * alpha, alpha, (bbox[0], bbox[1]))
+    
+    def blend_into(self, frame, x, y):
+        """Alpha-blend onto an (H, W, 3) uint8 frame with the sprite's origin at (x, y)."""
+        x += self.offset[0]
+        y += self.offset[1]
+        h, w = self.inverse_alpha.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        sx, sy = x0 - x, y0 - y
+        region = frame[y0:y1, x0:x1]
+        blended = region * self.inverse_alpha[sy:sy + y1 - y0, sx:sx + x1 - x0]
+        blended += self.premultiplied[sy:sy + y1 - y0, sx:sx + x1 - x0]
+        blended += 0.5
+        region[...] = blended.astype(np.uint8)
+
+def render_text_layer(text, font, fill=(255, 255, 255), stroke_width=0, stroke_fill=(0, 0, 0)):
+    """Rasterise stroked text once into a PremultipliedLayer positioned like draw.text."""
+    left, top, right, bottom = font.getbbox(text, stroke_width=stroke_width)
+    size = (max(1, right - left), max(1, bottom - top))
+    coverage = Image.new('L', size, 0)
+    ImageDraw.Draw(coverage).text((-left, -top), text, fill=255, font=font,
+                                  stroke_width=stroke_width, stroke_fill=255)
+    fill_mask = Image.new('L', size, 0)
+    ImageDraw.Draw(fill_mask).text((-left, -top), text, fill=255, font=font)
+    
+    alpha = np.asarray(coverage, dtype=np.float32)[:, :, None] / 255.0
+    fill_alpha = np.minimum(np.asarray(fill_mask, dtype=np.float32)[:, :, None] / 255.0, alpha)
+    premultiplied = (np.asarray(fill, dtype=np.float32) * fill_alpha +
+                     np.asarray(stroke_fill, dtype=np.float32) * (alpha - fill_alpha))
+    return PremultipliedLayer(premultiplied, alpha, (left, top))
+
+class TextLayerCache:
+    """LRU of pre-rasterised text layers"""
+    
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._layers = OrderedDict()
+    
+    def get(self, text, size=16, fill=(255, 255, 255), stroke_width=0, stroke_fill=(0, 0, 0)):
+        key = (text, size, fill, stroke_width, stroke_fill)
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = render_text_layer(text, get_font(size), fill, stroke_width, stroke_fill)
+            self._layers[key] = layer
+            if len(self._layers) > self.max_entries:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(key)
+        return layer
+    
+    def draw(self, frame, xy, text, size=16, per_glyph=False, **style):
+        """
+        Blend ``text`` into ``frame`` at ``xy``.
+        
+        ``per_glyph`` composes the text from cached single-character layers,
+        for labels such as frame counters that change every frame.
+        """
+        x, y = xy
+        if not per_glyph:
+            self.get(text, size, **style).blend_into(frame, x, y)
+            return
+        font = get_font(size)
+        for ch in text:
+            if not ch.isspace():
+                self.get(ch, size, **style).blend_into(frame, int(round(x)), y)
+            x += font.getlength(ch)
+
+class SceneFrameCompositor:
+    """
+    NumPy frame compositor for one scene of generate_enhanced_video.
+    
+    Background, avatar poses and static labels are prepared once per scene;
+    each frame is blended into a reused uint8 buffer, so ``render`` returns a
+    view that is overwritten by the next call.
+    """
+    
+    def __init__(self, generator, scene_idx, scene, config, total_frames, character_name=None,
+                 avatar=None, lipsync_timeline=None, text_layers=None, background=None,
+                 scene_start_frame=0, audio_active=None):
+        self.generator = generator
+        self.width, self.height = config['width'], config['height']
+        self.fps = config['fps']
+        self.total_frames = total_frames
+        self.scene = scene
+        self.emotion = scene.get('emotion', 'neutral')
+        self.character_name = character_name
+        self.avatar = avatar
+        self.lipsync_timeline = lipsync_timeline
+        self.text_layers = text_layers or TextLayerCache()
+        
+        enable_audio = audio_active
+        if enable_audio is None:
+            enable_audio = config.get('enable_audio', True) and generator.audio_engine is not None
+        self.animate = config.get('enable_advanced_animation', True) and generator.animation_engine is not None
+        self.particles = self.animate and self.emotion in PARTICLE_EMOTIONS
+        self.scene_start_frame = scene_start_frame
+        self._next_frame = scene_start_frame
+        
+        if background is None:
+            background = np.asarray(generator.create_scene_background(scene, self.width, self.height).convert('RGB'))
+        self.background = np.asarray(background, dtype=np.uint8)
+        self.frame = np.empty_like(self.background)
+        
+        description = scene.get('description', '').lower()
+        if 'walk' in description:
+            self.animation_type = 'walk_cycle'
+        elif 'wave' in description:
+            self.animation_type = 'gesture'
+        else:
+            self.animation_type = 'facial_expression'
+        
+        # Labels that stay fixed for the whole scene
+        self.scene_text = f"Scene {scene_idx + 1}: {self.emotion}"
+        if enable_audio:
+            self.scene_text += " 🎵"
+        if self.animate:
+            self.scene_text += " 🎭"
+        
+        # Position character
+        self.char_x = self.width // 2 - 100
+        self.char_y = self.height // 2 - 100
+        self.avatar_poses = self._avatar_poses(avatar) if avatar is not None else None
+    
+    def _avatar_poses(self, avatar):
+        """
+        (layer, avatar offset, mouth offset) for each frame of the animation
+        cycle. The avatar itself moves, scales and rotates; poses that render
+        to the same size and angle share one layer.
+        """
+        width, height = avatar.size
+        motion = self.generator.avatar_animation(self.animation_type, self.emotion) if self.animate else []
+        layers = {}
+        poses = []
+        for dx, dy, scale, rotation in motion or [(0.0, 0.0, 1.0, 0.0)]:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            rotation = round(rotation, 1)
+            if (size, rotation) not in layers:
+                animated = self.generator.apply_advanced_animation(avatar, scale, rotation)
+                layers[size, rotation] = (PremultipliedLayer.from_image(animated), animated.size)
+            layer, (layer_w, layer_h) = layers[size, rotation]
+            
+            # The mouth follows the same transform about the avatar's centre
+            mouth_x = AVATAR_MOUTH_POSITION[0] - width / 2
+            mouth_y = AVATAR_MOUTH_POSITION[1] - height / 2
+            angle = math.radians(rotation)
+            cos_a, sin_a = math.cos(angle), math.sin(angle)
+            poses.append((
+                layer,
+                (round(dx + (width - layer_w) / 2), round(dy + (height - layer_h) / 2)),
+                (round(width / 2 + dx + scale * (mouth_x * cos_a + mouth_y * sin_a)),
+                 round(height / 2 + dy + scale * (mouth_y * cos_a - mouth_x * sin_a)))
+            ))
+        return poses
+    
+    def _draw_mouth(self, frame, center_x, mouth_y, viseme, openness):
+        """Draw the mouth with PIL on a small patch and write it back"""
+        x0, y0 = max(0, center_x - 32), max(0, mouth_y - 28)
+        x1, y1 = min(self.width, center_x + 32), min(self.height, mouth_y + 32)
+        if x0 >= x1 or y0 >= y1:
+            return
+        patch = Image.fromarray(frame[y0:y1, x0:x1])
+        self.generator.draw_mouth_shape(ImageDraw.Draw(patch), center_x - x0, mouth_y - y0,
+                                        viseme, self.emotion, openness)
+        frame[y0:y1, x0:x1] = np.asarray(patch)
+    
+    def prime(self, frame_idx):
+        """
+        Bring time-dependent state (particles) up to ``frame_idx`` when
+        rendering starts mid-scene, as scene-parallel workers do.
+        """
+        if frame_idx == self._next_frame or not self.particles:
+            self._next_frame = frame_idx
+            return
+        engine = self.generator.animation_engine
+        engine.reset_particles()
+        warmup = min(frame_idx - self.scene_start_frame, int(2 * self.fps))
+        for _ in range(max(0, warmup)):
+            engine.apply_particle_effect(None, 'sparkles', center=(self.width // 2, self.height // 2),
+                                         intensity=0.5, fps=self.fps)
+        self._next_frame = frame_idx
+    
+    def render(self, frame_idx, out=None):
+        """Composite frame ``frame_idx`` into ``out`` (default: the reused buffer) and return it"""
+        frame = self.frame if out is None else out
+        np.copyto(frame, self.background)
+        self._next_frame = frame_idx + 1
+        
+        if self.avatar_poses:
+            layer, (dx, dy), (mouth_x, mouth_y) = self.avatar_poses[frame_idx % len(self.avatar_poses)]
+            layer.blend_into(frame, self.char_x + dx, self.char_y + dy)
+            
+            # Animate mouth with improved lip-sync
+            if self.lipsync_timeline is not None:
+                # Audio-driven mouth movement
+                viseme = self.lipsync_timeline.viseme_at(frame_idx)
+                openness = self.lipsync_timeline.openness_at(frame_idx)
+            else:
+                # Cycle through visemes
+                visemes = ['neutral', 'open_mouth', 'smile', 'round_mouth']
+                viseme, openness = visemes[frame_idx % len(visemes)], None
+            self._draw_mouth(frame, self.char_x + mouth_x, self.char_y + mouth_y, viseme, openness)
+        
+        labels = self.text_layers
+        labels.draw(frame, (10, 10), self.scene_text, stroke_width=2)
+        labels.draw(frame, (10, self.height - 30), f"Frame {frame_idx + 1}/{self.total_frames}",
+                    per_glyph=True, stroke_width=1)
+        if self.character_name:
+            labels.draw(frame, (self.char_x, self.char_y - 25), self.character_name, stroke_width=2)
+        
+        # Add particle effects if animation engine is available
+        if self.particles:
+            try:
+                self.generator.animation_engine.apply_particle_effect(
+                    frame, 'sparkles', center=(self.width // 2, self.height // 2),
+                    intensity=0.5, fps=self.fps
+                )
+            except Exception as e:
+                print(f"⚠️ Particle effect failed: {e}")
+        
+        return frame
+
+def _create_shared_array(shape, dtype=np.uint8):
+    """Allocate an array in a new shared memory block; returns (block, array, spec for attaching)"""
+    dtype = np.dtype(dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf), (block.name, tuple(shape), dtype.str)
+
+def _share_array(array):
+    """Copy ``array`` into a new shared memory block; returns (block, spec for attaching)"""
+    block, shared, spec = _create_shared_array(array.shape, array.dtype)
+    shared[...] = array
+    return block, spec
+
+def _shm_budget():
+    """Bytes of shared memory scene-parallel rendering may use; None when unknown (no /dev/shm)"""
+    try:
+        return int(shutil.disk_usage(SHM_PATH).free * SHM_BUDGET_FRACTION)
+    except OSError:
+        return None
+
+def _attach_array(spec):
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+# Per-process state of scene-parallel workers
+_scene_worker = {}
+
+def _init_scene_worker(scenes, config, total_frames, frames_per_scene, character_name,
+                       avatar_spec, background_spec, slots_spec, lipsync_timeline, audio_active):
+    """Process pool initializer: attach the shared avatar, backgrounds and output slots once per worker"""
+    blocks = []
+    avatar = None
+    if avatar_spec is not None:
+        block, avatar_array = _attach_array(avatar_spec)
+        blocks.append(block)
+        avatar = Image.fromarray(avatar_array, 'RGBA')
+    block, backgrounds = _attach_array(background_spec)
+    blocks.append(block)
+    block, slots = _attach_array(slots_spec)
+    blocks.append(block)
+    
+    _scene_worker.update(
+        generator=AdvancedVideoGenerator(init_audio=False),
+        blocks=blocks,  # Keep the mappings alive
+        scenes=scenes, config=config, total_frames=total_frames,
+        frames_per_scene=frames_per_scene, character_name=character_name, avatar=avatar,
+        backgrounds=backgrounds, slots=slots, lipsync_timeline=lipsync_timeline, audio_active=audio_active,
+        text_layers=TextLayerCache(), compositors={}
+    )
+
+def _render_scene_chunk(scene_idx, start_frame, end_frame, slot):
+    """
+    Render frames [start_frame, end_frame) of one scene in a worker process,
+    writing them into shared output ``slot``; returns the frame count.
+    """
+    state = _scene_worker
+    compositor = state['compositors'].get(scene_idx)
+    if compositor is None:
+        compositor = SceneFrameCompositor(
+            state['generator'], scene_idx, state['scenes'][scene_idx], state['config'],
+            state['total_frames'],
+            character_name=state['character_name'],
+            avatar=state['avatar'],
+            lipsync_timeline=state['lipsync_timeline'],
+            text_layers=state['text_layers'],
+            background=state['backgrounds'][scene_idx],
+            scene_start_frame=scene_idx * state['frames_per_scene'],
+            audio_active=state['audio_active']
+        )
+        state['compositors'][scene_idx] = compositor
+    
+    compositor.prime(start_frame)
+    chunk = state['slots'][slot]
+    for i, frame_idx in enumerate(range(start_frame, end_frame)):
+        compositor.render(frame_idx, out=chunk[i])
+    return end_frame - start_frame
+
 class AdvancedVideoGenerator:
-    def __init__(self):
+    def __init__(self, init_audio=True):
         self.colors = {
             'skin_tones': [(255, 220, 177), (240, 184, 160), (198, 134, 66), (161, 102, 94)],
             'hair_colors': [(139, 69, 19), (0, 0, 0), (255, 255, 0), (165, 42, 42)],
@@ -52,7 +405,7 @@ class AdvancedVideoGenerator:
         self.audio_engine = None
         self.animation_engine = None
         
-        if AUDIO_AVAILABLE:
+        if AUDIO_AVAILABLE and init_audio:
             try:
                 self.audio_engine = AdvancedAudioEngine()
                 print("✅ Audio engine initialized")
@@ -184,59 +537,46 @@ class AdvancedVideoGenerator:
             print(f"⚠️ Failed to generate background music: {e}")
             return None
     
-    def apply_advanced_animation(self, character_img, frame_idx, animation_type, emotion='neutral'):
-        """Apply advanced animations to character."""
+    def avatar_animation(self, animation_type, emotion='neutral'):
+        """
+        One cycle of avatar motion as (dx, dy, scale, rotation) per frame,
+        relative to the avatar's resting placement; [] without an animation engine.
+        """
         if not self.animation_engine:
-            return character_img
+            return []
         
+        if animation_type == 'walk_cycle':
+            sequence_type = AnimationType.WALKING
+        elif animation_type == 'gesture':
+            sequence_type = AnimationType.GESTURING
+        else:
+            # Default idle animation
+            sequence_type = AnimationType.IDLE
         try:
-            # Create character rig for animation
-            character_center = (100, 100)  # Center of the character image
-            character_rig = self.animation_engine.generate_character_rig(
-                character_center=character_center,
-                character_size=(200, 200)
+            animation_frames = self.animation_engine.create_animation_sequence(
+                animation_type=sequence_type,
+                duration_frames=AVATAR_ANIMATION_FRAMES,
+                character_info={},
+                emotion=emotion
             )
-            
-            # Create animation sequence based on type
-            if animation_type == 'walk_cycle':
-                animation_frames = self.animation_engine.create_animation_sequence(
-                    animation_type=self.animation_engine.AnimationType.WALK,
-                    frame_count=8,
-                    emotion=emotion
-                )
-            elif animation_type == 'gesture':
-                animation_frames = self.animation_engine.create_animation_sequence(
-                    animation_type=self.animation_engine.AnimationType.WAVE,
-                    frame_count=8,
-                    emotion=emotion
-                )
-            else:
-                # Default idle animation
-                animation_frames = self.animation_engine.create_animation_sequence(
-                    animation_type=self.animation_engine.AnimationType.IDLE,
-                    frame_count=8,
-                    emotion=emotion
-                )
-            
-            # Get the current frame from the animation sequence
-            if animation_frames:
-                current_frame_idx = frame_idx % len(animation_frames)
-                keyframe = animation_frames[current_frame_idx]
-                
-                # Render the animated character
-                animated_img = self.animation_engine.render_animated_character(
-                    img=character_img,
-                    character_rig=character_rig,
-                    keyframe=keyframe
-                )
-                
-                return animated_img
-            else:
-                return character_img
-            
         except Exception as e:
             print(f"⚠️ Animation failed: {e}")
-            return character_img
+            return []
+        
+        # Keyframes are positioned for a full frame; keep only the motion around the base position
+        base_x, base_y = CHARACTER_BASE_POSITION
+        return [(keyframe.character_position[0] - base_x, keyframe.character_position[1] - base_y,
+                 keyframe.scale, keyframe.character_rotation)
+                for keyframe in animation_frames]
+    
+    def apply_advanced_animation(self, character_img, scale=1.0, rotation=0.0):
+        """Scale and rotate (degrees, counter-clockwise) the avatar about its centre."""
+        width, height = character_img.size
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        animated_img = character_img if size == (width, height) else character_img.resize(size, Image.BICUBIC)
+        if rotation:
+            animated_img = animated_img.rotate(rotation, resample=Image.BICUBIC, expand=True)
+        return animated_img
     
     def create_scene_background(self, scene_info, width, height):
         """Create background based on scene description."""
@@ -291,10 +631,13 @@ class AdvancedVideoGenerator:
         
         return img
     
-    def draw_mouth_shape(self, draw, center_x, mouth_y, viseme, emotion):
-        """Draw mouth shape based on viseme and emotion."""
+    def draw_mouth_shape(self, draw, center_x, mouth_y, viseme, emotion, openness=None):
+        """Draw mouth shape based on viseme and emotion.
+        
+        ``openness`` (0-1, from the audio lip-sync timeline) scales the mouth height.
+        """
         mouth_width = 25
-        mouth_height = 15
+        mouth_height = 15 if openness is None else max(4, int(15 * (0.4 + openness)))
         
         if viseme == 'open_mouth':
             # O shape for vowels
@@ -332,8 +675,104 @@ class AdvancedVideoGenerator:
                 center_x + mouth_width//3, mouth_y + mouth_height//4
             ], fill=(120, 120, 120), outline=(0, 0, 0), width=1)
     
-    def generate_enhanced_video(self, story_data, config):
-        """Generate enhanced video with multiple characters, scenes, audio, and animations."""
+    def _render_scenes_parallel(self, scenes, config, total_frames, frames_per_scene,
+                                character_name, avatar, lipsync_timeline, emit, workers):
+        """
+        Scene-parallel mode: fan scene frame ranges out to a process pool.
+        
+        The avatar and scene backgrounds are built once here and shared with
+        the workers through shared memory. Workers write frames into a ring
+        of shared output slots, so no pixels are pickled; slots are drained
+        in frame order into ``emit`` and then reused for the next chunk.
+        
+        The ring is shrunk (fewer frames per chunk, then fewer slots) to fit
+        the free space in /dev/shm. Returns False, having emitted nothing,
+        when the shared memory cannot be sized or created; the caller then
+        renders serially.
+        """
+        width, height = config['width'], config['height']
+        backgrounds = np.stack([
+            np.asarray(self.create_scene_background(scene, width, height).convert('RGB'), dtype=np.uint8)
+            for scene in scenes
+        ])
+        avatar_array = np.asarray(avatar.convert('RGBA'), dtype=np.uint8) if avatar is not None else None
+        
+        n_slots = workers + 2  # Keeps every worker busy while the writer drains a slot
+        chunk_frames = SCENE_CHUNK_FRAMES
+        budget = _shm_budget()
+        if budget is not None:
+            # Shared memory is committed on write: overcommitting /dev/shm crashes with SIGBUS
+            frame_bytes = width * height * 3
+            ring_frames = (budget - backgrounds.nbytes - (avatar_array.nbytes if avatar_array is not None else 0)) \
+                // frame_bytes
+            if ring_frames < 1:
+                print(f"⚠️ Not enough shared memory in {SHM_PATH} for scene-parallel rendering")
+                return False
+            chunk_frames = max(1, min(chunk_frames, ring_frames // n_slots))
+            n_slots = max(1, min(n_slots, ring_frames // chunk_frames))
+        
+        tasks = []
+        for scene_idx in range(len(scenes)):
+            scene_start = scene_idx * frames_per_scene
+            scene_end = min((scene_idx + 1) * frames_per_scene, total_frames)
+            for start in range(scene_start, scene_end, chunk_frames):
+                tasks.append((scene_idx, start, min(start + chunk_frames, scene_end)))
+        workers = max(1, min(workers, n_slots, len(tasks)))
+        
+        blocks = []
+        try:
+            try:
+                avatar_spec = None
+                if avatar_array is not None:
+                    block, avatar_spec = _share_array(avatar_array)
+                    blocks.append(block)
+                block, background_spec = _share_array(backgrounds)
+                blocks.append(block)
+                block, slots, slots_spec = _create_shared_array((n_slots, chunk_frames, height, width, 3))
+                blocks.append(block)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Shared memory for scene-parallel rendering failed ({e}); rendering serially")
+                return False
+            print(f"🧵 Rendering {len(tasks)} chunks of up to {chunk_frames} frames on {workers} processes")
+            audio_active = bool(config.get('enable_audio', True) and self.audio_engine)
+            
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_scene_worker,
+                initargs=(scenes, config, total_frames, frames_per_scene, character_name,
+                          avatar_spec, background_spec, slots_spec, lipsync_timeline, audio_active)
+            ) as executor:
+                task_iter = iter(tasks)
+                pending = deque(
+                    (executor.submit(_render_scene_chunk, *task, slot), slot)
+                    for slot, task in enumerate(islice(task_iter, n_slots))
+                )
+                rendered = 0
+                while pending:
+                    future, slot = pending.popleft()
+                    count = future.result()
+                    for frame in slots[slot, :count]:
+                        emit(frame)
+                    rendered += count
+                    next_task = next(task_iter, None)
+                    if next_task is not None:
+                        pending.append((executor.submit(_render_scene_chunk, *next_task, slot), slot))
+                    if rendered % (10 * chunk_frames) < count:
+                        print(f"   Generated frame {rendered}/{total_frames}")
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        return True
+    
+    def generate_enhanced_video(self, story_data, config, frame_writer=None):
+        """Generate enhanced video with multiple characters, scenes, audio, and animations.
+        
+        Frames are returned as a list, or, when ``frame_writer`` is given,
+        passed to it one by one in order (the returned list is then empty).
+        Set ``config['parallel_scenes']`` (and optionally ``scene_workers``)
+        to render scenes on a process pool; without enough shared memory
+        they are rendered serially instead.
+        """
         frames = []
         total_frames = int(config['fps'] * config['duration'])
         width, height = config['width'], config['height']
@@ -384,107 +823,53 @@ class AdvancedVideoGenerator:
                     voice_settings=config.get('voice_settings')
                 )
         
+        # Audio-driven lip-sync: one vectorised pass over the dialogue WAV,
+        # then a per-frame array lookup inside the render loop
+        lipsync_timeline = None
+        dialogue_audio = character_audio_paths.get(characters[0]['name']) if characters else None
+        if LIPSYNC_AVAILABLE and dialogue_audio and os.path.exists(dialogue_audio):
+            try:
+                lipsync_timeline = build_viseme_timeline(dialogue_audio, config['fps'], total_frames)
+            except Exception as e:
+                print(f"⚠️ Lip-sync analysis failed: {e}")
+        
         frames_per_scene = max(1, total_frames // len(scenes)) if scenes else total_frames
         
-        for scene_idx, scene in enumerate(scenes):
-            scene_start_frame = scene_idx * frames_per_scene
-            scene_end_frame = min((scene_idx + 1) * frames_per_scene, total_frames)
-            
-            # Create scene background
-            background = self.create_scene_background(scene, width, height)
-            scene_emotion = scene.get('emotion', 'neutral')
-            
-            for frame_idx in range(scene_start_frame, scene_end_frame):
-                # Start with background
-                frame_img = background.copy()
-                draw = ImageDraw.Draw(frame_img)
-                
-                # Add main character (if any)
-                if characters:
-                    main_char = characters[0]
-                    char_avatar = character_avatars[main_char['name']].copy()
-                    
-                    # Apply advanced animation if enabled
-                    if enable_advanced_animation and self.animation_engine:
-                        # Determine animation type based on scene
-                        if 'walk' in scene.get('description', '').lower():
-                            animation_type = 'walk_cycle'
-                        elif 'wave' in scene.get('description', '').lower():
-                            animation_type = 'gesture'
-                        else:
-                            animation_type = 'facial_expression'
-                        
-                        char_avatar = self.apply_advanced_animation(
-                            char_avatar, frame_idx, animation_type, scene_emotion
-                        )
-                    
-                    # Position character
-                    char_x = width // 2 - 100
-                    char_y = height // 2 - 100
-                    
-                    # Paste character avatar
-                    frame_img.paste(char_avatar, (char_x, char_y), char_avatar)
-                    
-                    # Animate mouth with improved lip-sync
-                    mouth_center_x = char_x + 100
-                    mouth_y = char_y + 140
-                    
-                    # More sophisticated viseme cycling
-                    if character_audio_paths.get(main_char['name']):
-                        # Audio-based mouth movement (simplified)
-                        visemes = ['neutral', 'open_mouth', 'smile', 'round_mouth', 'neutral']
-                        current_viseme = visemes[(frame_idx // 3) % len(visemes)]
-                    else:
-                        # Cycle through visemes
-                        visemes = ['neutral', 'open_mouth', 'smile', 'round_mouth']
-                        current_viseme = visemes[frame_idx % len(visemes)]
-                    
-                    self.draw_mouth_shape(draw, mouth_center_x, mouth_y, current_viseme, scene_emotion)
-                
-                # Add scene text
-                try:
-                    font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 16)
-                except:
-                    font = ImageFont.load_default()
-                
-                # Scene info with enhanced details
-                scene_text = f"Scene {scene_idx + 1}: {scene.get('emotion', 'neutral')}"
-                if enable_audio and self.audio_engine:
-                    scene_text += " 🎵"
-                if enable_advanced_animation and self.animation_engine:
-                    scene_text += " 🎭"
-                    
-                draw.text((10, 10), scene_text, fill=(255, 255, 255), font=font, stroke_width=2, stroke_fill=(0, 0, 0))
-                
-                # Frame counter
-                frame_text = f"Frame {frame_idx + 1}/{total_frames}"
-                draw.text((10, height - 30), frame_text, fill=(255, 255, 255), font=font, stroke_width=1, stroke_fill=(0, 0, 0))
-                
-                # Character name
-                if characters:
-                    char_name = characters[0]['name']
-                    draw.text((char_x, char_y - 25), char_name, fill=(255, 255, 255), font=font, stroke_width=2, stroke_fill=(0, 0, 0))
-                
-                # Add particle effects if animation engine is available
-                if enable_advanced_animation and self.animation_engine and scene_emotion in ['joy', 'surprise']:
-                    try:
-                        # Add simple particle overlay
-                        frame_img = self.animation_engine.create_particle_effect(
-                            img=frame_img, 
-                            effect_type='sparkles',
-                            intensity=0.5,
-                            center=(width//2, height//2)
-                        )
-                    except Exception as e:
-                        print(f"⚠️ Particle effect failed: {e}")
-                        pass  # Fail silently if particle effects don't work
-                
-                # Convert to numpy array
-                frame_array = np.array(frame_img)
-                frames.append(frame_array)
-                
-                if frame_idx % 10 == 0:
-                    print(f"   Generated frame {frame_idx + 1}/{total_frames}")
+        def emit(frame):
+            if frame_writer is not None:
+                frame_writer(frame)
+            else:
+                frames.append(frame.copy())
+        
+        scene_workers = 1
+        if config.get('parallel_scenes'):
+            scene_workers = config.get('scene_workers') or os.cpu_count() or 1
+        
+        main_char = characters[0]['name'] if characters else None
+        rendered_parallel = False
+        if scene_workers > 1 and scenes:
+            rendered_parallel = self._render_scenes_parallel(
+                scenes, config, total_frames, frames_per_scene, main_char,
+                character_avatars.get(main_char), lipsync_timeline, emit, scene_workers
+            )
+        if not rendered_parallel:
+            # Static layers prepared once per scene, frames blended into a reused buffer
+            text_layers = TextLayerCache()
+            for scene_idx, scene in enumerate(scenes):
+                scene_start_frame = scene_idx * frames_per_scene
+                scene_end_frame = min((scene_idx + 1) * frames_per_scene, total_frames)
+                compositor = SceneFrameCompositor(
+                    self, scene_idx, scene, config, total_frames,
+                    character_name=main_char,
+                    avatar=character_avatars.get(main_char),
+                    lipsync_timeline=lipsync_timeline,
+                    text_layers=text_layers,
+                    scene_start_frame=scene_start_frame
+                )
+                for frame_idx in range(scene_start_frame, scene_end_frame):
+                    emit(compositor.render(frame_idx))
+                    if frame_idx % 10 == 0:
+                        print(f"   Generated frame {frame_idx + 1}/{total_frames}")
         
         # Store audio paths for later use
         if background_music_path or character_audio_paths:
@@ -498,8 +883,11 @@ class AdvancedVideoGenerator:
     
     def generate_story_video(self, script, characters, scenes, output_path, 
                            width=640, height=480, fps=24, duration=5, style_settings=None,
-                           audio_settings=None, animation_settings=None):
-        """Generate a story video with the given parameters including audio and animation."""
+                           audio_settings=None, animation_settings=None, preset='medium'):
+        """Generate a story video with the given parameters including audio and animation.
+        
+        ``preset`` is the x264 preset of the encode ('ultrafast' for previews).
+        """
         print(f"🎬 Generating story video: {output_path}")
         
         # Prepare story data in the expected format
@@ -522,13 +910,22 @@ class AdvancedVideoGenerator:
             'voice_settings': audio_settings.get('voice_settings') if audio_settings else None,
             # Animation settings
             'enable_advanced_animation': animation_settings.get('enable_advanced_animation', True) if animation_settings else True,
+            # Scenes on a process pool only when asked for (PARALLEL_SCENES or style_settings)
+            'parallel_scenes': PARALLEL_SCENES,
         }
         
         if style_settings:
             config.update(style_settings)
         
-        # Generate frames using enhanced method
-        frames = self.generate_enhanced_video(story_data, config)
+        # Stream frames straight into the encoder instead of holding them all
+        # in memory; audio is muxed in afterwards if any was generated
+        base_path, extension = os.path.splitext(output_path)
+        temp_video_path = f"{base_path}_temp{extension or '.mp4'}"
+        writer = imageio.get_writer(temp_video_path, fps=fps, quality=8, output_params=['-preset', preset])
+        try:
+            self.generate_enhanced_video(story_data, config, frame_writer=writer.append_data)
+        finally:
+            writer.close()
         
         # Save video with audio integration
         try:
@@ -537,12 +934,6 @@ class AdvancedVideoGenerator:
             background_music_path = generated_audio.get('background_music')
             
             if background_music_path and os.path.exists(background_music_path) and self.audio_engine:
-                # Create video with audio
-                temp_video_path = output_path.replace('.mp4', '_temp.mp4')
-                
-                # Save video without audio first
-                imageio.mimsave(temp_video_path, frames, fps=fps, quality=8)
-                
                 # Combine video with audio using the audio engine
                 final_path = self.audio_engine.mix_audio_with_video(
                     video_path=temp_video_path,
@@ -551,22 +942,21 @@ class AdvancedVideoGenerator:
                     output_path=output_path
                 )
                 
-                # Clean up temporary files
-                if os.path.exists(temp_video_path):
-                    os.remove(temp_video_path)
-                
                 if final_path and os.path.exists(final_path):
                     print(f"✅ Story video with audio saved: {output_path}")
                 else:
                     # Fallback to video without audio
-                    imageio.mimsave(output_path, frames, fps=fps, quality=8)
+                    os.replace(temp_video_path, output_path)
                     print(f"✅ Story video saved (audio failed): {output_path}")
             else:
                 # Save video without audio
-                imageio.mimsave(output_path, frames, fps=fps, quality=8)
+                os.replace(temp_video_path, output_path)
                 print(f"✅ Story video saved: {output_path}")
             
-            import os
+            # Clean up temporary files
+            if os.path.exists(temp_video_path):
+                os.remove(temp_video_path)
+            
             if os.path.exists(output_path):
                 file_size = os.path.getsize(output_path)
                 print(f"📁 File size: {file_size:,} bytes")
@@ -9,9 +9,13 @@ import numpy as np
 import soundfile as sf
 from pathlib import Path
 import math
-import subprocess
 import os
 import re
+from collection_runner import CollectionRunner, RenderJob, DONE, SKIPPED, estimate_frames
+from layer_compositor import TileGridLayer
+from video_writer import FFmpegVideoWriter
+from text_cache import TextStampCache
+from letter_timing import LetterTimeline
 
 class FinalABCVideoGenerator:
     """Generate videos with clear ABC voices and lyrics display"""
@@ -25,6 +29,10 @@ class FinalABCVideoGenerator:
         self.width = 1920
         self.height = 1080
         self.fps = 30
+        self.text = TextStampCache()
+        
+        # Cached alphabet grid: tiles rasterised once per state
+        self.grid_layer = TileGridLayer(self._draw_grid_tile, self._grid_positions(), tile_radius=120)
         
         # Colors (BGR format for OpenCV)
         self.colors = {
@@ -83,8 +91,16 @@ class FinalABCVideoGenerator:
             }
         ]
     
-    def extract_letters_from_audio_time(self, current_time, audio_duration):
-        """Estimate which letters are being spoken based on time"""
+    def extract_letters_from_audio_time(self, current_time, audio_duration, timeline=None):
+        """Index of the letter being spoken at ``current_time``
+        
+        With a ``LetterTimeline`` (letter onsets detected in the audio) this
+        is a binary search over the onset index; otherwise it falls back to
+        spreading the alphabet evenly over the audio.
+        """
+        if timeline is not None:
+            return timeline.letters_spoken(current_time)
+        
         # Simple estimation: alphabet is spoken roughly evenly throughout
         alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
         
@@ -152,7 +168,7 @@ class FinalABCVideoGenerator:
         # Main title
         title_size = 2.2
         title_thickness = 5
-        (text_width, text_height), _ = cv2.getTextSize(title, font, title_size, title_thickness)
+        (text_width, text_height), _ = self.text.get_text_size(title, font, title_size, title_thickness)
         title_x = (self.width - text_width) // 2
         title_y = 100
         
@@ -168,83 +184,96 @@ class FinalABCVideoGenerator:
                      self.colors['primary'], 3)
         
         # Title text
-        cv2.putText(frame, title, (title_x, title_y), font, title_size, 
-                   self.colors['text'], title_thickness)
+        self.text.put_text(frame, title, (title_x, title_y), font, title_size, 
+                          self.colors['text'], title_thickness)
         
         # Subtitle
         if subtitle:
             sub_size = 1.0
             sub_thickness = 2
-            (sub_width, sub_height), _ = cv2.getTextSize(subtitle, font, sub_size, sub_thickness)
+            (sub_width, sub_height), _ = self.text.get_text_size(subtitle, font, sub_size, sub_thickness)
             sub_x = (self.width - sub_width) // 2
             sub_y = title_y + 50
             
-            cv2.putText(frame, subtitle, (sub_x, sub_y), font, sub_size, 
-                       self.colors['secondary'], sub_thickness)
+            self.text.put_text(frame, subtitle, (sub_x, sub_y), font, sub_size, 
+                              self.colors['secondary'], sub_thickness)
         
         return frame
     
-    def draw_alphabet_grid_with_highlight(self, frame, letters_spoken, current_time, audio_duration):
-        """Draw alphabet grid with progressive highlighting"""
-        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        
+    def _grid_positions(self):
+        """Alphabet grid tile centres (None for tiles that fall off screen)"""
         # Grid layout
         cols = 6
-        rows = 5
         start_x = 200
         start_y = 250
         spacing_x = 260
         spacing_y = 140
         
-        for i, letter in enumerate(alphabet):
-            col = i % cols
-            row = i // cols
-            x = start_x + col * spacing_x
-            y = start_y + row * spacing_y
+        positions = []
+        for i in range(26):
+            x = start_x + (i % cols) * spacing_x
+            y = start_y + (i // cols) * spacing_y
             
             # Skip if position is out of bounds
             if x > self.width - 150 or y > self.height - 150:
-                continue
-            
-            # Determine letter state
-            if i < letters_spoken:
-                # Already spoken - show as completed
-                bg_color = self.colors['green']
-                text_color = self.colors['white']
-                border_color = self.colors['accent']
-                size = 75
-                pulse = 0
-            elif i == letters_spoken:
-                # Currently being spoken - animate
-                pulse = abs(math.sin(current_time * 8)) * 20
-                bg_color = self.colors['highlight']
-                text_color = self.colors['text']
-                border_color = self.colors['red']
-                size = int(80 + pulse)
+                positions.append(None)
             else:
-                # Not yet spoken
-                bg_color = self.colors['white']
-                text_color = self.colors['text']
-                border_color = self.colors['text']
-                size = 70
-                pulse = 0
-            
-            # Draw letter background
-            cv2.circle(frame, (x, y), size, bg_color, -1)
-            cv2.circle(frame, (x, y), size, border_color, 4)
-            
-            # Draw the letter
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_size = 2.5
-            font_thickness = 6
-            
-            (text_width, text_height), _ = cv2.getTextSize(letter, font, font_size, font_thickness)
-            text_x = x - text_width // 2
-            text_y = y + text_height // 2
-            
-            cv2.putText(frame, letter, (text_x, text_y), font, font_size, text_color, font_thickness)
+                positions.append((x, y))
+        return positions
+    
+    def draw_alphabet_grid_with_highlight(self, frame, letters_spoken, current_time, audio_duration):
+        """Draw alphabet grid with progressive highlighting
+        
+        Completed and pending letters come from a cached layer rebuilt only
+        when ``letters_spoken`` changes; the pulsing current letter is the
+        only tile drawn per frame, as a dirty rectangle.
+        """
+        states = tuple('done' if i < letters_spoken else 'pending' for i in range(26))
+        if 0 <= letters_spoken < 26:
+            # Currently being spoken - animate
+            pulse = abs(math.sin(current_time * 8)) * 20
+            return self.grid_layer.blit(frame, states, dirty_index=letters_spoken,
+                                        dirty_state=('current', int(80 + pulse)))
+        return self.grid_layer.blit(frame, states)
+    
+    def _draw_grid_tile(self, canvas, index, state, x, y):
+        """Draw one alphabet grid letter; ``state`` is 'done', 'pending' or ('current', size)"""
+        letter = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[index]
+        
+        # Determine letter state
+        if state == 'done':
+            # Already spoken - show as completed
+            bg_color = self.colors['green']
+            text_color = self.colors['white']
+            border_color = self.colors['accent']
+            size = 75
+        elif state == 'pending':
+            # Not yet spoken
+            bg_color = self.colors['white']
+            text_color = self.colors['text']
+            border_color = self.colors['text']
+            size = 70
+        else:
+            # Currently being spoken
+            bg_color = self.colors['highlight']
+            text_color = self.colors['text']
+            border_color = self.colors['red']
+            size = state[1]
+        
+        # Draw letter background
+        cv2.circle(canvas, (x, y), size, bg_color, -1)
+        cv2.circle(canvas, (x, y), size, border_color, 4)
+
+        # Draw the letter
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        font_size = 2.5
+        font_thickness = 6
+
+        (text_width, text_height), _ = self.text.get_text_size(letter, font, font_size, font_thickness)
+        text_x = x - text_width // 2
+        text_y = y + text_height // 2
         
-        return frame
+        self.text.put_text(canvas, letter, (text_x, text_y), font, font_size, text_color, font_thickness)
     
     def draw_progress_and_lyrics(self, frame, current_time, audio_duration, character_type):
         """Draw progress bar and current context"""
@@ -273,17 +302,17 @@ class FinalABCVideoGenerator:
         # Time display
         time_text = f"{current_time:.1f}s / {audio_duration:.1f}s"
         font = cv2.FONT_HERSHEY_SIMPLEX
-        cv2.putText(frame, time_text, (progress_x, progress_y - 10), font, 0.8, 
-                   self.colors['text'], 2)
+        self.text.put_text(frame, time_text, (progress_x, progress_y - 10), font, 0.8, 
+                          self.colors['text'], 2)
         
         # Character context
         context_text = f"🎤 {character_type.replace('_', ' ').title()} speaking..."
-        (ctx_width, ctx_height), _ = cv2.getTextSize(context_text, font, 1.0, 2)
+        (ctx_width, ctx_height), _ = self.text.get_text_size(context_text, font, 1.0, 2)
         ctx_x = (self.width - ctx_width) // 2
         ctx_y = progress_y + 60
         
-        cv2.putText(frame, context_text, (ctx_x, ctx_y), font, 1.0, 
-                   self.colors['secondary'], 2)
+        self.text.put_text(frame, context_text, (ctx_x, ctx_y), font, 1.0, 
+                          self.colors['secondary'], 2)
         
         return frame
     
@@ -304,101 +333,86 @@ class FinalABCVideoGenerator:
             audio_duration = len(audio_data) / sample_rate
             total_frames = int(audio_duration * self.fps)
             
+            # Letter onsets detected once over the whole file
+            timeline = LetterTimeline.from_audio(audio_data, sample_rate)
+            
             print(f"⏱️  Audio duration: {audio_duration:.1f} seconds")
+            print(f"🔤 Letter timing: {'detected from audio' if timeline.detected else 'evenly spaced'}")
             print(f"🎬 Generating {total_frames} frames...")
             
         except Exception as e:
             print(f"❌ Error reading audio: {e}")
             return None
         
-        # Create video writer
+        # Output files
         video_filename = f"abc_final_{config['character_type']}.mp4"
         video_path = self.output_dir / video_filename
-        
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(str(video_path), fourcc, self.fps, (self.width, self.height))
-        
-        # Generate frames
-        for frame_num in range(total_frames):
-            current_time = frame_num / self.fps
-            
-            # Create themed background
-            frame = self.create_themed_background(frame_num, config['background_theme'])
-            
-            # Add title and subtitle
-            frame = self.draw_title_and_subtitle(frame, config['title'], config['subtitle'])
-            
-            # Calculate which letters have been spoken
-            letters_spoken = self.extract_letters_from_audio_time(current_time, audio_duration)
-            
-            # Draw alphabet grid
-            frame = self.draw_alphabet_grid_with_highlight(frame, letters_spoken, current_time, audio_duration)
-            
-            # Draw progress and context
-            frame = self.draw_progress_and_lyrics(frame, current_time, audio_duration, config['character_type'])
-            
-            # Write frame
-            video_writer.write(frame)
-            
-            # Progress reporting
-            if frame_num % 90 == 0:  # Every 3 seconds
-                progress_pct = (frame_num / total_frames) * 100
-                print(f"📹 Progress: {progress_pct:.1f}% ({frame_num}/{total_frames} frames)")
-        
-        video_writer.release()
-        print(f"✅ Video created: {video_path}")
-        
-        # Combine with audio
         final_video_path = self.output_dir / f"abc_final_{config['character_type']}_with_audio.mp4"
         
-        try:
-            print("🎬 Combining video with audio...")
-            subprocess.run([
-                'ffmpeg', '-y', '-loglevel', 'quiet',
-                '-i', str(video_path),
-                '-i', str(audio_file),
-                '-c:v', 'copy',
-                '-c:a', 'aac',
-                '-shortest',
-                str(final_video_path)
-            ], check=True)
-            
-            print(f"✅ Final video: {final_video_path}")
-            
-            # Clean up video-only file
-            if video_path.exists():
-                video_path.unlink()
-            
-            return str(final_video_path)
-            
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error combining audio: {e}")
-            return str(video_path)
+        # Generate frames, encoding them together with the audio in a single ffmpeg pass
+        with FFmpegVideoWriter(final_video_path, self.width, self.height, self.fps,
+                               audio_path=audio_file, fallback_path=video_path) as writer:
+            for frame_num in range(total_frames):
+                current_time = frame_num / self.fps
+                
+                # Create themed background
+                frame = self.create_themed_background(frame_num, config['background_theme'])
+                
+                # Add title and subtitle
+                frame = self.draw_title_and_subtitle(frame, config['title'], config['subtitle'])
+                
+                # Calculate which letters have been spoken
+                letters_spoken = self.extract_letters_from_audio_time(current_time, audio_duration, timeline)
+                
+                # Draw alphabet grid
+                frame = self.draw_alphabet_grid_with_highlight(frame, letters_spoken, current_time, audio_duration)
+                
+                # Draw progress and context
+                frame = self.draw_progress_and_lyrics(frame, current_time, audio_duration, config['character_type'])
+                
+                # Write frame
+                writer.write(frame)
+                
+                # Progress reporting
+                if frame_num % 90 == 0:  # Every 3 seconds
+                    progress_pct = (frame_num / total_frames) * 100
+                    print(f"📹 Progress: {progress_pct:.1f}% ({frame_num}/{total_frames} frames)")
+        
+        print(f"✅ Final video: {writer.path}")
+        return str(writer.path)
     
-    def generate_final_abc_videos(self):
-        """Generate all final ABC videos with clear voices"""
+    def generate_final_abc_videos(self, max_workers=None):
+        """Generate all final ABC videos with clear voices (rendered in parallel)"""
         print("🎥 Final ABC Video Generator - Clear Voices Edition")
         print("=" * 70)
         print("✨ Real spoken alphabet with synchronized visuals")
         print()
         
-        videos_created = []
-        
-        for i, config in enumerate(self.video_configs, 1):
-            print(f"🎬 Creating Video {i}/{len(self.video_configs)}")
-            try:
-                video_path = self.create_abc_video_with_clear_voice(config)
-                if video_path:
-                    videos_created.append({
-                        'path': video_path,
-                        'title': config['title'],
-                        'subtitle': config['subtitle'],
-                        'character': config['character_type']
-                    })
-                print()  # Blank line
-                
-            except Exception as e:
-                print(f"❌ Error creating {config['title']}: {e}")
+        queued = []
+        for config in self.video_configs:
+            audio_file = self.audio_dir / config['audio_file']
+            if not audio_file.exists():
+                print(f"❌ Audio file not found: {audio_file}")
+                continue
+            queued.append((config, RenderJob(
+                title=config['title'],
+                method='create_abc_video_with_clear_voice',
+                args=(config,),
+                output_path=self.output_dir / f"abc_final_{config['character_type']}_with_audio.mp4",
+                inputs=(audio_file,),
+                estimated_frames=estimate_frames(audio_file, self.fps)
+            )))
+        
+        # Render the collection across worker processes
+        CollectionRunner(self, max_workers=max_workers).run([job for _, job in queued])
+        
+        videos_created = [{
+            'path': job.result,
+            'title': config['title'],
+            'subtitle': config['subtitle'],
+            'character': config['character_type']
+        } for config, job in queued if job.status in (DONE, SKIPPED)]
+        print()
         
         print("🎉 Final ABC Video Collection Complete!")
         print("=" * 70)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Frame-range Sharding for long cv2 videos
+- [0, total_frames) split into contiguous ranges, one per worker process
+- Each range rendered by a pure per-frame function and encoded as a closed-GOP segment
+- Segments joined losslessly by stream copy, with the audio muxed in the same pass
+- Any shard or join failure falls back to one single-pass render in this process
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from video_writer import CLOSED_GOP_ARGS, FFmpegVideoWriter, VideoWriterError, concat_segments, ffmpeg_available
+
+# Below this many frames per shard, process start-up outweighs the gain
+MIN_FRAMES_PER_SHARD = 300
+
+def shard_ranges(total_frames: int, shards: int) -> List[Tuple[int, int]]:
+    """Split [0, total_frames) into ``shards`` contiguous, near-equal ranges"""
+    shards = max(1, min(shards, total_frames))
+    bounds = [total_frames * i // shards for i in range(shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(shards) if bounds[i] < bounds[i + 1]]
+
+def default_shards(total_frames: int) -> int:
+    """
+    Shard count for a video rendered from this process.
+
+    Inside a worker process (e.g. a collection runner) the answer is 1, so
+    pools are never nested.
+    """
+    if multiprocessing.parent_process() is not None or not ffmpeg_available():
+        return 1
+    return max(1, min(os.cpu_count() or 1, total_frames // MIN_FRAMES_PER_SHARD))
+
+# Per-process generator instance, created once by the pool initializer
+_shard_generator = None
+
+def _init_shard_worker(generator_class):
+    global _shard_generator
+    _shard_generator = generator_class()
+
+def encoder_threads(shards: int) -> int:
+    """x264 threads per shard, so the shards' encoders together use about one per core"""
+    return max(1, (os.cpu_count() or 1) // max(1, shards))
+
+def _render_shard(method: str, args: Tuple, start: int, end: int, segment_path: str,
+                  width: int, height: int, fps: float, threads: int) -> str:
+    render_frame = getattr(_shard_generator, method)
+    began = time.time()
+    video_args = CLOSED_GOP_ARGS + ('-threads', str(threads))
+    with FFmpegVideoWriter(segment_path, width, height, fps, video_args=video_args) as writer:
+        for frame_num in range(start, end):
+            writer.write(render_frame(frame_num, *args))
+    print(f"    🧩 Frames {start}-{end - 1} rendered in {time.time() - began:.1f}s")
+    return segment_path
+
+def render_sharded(generator, method: str, args: Tuple, total_frames: int, output_path,
+                   audio_path=None, shards: Optional[int] = None) -> Path:
+    """
+    Render ``generator.<method>(frame_num, *args)`` for every frame across processes.
+
+    The per-frame method must be a pure function of its arguments; each
+    worker builds its own generator with ``type(generator)()``. If a shard
+    or the join fails, the video is rendered again in a single pass here.
+
+    Returns:
+        Path: The file written (``writer.path`` of the single-pass fallback)
+    """
+    output_path = Path(output_path)
+    ranges = shard_ranges(total_frames, shards or default_shards(total_frames))
+    threads = encoder_threads(len(ranges))
+    print(f"  🧩 Rendering {total_frames} frames in {len(ranges)} shards")
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='shards_', dir=output_path.parent) as segment_dir:
+            segments = [str(Path(segment_dir) / f"segment_{i:03d}.mp4") for i in range(len(ranges))]
+            with ProcessPoolExecutor(max_workers=len(ranges), initializer=_init_shard_worker,
+                                     initargs=(type(generator),)) as pool:
+                futures = [pool.submit(_render_shard, method, args, start, end, segment,
+                                       generator.width, generator.height, generator.fps, threads)
+                           for (start, end), segment in zip(ranges, segments)]
+                for future in futures:
+                    future.result()
+            return concat_segments(segments, output_path, audio_path=audio_path)
+    except (VideoWriterError, BrokenProcessPool) as e:
+        print(f"  ⚠️ Sharded render failed ({e}); rendering in a single pass")
+        return render_single_pass(generator, method, args, total_frames, output_path, audio_path)
+
+def render_single_pass(generator, method: str, args: Tuple, total_frames: int, output_path,
+                       audio_path=None) -> Path:
+    """Render every frame in this process with one ffmpeg pass (video and audio together)"""
+    render_frame = getattr(generator, method)
+    with FFmpegVideoWriter(output_path, generator.width, generator.height, generator.fps,
+                           audio_path=audio_path) as writer:
+        for frame_num in range(total_frames):
+            writer.write(render_frame(frame_num, *args))
+    return writer.path
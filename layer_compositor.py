@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Layered Compositor for the cv2 ABC generators
+- Sprites rasterised once from the existing cv2 draw code (opaque pixels + mask)
+- Alphabet-grid layer cached per tile-state combination
+- Per-frame work reduced to masked slice copies of cached layers and dirty rectangles
+"""
+
+import cv2
+import numpy as np
+
+class Sprite:
+    """Opaque pixels with a coverage mask, positioned at (x, y) in frame coordinates"""
+
+    __slots__ = ('pixels', 'mask', 'x', 'y')
+
+    def __init__(self, pixels: np.ndarray, mask: np.ndarray, x: int, y: int):
+        self.pixels = pixels  # (h, w, 3) uint8
+        self.mask = mask      # (h, w) uint8, non-zero where opaque
+        self.x = x
+        self.y = y
+
+    @property
+    def rect(self):
+        """(x0, y0, x1, y1) in frame coordinates"""
+        h, w = self.mask.shape
+        return self.x, self.y, self.x + w, self.y + h
+
+    def blit(self, frame: np.ndarray, rect=None) -> np.ndarray:
+        """Copy the sprite's opaque pixels into ``frame``, optionally only inside ``rect``"""
+        x0, y0, x1, y1 = self.rect
+        if rect is not None:
+            x0, y0 = max(x0, rect[0]), max(y0, rect[1])
+            x1, y1 = min(x1, rect[2]), min(y1, rect[3])
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, frame.shape[1]), min(y1, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return frame
+        sx, sy = x0 - self.x, y0 - self.y
+        # cv2.copyTo writes straight into the frame view and is far faster
+        # than a NumPy masked copy
+        cv2.copyTo(self.pixels[sy:sy + y1 - y0, sx:sx + x1 - x0],
+                   self.mask[sy:sy + y1 - y0, sx:sx + x1 - x0], frame[y0:y1, x0:x1])
+        return frame
+
+EMPTY_SPRITE = Sprite(np.zeros((0, 0, 3), dtype=np.uint8), np.zeros((0, 0), dtype=np.uint8), 0, 0)
+
+def rasterize(draw, x0: int, y0: int, width: int, height: int) -> Sprite:
+    """
+    Rasterise ``draw(canvas, dx, dy)`` into a sprite covering the given box.
+
+    ``draw`` must add (dx, dy) to the frame coordinates it draws at. It is run
+    on a black and on a white canvas: pixels that come out identical in both
+    are the ones it painted.
+    """
+    canvases = []
+    for fill in (0, 255):
+        canvas = np.full((height, width, 3), fill, dtype=np.uint8)
+        draw(canvas, -x0, -y0)
+        canvases.append(canvas)
+    mask = np.all(canvases[0] == canvases[1], axis=2).astype(np.uint8)
+
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if len(rows) == 0:
+        return EMPTY_SPRITE
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return Sprite(canvases[0][r0:r1, c0:c1].copy(), mask[r0:r1, c0:c1].copy(), x0 + c0, y0 + r0)
+
+def composite(sprites) -> Sprite:
+    """Flatten sprites (later ones on top) into a single sprite"""
+    sprites = [s for s in sprites if s.mask.size]
+    if not sprites:
+        return EMPTY_SPRITE
+    x0 = min(s.x for s in sprites)
+    y0 = min(s.y for s in sprites)
+    x1 = max(s.rect[2] for s in sprites)
+    y1 = max(s.rect[3] for s in sprites)
+    pixels = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+    for s in sprites:
+        h, w = s.mask.shape
+        region = (slice(s.y - y0, s.y - y0 + h), slice(s.x - x0, s.x - x0 + w))
+        cv2.copyTo(s.pixels, s.mask, pixels[region])
+        mask[region] |= s.mask
+    return Sprite(pixels, mask, x0, y0)
+
+class TileGridLayer:
+    """
+    Cached layer of grid tiles (e.g. alphabet letters).
+
+    Each tile is rasterised once per state with ``draw_tile(canvas, index,
+    state, x, y)``. The flattened grid is rebuilt only when the tuple of tile
+    states changes; one "dirty" tile (e.g. a pulsing letter) can be drawn per
+    frame on top, with later tiles restored inside its rectangle only.
+    """
+
+    def __init__(self, draw_tile, positions, tile_radius: int):
+        """
+        Args:
+            draw_tile: Draws tile ``index`` in ``state`` centred at (x, y)
+            positions: Tile centres in draw order (None hides a tile)
+            tile_radius: Half-size of the box each tile is rasterised in
+        """
+        self.draw_tile = draw_tile
+        self.positions = list(positions)
+        self.tile_radius = tile_radius
+        self._tiles = {}
+        self._layer_key = None
+        self._layer = EMPTY_SPRITE
+        self._above = EMPTY_SPRITE
+
+    def tile(self, index: int, state) -> Sprite:
+        """Pre-rasterised sprite of one tile in one state"""
+        key = (index, state)
+        sprite = self._tiles.get(key)
+        if sprite is None:
+            position = self.positions[index]
+            if position is None:
+                sprite = EMPTY_SPRITE
+            else:
+                x, y = position
+                r = self.tile_radius
+                sprite = rasterize(lambda canvas, dx, dy: self.draw_tile(canvas, index, state, x + dx, y + dy),
+                                   x - r, y - r, 2 * r + 1, 2 * r + 1)
+            self._tiles[key] = sprite
+        return sprite
+
+    def blit(self, frame: np.ndarray, states, dirty_index: int = None, dirty_state=None) -> np.ndarray:
+        """
+        Draw the grid with per-tile ``states`` (None hides a tile).
+
+        The tile at ``dirty_index`` is left out of the cached layer and drawn
+        fresh in ``dirty_state``.
+        """
+        key = (tuple(states), dirty_index)
+        if key != self._layer_key:
+            visible = [i for i, state in enumerate(states)
+                       if state is not None and i != dirty_index]
+            self._layer = composite(self.tile(i, states[i]) for i in visible)
+            self._above = composite(self.tile(i, states[i]) for i in visible
+                                    if dirty_index is not None and i > dirty_index)
+            self._layer_key = key
+
+        self._layer.blit(frame)
+        if dirty_index is not None:
+            dirty = self.tile(dirty_index, dirty_state)
+            dirty.blit(frame)
+            # Tiles drawn after the dirty one stay on top of it
+            self._above.blit(frame, rect=dirty.rect)
+        return frame
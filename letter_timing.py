@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Letter Timing Index for the spoken-alphabet generators
+- Spectral-flux onset detection over the whole song in one vectorised pass
+- Sorted timestamp index of letter onsets; each frame finds its letter with np.searchsorted
+- Falls back to even spacing over the song when too few clear onsets are found, or
+  when the detected letters are paced or placed implausibly
+"""
+
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# STFT used for the onset envelope
+FRAME_SIZE = 1024
+HOP_SIZE = 256
+# Analysis frames per FFT batch (bounds memory on long songs)
+BATCH_FRAMES = 2048
+# Voice band the flux is summed over; higher bins mostly carry noise and sibilance
+SPEECH_BAND_HZ = 4000
+# Onsets closer than this fraction of the average letter spacing belong to one letter
+MIN_GAP_FRACTION = 0.4
+# Peaks weaker than this fraction of the 98th-percentile peak are noise
+PEAK_FLOOR = 0.4
+# Letter alignment cost weights (the pacing term has weight 1). Skipping a
+# second onset inside a letter must stay cheaper than the ~0.25 pace penalty
+# of landing on it, or the path locks onto half the letter spacing
+POSITION_WEIGHT = 0.003
+STRENGTH_WEIGHT = 0.1
+SKIP_WEIGHT = 0.1
+ALIGN_PASSES = 2
+# Aligned letters are only trusted if their median spacing and total span are
+# within this fraction of the even estimate's...
+PACE_TOLERANCE = 0.3
+# ...and every onset is within this many letter spacings of its even-spacing time
+MAX_ONSET_SHIFT = 0.75
+
+def intro_outro_times(audio_duration: float):
+    """Spoken intro and outro around the alphabet: 10% of the song, at most 2 seconds each"""
+    return min(2.0, audio_duration * 0.1), min(2.0, audio_duration * 0.1)
+
+def spectral_flux(audio: np.ndarray, sample_rate: int, frame_size: int = FRAME_SIZE,
+                  hop_size: int = HOP_SIZE):
+    """
+    Onset strength envelope of ``audio``.
+
+    Returns (times, flux): analysis frame centres in seconds and the summed
+    positive change of the log-magnitude spectrum (speech band only) from
+    the previous frame.
+    """
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    audio = np.asarray(audio, dtype=np.float32)
+    if len(audio) < frame_size:
+        return np.zeros(0), np.zeros(0)
+
+    frames = np.lib.stride_tricks.sliding_window_view(audio, frame_size)[::hop_size]
+    window = np.hanning(frame_size).astype(np.float32)
+    bins = min(frame_size // 2 + 1, int(SPEECH_BAND_HZ * frame_size / sample_rate) + 1)
+    magnitude = np.empty((len(frames), bins), dtype=np.float32)
+    for start in range(0, len(frames), BATCH_FRAMES):
+        batch = frames[start:start + BATCH_FRAMES] * window
+        magnitude[start:start + BATCH_FRAMES] = np.log1p(np.abs(np.fft.rfft(batch, axis=1)[:, :bins]))
+
+    flux = np.zeros(len(frames), dtype=np.float32)
+    flux[1:] = np.maximum(np.diff(magnitude, axis=0), 0).sum(axis=1)
+    times = (np.arange(len(frames)) * hop_size + frame_size / 2) / sample_rate
+    return times, flux
+
+def find_peaks(times: np.ndarray, flux: np.ndarray, min_gap: float) -> np.ndarray:
+    """
+    Indices of onset peaks: local maxima above the mean flux and at least
+    PEAK_FLOOR of the strong peaks, thinned so no two are closer than
+    ``min_gap`` seconds (the stronger one wins).
+    """
+    if len(flux) < 3:
+        return np.zeros(0, dtype=int)
+    is_peak = np.zeros(len(flux), dtype=bool)
+    is_peak[1:-1] = (flux[1:-1] > flux[:-2]) & (flux[1:-1] >= flux[2:]) & (flux[1:-1] > flux.mean())
+    candidates = np.flatnonzero(is_peak)
+    if len(candidates) == 0:
+        return candidates
+    # Ripples in silence and background noise stay well below real onsets
+    candidates = candidates[flux[candidates] >= PEAK_FLOOR * np.percentile(flux[candidates], 98)]
+
+    chosen = []
+    for index in candidates[np.argsort(flux[candidates])[::-1]]:
+        if all(abs(times[index] - times[other]) >= min_gap for other in chosen):
+            chosen.append(index)
+    return np.sort(np.array(chosen, dtype=int))
+
+def align_letters(peak_times: np.ndarray, strength: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """
+    Pick one peak per letter, in time order, by dynamic programming.
+
+    The cost favours evenly paced letters (the alphabet is read at a steady
+    rate), strong onsets, and staying near the ``expected`` times; peaks
+    that don't fit (intro and outro words, "and" before Z) are skipped.
+    Returns the chosen peak indices, or an empty array if there are too few.
+    """
+    count, peaks = len(expected), len(peak_times)
+    if peaks < count:
+        return np.zeros(0, dtype=int)
+    spacing = (expected[-1] - expected[0]) / max(count - 1, 1)
+    strength = strength / strength.max()
+    cumulative = np.concatenate([[0], np.cumsum(strength)])
+
+    for _ in range(ALIGN_PASSES):
+        # cost[k, j]: best total with letter k on peak j
+        node = (POSITION_WEIGHT * ((peak_times[None, :] - expected[:, None]) / spacing) ** 2
+                + STRENGTH_WEIGHT * (1 - strength)[None, :])
+        gap = peak_times[None, :] - peak_times[:, None]
+        # Onsets skipped between two consecutive letters count against the step
+        skipped = np.clip(cumulative[None, :-1] - cumulative[1:, None], 0, None)
+        step = np.where(gap > 0, ((gap - spacing) / spacing) ** 2 + SKIP_WEIGHT * skipped, np.inf)
+        cost = np.empty((count, peaks))
+        back = np.zeros((count, peaks), dtype=int)
+        cost[0] = node[0]
+        for k in range(1, count):
+            total = cost[k - 1][:, None] + step
+            back[k] = np.argmin(total, axis=0)
+            cost[k] = total[back[k], np.arange(peaks)] + node[k]
+        if not np.isfinite(cost[-1]).any():
+            return np.zeros(0, dtype=int)
+        path = [int(np.argmin(cost[-1]))]
+        for k in range(count - 1, 0, -1):
+            path.append(back[k][path[-1]])
+        path = np.array(path[::-1])
+        # Re-run with the pace the reader actually used
+        spacing = float(np.median(np.diff(peak_times[path]))) if count > 1 else spacing
+    return path
+
+def plausible_onsets(onsets: np.ndarray, expected: np.ndarray) -> bool:
+    """Whether aligned letter ``onsets`` are paced and placed close enough to the ``expected`` times"""
+    if len(onsets) != len(expected):
+        return False
+    if len(expected) < 2:
+        return True
+    spacing = (expected[-1] - expected[0]) / (len(expected) - 1)
+    span_ratio = (onsets[-1] - onsets[0]) / (expected[-1] - expected[0])
+    spacing_ratio = np.median(np.diff(onsets)) / spacing
+    return bool(abs(span_ratio - 1) <= PACE_TOLERANCE and abs(spacing_ratio - 1) <= PACE_TOLERANCE
+                and np.abs(onsets - expected).max() <= MAX_ONSET_SHIFT * spacing)
+
+class LetterTimeline:
+    """
+    Sorted start times of each letter plus the end of the last one.
+
+    ``letters_spoken(t)`` is the index of the letter being spoken at ``t``:
+    0 before the first letter, ``len(letters)`` once the alphabet is done.
+    """
+
+    def __init__(self, boundaries: np.ndarray, detected: bool):
+        self.boundaries = np.asarray(boundaries, dtype=np.float64)  # (letters + 1,)
+        self.detected = detected  # True if taken from the audio, False if evenly spaced
+
+    @property
+    def letter_count(self) -> int:
+        return len(self.boundaries) - 1
+
+    @classmethod
+    def evenly_spaced(cls, audio_duration: float, letters: int = len(ALPHABET)) -> 'LetterTimeline':
+        """Letters spread evenly between the intro and the outro"""
+        intro_time, outro_time = intro_outro_times(audio_duration)
+        letter_time = audio_duration - intro_time - outro_time
+        return cls(intro_time + letter_time * np.arange(letters + 1) / letters, detected=False)
+
+    @classmethod
+    def from_audio(cls, audio: np.ndarray, sample_rate: int, letters: int = len(ALPHABET)) -> 'LetterTimeline':
+        """Letter onsets detected in ``audio``, or even spacing if they can't be found reliably"""
+        audio_duration = len(audio) / sample_rate
+        expected = cls.evenly_spaced(audio_duration, letters).boundaries[:-1]
+        spacing = (expected[-1] - expected[0]) / max(letters - 1, 1)
+        times, flux = spectral_flux(audio, sample_rate)
+        peaks = find_peaks(times, flux, MIN_GAP_FRACTION * spacing)
+        path = align_letters(times[peaks], flux[peaks], expected)
+        if len(path) < letters:
+            return cls.evenly_spaced(audio_duration, letters)
+        onsets = times[peaks[path]]
+        if not plausible_onsets(onsets, expected):
+            return cls.evenly_spaced(audio_duration, letters)
+        # The last letter lasts as long as a typical letter (but not past the end)
+        end = min(onsets[-1] + np.median(np.diff(onsets)), audio_duration)
+        return cls(np.append(onsets, end), detected=True)
+
+    @classmethod
+    def from_file(cls, audio_file, letters: int = len(ALPHABET)) -> 'LetterTimeline':
+        """Read ``audio_file`` once and detect its letter onsets"""
+        audio, sample_rate = sf.read(str(Path(audio_file)), dtype='float32')
+        return cls.from_audio(audio, sample_rate, letters)
+
+    def letters_spoken(self, current_time: float) -> int:
+        """Index of the letter at ``current_time`` (binary search)"""
+        index = int(np.searchsorted(self.boundaries, current_time, side='right')) - 1
+        return min(max(index, 0), self.letter_count)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Audio-driven Lip-sync Timeline
+- Short-time energy and spectral features in one vectorised NumPy pass
+- Analysis frames aligned to the video frame rate
+- Per-frame viseme index and mouth openness arrays for O(1) lookup
+"""
+
+import numpy as np
+import soundfile as sf
+from dataclasses import dataclass
+
+# Viseme indices used in the timeline arrays
+VISEME_NAMES = ('neutral', 'open_mouth', 'smile', 'round_mouth')
+NEUTRAL, OPEN_MOUTH, SMILE, ROUND_MOUTH = range(len(VISEME_NAMES))
+
+# Frames quieter than this fraction of the clip's loud level are treated as silence
+SILENCE_THRESHOLD = 0.12
+# Spectral centroid (Hz) boundaries between rounded, open and spread mouth shapes
+ROUND_CENTROID_HZ = 900.0
+SPREAD_CENTROID_HZ = 2500.0
+
+@dataclass
+class VisemeTimeline:
+    """Per-video-frame lip-sync data"""
+    visemes: np.ndarray   # int8 index into VISEME_NAMES
+    openness: np.ndarray  # float32 in [0, 1]
+
+    def __len__(self):
+        return len(self.visemes)
+
+    def viseme_at(self, frame_idx: int) -> str:
+        if 0 <= frame_idx < len(self.visemes):
+            return VISEME_NAMES[self.visemes[frame_idx]]
+        return 'neutral'
+
+    def openness_at(self, frame_idx: int) -> float:
+        if 0 <= frame_idx < len(self.openness):
+            return float(self.openness[frame_idx])
+        return 0.0
+
+def build_viseme_timeline(audio_path: str, fps: float, total_frames: int) -> VisemeTimeline:
+    """
+    Build a viseme/openness timeline for ``total_frames`` video frames from a WAV.
+
+    Each video frame gets one analysis window of ``sample_rate / fps`` samples.
+    Frames past the end of the audio are neutral and closed.
+    """
+    audio, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+    return timeline_from_samples(audio.mean(axis=1), sample_rate, fps, total_frames)
+
+def timeline_from_samples(samples: np.ndarray, sample_rate: int, fps: float,
+                          total_frames: int) -> VisemeTimeline:
+    """Vectorised analysis of mono ``samples`` into a per-frame timeline"""
+    visemes = np.zeros(total_frames, dtype=np.int8)
+    openness = np.zeros(total_frames, dtype=np.float32)
+
+    hop = max(1, int(round(sample_rate / fps)))
+    audio_frames = min(total_frames, len(samples) // hop)
+    if audio_frames == 0:
+        return VisemeTimeline(visemes, openness)
+
+    # (frames, hop) view of the signal, one row per video frame
+    windows = samples[:audio_frames * hop].reshape(audio_frames, hop)
+
+    # Short-time energy, normalised to the clip's loud level
+    rms = np.sqrt(np.mean(windows * windows, axis=1))
+    loud_level = np.percentile(rms, 95) or 1.0
+    energy = np.clip(rms / loud_level, 0.0, 1.0)
+
+    # Spectral centroid per frame
+    spectrum = np.abs(np.fft.rfft(windows * np.hanning(hop).astype(np.float32), axis=1))
+    freqs = np.fft.rfftfreq(hop, d=1.0 / sample_rate).astype(np.float32)
+    centroid = (spectrum @ freqs) / np.maximum(spectrum.sum(axis=1), 1e-9)
+
+    # Light smoothing so the mouth doesn't flicker between adjacent frames
+    if audio_frames >= 3:
+        energy = np.convolve(energy, np.array([0.25, 0.5, 0.25], dtype=np.float32), mode='same')
+
+    voiced = energy >= SILENCE_THRESHOLD
+    frame_visemes = np.full(audio_frames, OPEN_MOUTH, dtype=np.int8)
+    frame_visemes[centroid < ROUND_CENTROID_HZ] = ROUND_MOUTH
+    frame_visemes[centroid > SPREAD_CENTROID_HZ] = SMILE
+    frame_visemes[~voiced] = NEUTRAL
+
+    visemes[:audio_frames] = frame_visemes
+    openness[:audio_frames] = np.where(voiced, energy, 0.0)
+    return VisemeTimeline(visemes, openness)
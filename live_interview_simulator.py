@@ -10,6 +10,8 @@ import random
 import json
 import time
 from datetime import datetime
+import soundfile as sf
+from audio_effects import shared_encode_pool
 
 class LiveInterviewSimulator:
     """Create dynamic interview experiences with realistic conversations"""
@@ -17,6 +19,8 @@ class LiveInterviewSimulator:
     def __init__(self):
         self.output_dir = Path("interview_output")
         self.output_dir.mkdir(exist_ok=True)
+        # Encodes run in the background while the next episode is synthesised
+        self.encoder = shared_encode_pool()
         
         # Enhanced voice profiles
         self.voices = {
@@ -144,17 +148,10 @@ class LiveInterviewSimulator:
             return False
     
     def convert_to_mp3(self, wav_file, mp3_file):
-        """Convert WAV to MP3"""
-        cmd = [
-            'ffmpeg', '-y',
-            '-i', str(wav_file),
-            '-acodec', 'mp3',
-            '-b:a', '128k',
-            str(mp3_file)
-        ]
-        
+        """Convert WAV to MP3 (encoded in the background; the WAV can go once this returns)"""
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            audio, sample_rate = sf.read(str(wav_file), dtype='float32', always_2d=True)
+            self.encoder.submit(audio, sample_rate, mp3_file)
             return True
         except:
             return False
@@ -314,6 +311,10 @@ class LiveInterviewSimulator:
             except Exception as e:
                 print(f"❌ Error creating interview {scenario_key}: {e}")
         
+        # Wait for the background encodes; drop episodes that failed to encode
+        failed = self.encoder.wait()
+        created_files = [f for f in created_files if f not in failed]
+        
         # Create summary metadata
         metadata = {
             'created': datetime.now().isoformat(),
@@ -28,6 +28,8 @@ import re
 import platform
 from dataclasses import dataclass
 
+from tts_cache import shared_tts_cache
+
 # Local TTS engines
 try:
     import pyttsx3
@@ -77,6 +79,9 @@ class LocalTTSEngine:
         # SSML parser
         self.ssml_patterns = self._create_ssml_patterns()
         
+        # Synthesised speech shared with the other TTS engines
+        self.cache = shared_tts_cache()
+        
         self.logger.info(f"Local TTS Engine initialized with {len(self.engines)} engines")
     
     def _detect_available_engines(self) -> Dict[str, bool]:
@@ -220,7 +225,7 @@ class LocalTTSEngine:
     
     def synthesize_speech(self, text: str, voice_profile: Union[str, VoiceProfile], 
                          output_path: str, ssml: bool = False) -> Optional[str]:
-        """Synthesize speech from text using the best available engine."""
+        """Synthesize speech from text using the best available engine (cached on disk)."""
         try:
             # Get voice profile
             if isinstance(voice_profile, str):
@@ -229,28 +234,39 @@ class LocalTTSEngine:
             else:
                 profile = voice_profile
             
-            # Parse SSML if enabled
-            if ssml:
-                text = self._parse_ssml(text, profile)
-            
-            # Try engines in order of preference
-            engines_to_try = ['pyttsx3', 'espeak', 'festival', 'spd-say', 'neural', 'fallback']
-            
-            for engine_name in engines_to_try:
-                if engine_name in self.engines:
-                    result = self._synthesize_with_engine(
-                        engine_name, text, profile, output_path
-                    )
-                    if result:
-                        return result
-            
-            self.logger.error("All TTS engines failed")
-            return None
+            # Identical requests are served from the shared disk cache
+            engines = ','.join(sorted(name for name, available in self.engines.items() if available))
+            key = self.cache.key(text, profile, f"local:{engines}", self.sample_rate,
+                                 profile.emotion, ssml=ssml)
+            return self.cache.synthesize(
+                key, output_path, lambda: self._synthesize_uncached(text, profile, output_path, ssml)
+            )
             
         except Exception as e:
             self.logger.error(f"Speech synthesis failed: {e}")
             return None
     
+    def _synthesize_uncached(self, text: str, profile: VoiceProfile, output_path: str,
+                             ssml: bool) -> Tuple[Optional[str], Optional[str]]:
+        """Run the engines in order of preference until one succeeds; returns (path, engine name)."""
+        # Parse SSML if enabled
+        if ssml:
+            text = self._parse_ssml(text, profile)
+        
+        # Try engines in order of preference
+        engines_to_try = ['pyttsx3', 'espeak', 'festival', 'spd-say', 'neural', 'fallback']
+        
+        for engine_name in engines_to_try:
+            if engine_name in self.engines:
+                result = self._synthesize_with_engine(
+                    engine_name, text, profile, output_path
+                )
+                if result:
+                    return result, engine_name
+        
+        self.logger.error("All TTS engines failed")
+        return None, None
+    
     def _synthesize_with_engine(self, engine_name: str, text: str, 
                               profile: VoiceProfile, output_path: str) -> Optional[str]:
         """Synthesize speech with a specific engine."""
@@ -1,22 +1,30 @@
 import argparse
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Callable, Iterable, Iterator, Union
 import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 import streamlit as st
 import spacy
 import sys
 import os
+import re
+import itertools
+import json
+import threading
+import time
+import uuid
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import imageio
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-import PyPDF2
 
 from engine.core.video_engine import VideoGenerationEngine, VideoConfig
 from engine.core import ConversationMemory, VoiceIntegration, ConversationalResponder, Avatar
+from engine.core.scene_assembler import SceneAssembler, SceneSegment
+from engine.core.phonemizer import PHONEME_TO_VISEME, get_phonemizer
+from media_server import media_url, video_html
+from pdf_pages import extract_text_from_pdf, iter_pdf_pages
+from youtube_uploader import get_upload_worker
 
 try:
     from transformers import pipeline
@@ -129,22 +137,19 @@ def select_music(emotion: str) -> str:
     }
     return music_map.get(emotion, "neutral_background.mp3")
 
-PHONEME_TO_VISEME: Dict[str, str] = {
-    'AH': 'open_mouth',
-    'EE': 'smile',
-    'OH': 'round_mouth',
-    # Add more mappings as needed
-}
-
 def text_to_phonemes(text: str) -> List[str]:
-    """Convert text to phoneme sequence."""
-    # TODO: Implement real phoneme extraction
-    return ['AH', 'EE', 'OH']
+    """Convert text to phoneme sequence (dictionary lookup with rule fallback)."""
+    return get_phonemizer().phonemes(text)
 
 def phonemes_to_visemes(phonemes: List[str]) -> List[str]:
     """Convert phoneme sequence to viseme sequence."""
     return [PHONEME_TO_VISEME.get(p, 'neutral') for p in phonemes]
 
+def text_to_frame_visemes(text: str, config: VideoConfig) -> List[str]:
+    """One viseme per frame, timed from the text's phoneme durations."""
+    total_frames = int(round(config.fps * config.duration))
+    return get_phonemizer().frame_visemes(text, config.fps, total_frames)
+
 EMOTION_TO_EXPRESSION: Dict[str, str] = {
     'happy': 'smile_face',
     'sad': 'frown_face',
@@ -159,7 +164,7 @@ def emotion_to_expression(emotion: str) -> str:
 def synthesize_frames(visemes: List[str], expression: str, config: VideoConfig) -> List[np.ndarray]:
     """Synthesize video frames based on visemes and expression using PIL."""
     frames = []
-    total_frames = int(config.fps * config.duration)
+    total_frames = int(round(config.fps * config.duration))
     width, height = config.width, config.height
     
     print(f"Creating {total_frames} frames ({config.fps}fps × {config.duration}s)")
@@ -267,13 +272,27 @@ def synthesize_frames(visemes: List[str], expression: str, config: VideoConfig)
     
     return frames
 
-def create_video_file(frames: List[np.ndarray], output_path: str, fps: int = 30) -> str:
+# Encoder settings shared by every output so scene segments can be stream-copied together
+VIDEO_ENCODER_PARAMS: Dict[str, Any] = {"codec": "libx264", "pixelformat": "yuv420p", "quality": 8}
+
+# x264 preset per VideoConfig.quality; "low" is used by the fast-preview tier
+ENCODER_PRESETS: Dict[str, str] = {
+    'low': 'ultrafast',
+    'medium': 'veryfast',
+    'high': 'medium',
+    'ultra': 'slow'
+}
+
+def create_video_file(frames: List[np.ndarray], output_path: str, fps: int = 30,
+                      quality: str = "high") -> str:
     """Create video file from frames using imageio."""
     try:
         print(f"Creating video file with {len(frames)} frames at {fps}fps...")
         
         # Frames are already in RGB format from PIL
-        imageio.mimsave(output_path, frames, fps=fps, quality=8)
+        preset = ENCODER_PRESETS.get(quality, 'medium')
+        imageio.mimsave(output_path, frames, fps=fps, output_params=['-preset', preset],
+                        **VIDEO_ENCODER_PARAMS)
         print(f"✅ Video saved successfully: {output_path}")
         return output_path
     except Exception as e:
@@ -299,9 +318,8 @@ async def generate_video_with_lipsync_and_emotion(text: str, emotion: str, confi
     """Generate video with lip sync and emotional expression."""
     print(f"🎬 Generating video: '{text[:50]}...' (Emotion: {emotion})")
     
-    # Generate phonemes and visemes
-    phonemes = text_to_phonemes(text)
-    visemes = phonemes_to_visemes(phonemes)
+    # Generate timed visemes (one per frame)
+    visemes = text_to_frame_visemes(text, config)
     expression = emotion_to_expression(emotion)
     
     # Generate video frames
@@ -314,7 +332,7 @@ async def generate_video_with_lipsync_and_emotion(text: str, emotion: str, confi
     video_path = os.path.join(os.getcwd(), video_filename)
     
     # Create video file
-    final_path = create_video_file(frames, video_path, config.fps)
+    final_path = create_video_file(frames, video_path, config.fps, config.quality)
     
     # Mix music if provided
     if music:
@@ -322,27 +340,142 @@ async def generate_video_with_lipsync_and_emotion(text: str, emotion: str, confi
     
     return final_path
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from a PDF file."""
-    print(f"[PDF] Extracting story from: {pdf_path}")
-    text = ""
+# Encoded scene segments keyed by content hash (see SceneAssembler)
+SCENE_CACHE_DIR = os.getenv("SCENE_CACHE_DIR", "scene_cache")
+# Bump when frame rendering changes so stale cached segments are not reused
+SCENE_RENDER_VERSION = 2
+
+def render_scene_segment(segment: SceneSegment) -> str:
+    """Render one scene to its segment file (SceneAssembler worker)."""
+    visemes = text_to_frame_visemes(segment.text, segment.config)
+    expression = emotion_to_expression(segment.emotion)
+    frames = synthesize_frames(visemes, expression, segment.config)
+    return create_video_file(frames, segment.output_path, segment.config.fps, segment.config.quality)
+
+async def generate_story_video(scenes: List[Dict[str, str]], config: VideoConfig,
+                               avatar_info: Optional[Dict[str, str]] = None,
+                               music: Optional[str] = None,
+                               job_id: Optional[str] = None) -> str:
+    """Render every scene as a parallel segment and join them into one video.
+
+    Segments are cached under ``SCENE_CACHE_DIR`` by content hash, so editing
+    one sentence only re-renders that sentence's scene.
+    """
+    print(f"🎬 Generating story video with {len(scenes)} scenes")
+    timestamp = int(time.time())
+    if job_id:
+        video_filename = f"output_{job_id}.mp4"
+    else:
+        video_filename = f"output_{scenes[0]['emotion']}_{timestamp}.mp4"
+        job_id = f"story_{timestamp}"
+    video_path = os.path.join(os.getcwd(), video_filename)
+    
+    assembler = SceneAssembler(
+        render_scene_segment,
+        cache_dir=SCENE_CACHE_DIR,
+        cache_salt=json.dumps([SCENE_RENDER_VERSION, VIDEO_ENCODER_PARAMS], sort_keys=True)
+    )
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() or ""
+        final_path = assembler.assemble(job_id, scenes, config, video_path, avatar=avatar_info)
     except Exception as e:
-        print(f"[PDF extraction error]: {e}")
-    return text
-
-def parse_characters_and_scenes(story_text: str) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
-    """Parse story text to extract characters and scenes."""
-    print("[Story] Parsing characters and scenes...")
+        print(f"❌ Scene assembly failed, rendering first scene only: {e}")
+        return await generate_video_with_lipsync_and_emotion(
+            text=scenes[0]['description'],
+            emotion=scenes[0]['emotion'],
+            config=config,
+            music=music
+        )
     
-    # Use appropriate nlp pipeline
-    doc = nlp_coref(story_text) if 'nlp_coref' in globals() else nlp(story_text)
-    character_map: Dict[str, str] = {}
+    # Mix music if provided
+    if music:
+        mix_music_with_video(final_path, music)
     
+    return final_path
+
+# Chunked NLP settings for long documents (book-length PDFs)
+NLP_CHUNK_CHARS = int(os.getenv("NLP_CHUNK_CHARS", "20000"))
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "4"))
+# nlp.pipe worker processes each load their own copy of the models, so fan out only
+# when asked to (NLP_N_PROCESS > 1) and only for texts longer than NLP_PARALLEL_MIN_CHARS
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+NLP_PARALLEL_MIN_CHARS = int(os.getenv("NLP_PARALLEL_MIN_CHARS", "200000"))
+
+PRONOUNS = {"he", "him", "his", "she", "her", "hers", "they", "them", "their"}
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*(?:\s+|$)|\n\s*\n')
+
+# Secondary blank+coreferee pipeline for ``manual`` mode, built on first use
+_manual_coref_nlp = None
+
+def _last_sentence_end(text: str, limit: int) -> int:
+    """Index just past the last sentence boundary in ``text[:limit]`` (0 if none)."""
+    cut = 0
+    for match in _SENTENCE_END.finditer(text, 0, limit):
+        cut = match.end()
+    return cut
+
+def _iter_nlp_chunks(texts: Iterable[str], max_chars: int = NLP_CHUNK_CHARS) -> Iterator[str]:
+    """Re-split ``texts`` into chunks of at most ``max_chars`` ending on sentence boundaries.
+
+    The unfinished sentence at the end of each input (e.g. a PDF page break)
+    is carried into the next chunk so sentences and names are never cut in half.
+    """
+    carry = ""
+    for text in texts:
+        buffer = carry + text
+        while len(buffer) > max_chars:
+            cut = _last_sentence_end(buffer, max_chars) or max_chars
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+        cut = _last_sentence_end(buffer, len(buffer))
+        if cut:
+            yield buffer[:cut]
+        carry = buffer[cut:]
+    if carry.strip():
+        yield carry
+
+def _nlp_process_count(chunks: Iterator[str], n_process: int) -> Tuple[Iterator[str], int]:
+    """Read ahead in ``chunks`` to decide whether ``n_process`` workers are worth their model load.
+
+    Returns the (complete) chunk stream and the process count to use: 1
+    unless the text runs past ``NLP_PARALLEL_MIN_CHARS``.
+    """
+    head: List[str] = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size > NLP_PARALLEL_MIN_CHARS:
+            return itertools.chain(head, chunks), n_process
+    return iter(head), 1
+
+def _get_manual_coref_pipeline():
+    """Return the cached blank+coreferee pipeline used in ``manual`` mode."""
+    global _manual_coref_nlp
+    if _manual_coref_nlp is None:
+        try:
+            nlp_temp = spacy.blank("en")
+            nlp_temp.add_pipe("sentencizer")
+            nlp_temp.add_pipe('coreferee')
+            _manual_coref_nlp = nlp_temp
+        except Exception as e:
+            print(f"Manual coreferee failed, using basic NLP: {e}")
+    return _manual_coref_nlp
+
+def _mention_span(doc, mention):
+    """Return a spaCy span for a coreferee mention."""
+    if hasattr(mention, "text"):
+        return mention
+    indexes = mention.token_indexes
+    return doc[min(indexes):max(indexes) + 1]
+
+def _resolve_coreferences(doc, coref_doc, character_map: Dict[str, str],
+                          previous_character: Optional[str]) -> None:
+    """Fill ``character_map`` with the coreference chains of one chunk.
+
+    Chains that have no named antecedent inside the chunk and open with a
+    pronoun continue a character from the previous chunk, so they are
+    attributed to ``previous_character``.
+    """
     # Use global use_coreferee variable
     global use_coreferee
     
@@ -351,49 +484,112 @@ def parse_characters_and_scenes(story_text: str) -> Tuple[List[Dict[str, str]],
         # Standard coreferee pipeline approach
         try:
             for chain in doc._.coref_chains:
-                person_mentions = [m for m in chain if m.root.ent_type_ == "PERSON"]
+                mentions = [_mention_span(doc, m) for m in chain]
+                person_mentions = [m for m in mentions if m.root.ent_type_ == "PERSON"]
                 if person_mentions:
                     canonical = person_mentions[0].text
-                    for mention in chain:
-                        character_map[mention.text] = canonical
-            print(f"✅ Used coreferee pipeline for coreference resolution")
+                elif previous_character and mentions and mentions[0].text.lower() in PRONOUNS:
+                    canonical = previous_character
+                else:
+                    continue
+                for mention in mentions:
+                    character_map[mention.text] = canonical
         except Exception as e:
             print(f"Coreferee pipeline failed, falling back: {e}")
             use_coreferee = False
     
-    elif use_coreferee == "manual":
+    elif use_coreferee == "manual" and coref_doc is not None:
         # Manual coreferee processing approach
         try:
-            import coreferee
-            # Process text separately with coreferee
-            nlp_temp = spacy.blank("en")
-            nlp_temp.add_pipe("sentencizer")
-            nlp_temp.add_pipe('coreferee')
-            coref_doc = nlp_temp(story_text)
-            
             for chain in coref_doc._.coref_chains:
-                for mention in chain:
-                    # Map to first mention as canonical
-                    if len(chain) > 0:
-                        canonical = chain[0].text
-                        character_map[mention.text] = canonical
-            print(f"✅ Used manual coreferee processing")
+                mentions = [_mention_span(coref_doc, m) for m in chain]
+                if not mentions:
+                    continue
+                # Map to first mention as canonical
+                canonical = mentions[0].text
+                if canonical.lower() in PRONOUNS and previous_character:
+                    canonical = previous_character
+                for mention in mentions:
+                    character_map[mention.text] = canonical
         except Exception as e:
             print(f"Manual coreferee failed, using basic NLP: {e}")
+
+def _merge_character_aliases(character_map: Dict[str, str]) -> None:
+    """Point partial names (e.g. "Alice") at the fullest name seen ("Alice Smith")."""
+    names = sorted(set(character_map.values()), key=len, reverse=True)
+    for alias, canonical in character_map.items():
+        tokens = set(canonical.split())
+        for name in names:
+            if len(name) > len(canonical) and tokens <= set(name.split()):
+                character_map[alias] = name
+                break
+
+def parse_characters_and_scenes(story_text: Union[str, Iterable[str]],
+                                n_process: int = NLP_N_PROCESS,
+                                batch_size: int = NLP_BATCH_SIZE) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Parse story text to extract characters and scenes.
+
+    ``story_text`` may also be an iterable of text chunks (e.g. from
+    ``iter_pdf_pages``). Input is re-split into sentence-aligned chunks of
+    ``NLP_CHUNK_CHARS`` and streamed through ``nlp.pipe``; entities and
+    coreference chains are merged across chunk boundaries. ``n_process``
+    worker processes are used only for texts over ``NLP_PARALLEL_MIN_CHARS``.
+    """
+    print("[Story] Parsing characters and scenes...")
+    
+    # Use appropriate nlp pipeline
+    story_nlp = nlp_coref if 'nlp_coref' in globals() else nlp
+    if isinstance(story_text, str):
+        story_text = [story_text]
+    chunks = _iter_nlp_chunks(story_text)
+    if n_process > 1:
+        chunks, n_process = _nlp_process_count(chunks, n_process)
     
-    # Always collect PERSON entities (works with or without coreferee)
-    for ent in doc.ents:
-        if ent.label_ == "PERSON" and ent.text not in character_map:
-            character_map[ent.text] = ent.text
+    character_map: Dict[str, str] = {}
+    scenes: List[Dict[str, str]] = []
+    pronouns_seen: List[str] = []
+    story_head = ""
+    previous_character: Optional[str] = None
+    coref_pipeline = _get_manual_coref_pipeline() if use_coreferee == "manual" else None
+    
+    docs = story_nlp.pipe(chunks, n_process=n_process, batch_size=batch_size)
+    for doc in docs:
+        if len(story_head) <= 200:
+            story_head = (story_head + doc.text)[:201]
+        coref_doc = coref_pipeline(doc.text) if coref_pipeline is not None else None
+        _resolve_coreferences(doc, coref_doc, character_map, previous_character)
+        
+        # Always collect PERSON entities (works with or without coreferee)
+        for ent in doc.ents:
+            if ent.label_ == "PERSON":
+                if ent.text not in character_map:
+                    character_map[ent.text] = ent.text
+                previous_character = character_map[ent.text]
+        
+        if not character_map:
+            pronouns_seen.extend(w for w in doc.text.lower().split() if w in PRONOUNS)
+        
+        scenes.extend(
+            {
+                "description": sent.text.strip(),
+                "emotion": detect_emotion(sent.text)
+            }
+            for sent in doc.sents
+            if sent.text.strip()
+        )
+    
+    if use_coreferee == True:
+        print(f"✅ Used coreferee pipeline for coreference resolution")
+    elif coref_pipeline is not None:
+        print(f"✅ Used manual coreferee processing")
+    
+    _merge_character_aliases(character_map)
     
     # Add pronoun resolution (basic fallback)
     if not character_map:
         # Simple pronoun detection as fallback
-        pronouns = {"he", "him", "his", "she", "her", "hers", "they", "them", "their"}
-        words = story_text.lower().split()
-        for word in words:
-            if word in pronouns:
-                character_map[word] = "Character"  # Generic character
+        for word in pronouns_seen:
+            character_map[word] = "Character"  # Generic character
     
     characters = list(set(character_map.values()))
     
@@ -412,20 +608,11 @@ def parse_characters_and_scenes(story_text: str) -> Tuple[List[Dict[str, str]],
         for name in characters
     ] if characters else [{"name": "Narrator", "gender": "neutral", "style": "realistic"}]
     
-    scenes = [
-        {
-            "description": sent.text.strip(),
-            "emotion": detect_emotion(sent.text)
-        }
-        for sent in doc.sents
-        if sent.text.strip()
-    ]
-    
     if not scenes:
-        # Fallback: create scene from entire text
+        # Fallback: create scene from the start of the text
         scenes = [{
-            "description": story_text[:200] + "..." if len(story_text) > 200 else story_text,
-            "emotion": detect_emotion(story_text)
+            "description": story_head[:200] + "..." if len(story_head) > 200 else story_head,
+            "emotion": detect_emotion(story_head)
         }]
     
     return character_objs, scenes
@@ -463,48 +650,135 @@ def get_user_inputs() -> Tuple[str, str, str, str]:
     return headline, script, image_path, youtube_link
 
 async def upload_to_youtube(video_path: str, title: str, description: str, tags: List[str]) -> str:
-    """Upload video to YouTube and return video URL."""
+    """Upload video to YouTube and return video URL.
+
+    The upload runs on the background upload worker (cached credentials,
+    resumable chunked transfer with retries), so awaiting it does not block
+    the event loop.
+    """
     try:
-        scopes = ["https://www.googleapis.com/auth/youtube.upload"]
-        flow = InstalledAppFlow.from_client_secrets_file("client_secrets.json", scopes)
-        credentials = flow.run_console()
-        youtube = build("youtube", "v3", credentials=credentials)
-
-        request = youtube.videos().insert(
-            part="snippet,status",
-            body={
-                "snippet": {
-                    "title": title,
-                    "description": description,
-                    "tags": tags,
-                    "categoryId": "22"  # People & Blogs
-                },
-                "status": {
-                    "privacyStatus": "private"  # Start as private
-                }
-            },
-            media_body=MediaFileUpload(video_path)
-        )
-        response = request.execute()
-        video_url = f"https://youtu.be/{response['id']}"
-        print(f"Uploaded to YouTube: {video_url}")
+        video_url = await asyncio.wrap_future(queue_youtube_upload(video_path, title, description, tags))
         return video_url
     except Exception as e:
         print(f"YouTube upload failed: {str(e)}")
         return ""
 
-async def process_video_generation(
+def queue_youtube_upload(video_path: str, title: str, description: str, tags: List[str]) -> Future:
+    """Start a YouTube upload in the background; the future resolves to the video URL."""
+    return get_upload_worker().submit(video_path, title, description, tags)
+
+# Fast-preview tier: reduced resolution/fps and the fastest x264 preset
+PREVIEW_SCALE = 0.5
+PREVIEW_FPS = 12
+PREVIEW_MIN_FPS = 6
+PREVIEW_LATENCY_TARGET = float(os.getenv("PREVIEW_LATENCY_TARGET", "8"))
+# Rough preview-resolution render throughput of one worker process (frames/s)
+PREVIEW_FRAMES_PER_SECOND = 40
+
+# Render jobs by id: a preview first, replaced by the full-quality render when it lands
+_render_jobs: Dict[str, Dict[str, Any]] = {}
+_render_jobs_lock = threading.Lock()
+_full_render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="full-render")
+
+def make_preview_config(config: VideoConfig, scene_count: int,
+                        latency_target: float = PREVIEW_LATENCY_TARGET) -> Tuple[VideoConfig, int]:
+    """Reduce ``config`` to the preview tier and size the preview to ``latency_target``.
+
+    ``config.duration`` is the length of the whole story. Returns the preview
+    config and how many leading scenes fit in the budget; the preview's
+    duration is cut to those scenes' share.
+    """
+    width = max(160, int(config.width * PREVIEW_SCALE) // 16 * 16)
+    height = max(128, int(config.height * PREVIEW_SCALE) // 16 * 16)
+    # Scenes render in parallel, one worker each
+    workers = max(1, min(os.cpu_count() or 1, scene_count))
+    frame_budget = latency_target * PREVIEW_FRAMES_PER_SECOND * workers
+    
+    fps = min(config.fps, PREVIEW_FPS)
+    if fps * config.duration > frame_budget:
+        fps = min(config.fps, PREVIEW_MIN_FPS)
+    total_frames = max(1, fps * config.duration)
+    max_scenes = scene_count if total_frames <= frame_budget else int(scene_count * frame_budget / total_frames)
+    max_scenes = max(1, min(scene_count, max_scenes))
+    
+    preview = replace(config, width=width, height=height, fps=fps, quality="low",
+                      duration=config.duration * max_scenes / max(scene_count, 1))
+    return preview, max_scenes
+
+def new_render_job_id() -> str:
+    """Generate a job id shared by a preview and its full-quality render."""
+    return f"job_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+
+def _update_render_job(job_id: str, **fields: Any) -> None:
+    with _render_jobs_lock:
+        _render_jobs.setdefault(job_id, {"job_id": job_id}).update(fields)
+
+def register_preview(job_id: str, preview_path: str) -> None:
+    """Record ``preview_path`` as the video currently shown for ``job_id``."""
+    _update_render_job(job_id, status="preview", quality="preview",
+                       video_path=preview_path, preview_path=preview_path)
+
+def get_render_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a snapshot of a render job (status, quality, video_path)."""
+    with _render_jobs_lock:
+        job = _render_jobs.get(job_id)
+        return dict(job) if job else None
+
+def queue_full_render(job_id: str, render: Callable[[], str]) -> Future:
+    """Run ``render`` in the background as the full-quality version of ``job_id``.
+
+    ``render`` returns the path of the finished video. Once it succeeds the
+    job's ``video_path`` switches from the preview to the full render and the
+    preview file is removed.
+    """
+    _update_render_job(job_id, status="rendering")
+    
+    def run() -> None:
+        try:
+            video_path = render()
+        except Exception as e:
+            print(f"❌ Full-quality render failed for {job_id}: {e}")
+            _update_render_job(job_id, status="failed", error=str(e))
+            return
+        preview_path = (get_render_job(job_id) or {}).get("preview_path")
+        _update_render_job(job_id, status="complete", quality="full", video_path=video_path)
+        if preview_path and preview_path != video_path and os.path.exists(preview_path):
+            os.remove(preview_path)
+        print(f"✅ Full-quality render ready for {job_id}: {video_path}")
+    
+    return _full_render_executor.submit(run)
+
+async def render_preview(
     script: str,
     headline: str = "",
     image_path: str = "",
     youtube_link: str = "",
     pdf_path: str = "",
-    config: Optional[VideoConfig] = None
-) -> Tuple[str, str, List[str]]:
-    """Process video generation with all inputs and return video path and metadata."""
-    if config is None:
-        config = VideoConfig(width=640, height=480, fps=24, duration=3)  # Smaller, faster config
+    config: Optional[VideoConfig] = None,
+    queue_full: bool = True
+) -> Tuple[str, str, List[str], str]:
+    """Render a fast low-resolution preview, optionally queueing the full render.
+
+    Returns the preview path, title, tags and the job id under which the
+    full-quality render (if queued) will replace the preview.
+    """
+    job_id = new_render_job_id()
+    # Parsed once; the full-quality render reuses the characters, scenes and avatar
+    story = prepare_story(script, pdf_path)
+    preview_path, title, tags = await render_story(story, config, preview=True, job_id=job_id)
+    register_preview(job_id, preview_path)
     
+    if queue_full:
+        queue_full_render(job_id, lambda: asyncio.run(render_story(story, config, job_id=job_id))[0])
+    
+    return preview_path, title, tags, job_id
+
+def prepare_story(script: str, pdf_path: str = "") -> Dict[str, Any]:
+    """Parse the inputs once: characters, scenes, avatar, lead emotion and music.
+
+    The result is everything ``render_story`` needs, so a preview and its
+    full-quality render share one parse.
+    """
     # Initialize core components
     engine = VideoGenerationEngine()
     memory = ConversationMemory()
@@ -513,8 +787,7 @@ async def process_video_generation(
     
     # Process PDF if provided
     if pdf_path:
-        story_text = extract_text_from_pdf(pdf_path)
-        characters, scenes = parse_characters_and_scenes(story_text)
+        characters, scenes = parse_characters_and_scenes(iter_pdf_pages(pdf_path))
     else:
         characters, scenes = parse_characters_and_scenes(script)
     
@@ -530,19 +803,69 @@ async def process_video_generation(
     ai_response = responder.generate_response(script_text)
     music = select_music(emotion)
     
-    # Generate video
-    video_path = await generate_video_with_lipsync_and_emotion(
-        text=script_text,
-        emotion=emotion,
-        config=config,
-        music=music
-    )
+    return {
+        "characters": characters,
+        "scenes": scenes,
+        "avatar_info": avatar_info,
+        "script_text": script_text,
+        "emotion": emotion,
+        "music": music
+    }
+
+async def render_story(
+    story: Dict[str, Any],
+    config: Optional[VideoConfig] = None,
+    preview: bool = False,
+    job_id: Optional[str] = None
+) -> Tuple[str, str, List[str]]:
+    """Render a story prepared by ``prepare_story``; returns video path, title and tags."""
+    if config is None:
+        config = VideoConfig(width=640, height=480, fps=24, duration=3)  # Smaller, faster config
+    scenes = story["scenes"]
+    
+    # Generate video: every scene becomes its own segment
+    render_scenes = scenes
+    if preview and scenes:
+        config, scene_limit = make_preview_config(config, len(scenes))
+        render_scenes = scenes[:scene_limit]
+        if scene_limit < len(scenes):
+            print(f"⚡ Preview covers the first {scene_limit} of {len(scenes)} scenes")
+        job_id = f"{job_id}_preview" if job_id else None
+    
+    if render_scenes:
+        video_path = await generate_story_video(render_scenes, config, story["avatar_info"],
+                                                story["music"], job_id=job_id)
+    else:
+        video_path = await generate_video_with_lipsync_and_emotion(
+            text=story["script_text"],
+            emotion=story["emotion"],
+            config=config,
+            music=story["music"]
+        )
     
     # Generate metadata
-    title, tags = parse_tags_and_title(scenes, characters)
+    title, tags = parse_tags_and_title(scenes, story["characters"])
     
     return video_path, title, tags
 
+async def process_video_generation(
+    script: str,
+    headline: str = "",
+    image_path: str = "",
+    youtube_link: str = "",
+    pdf_path: str = "",
+    config: Optional[VideoConfig] = None,
+    preview: bool = False,
+    job_id: Optional[str] = None
+) -> Tuple[str, str, List[str]]:
+    """Process video generation with all inputs and return video path and metadata.
+
+    With ``preview`` the video is rendered in the fast-preview tier (see
+    ``make_preview_config``); ``job_id`` names the output file.
+    """
+    story = prepare_story(script, pdf_path)
+    return await render_story(story, config, preview=preview, job_id=job_id)
+
 def run_cli() -> None:
     """Run the command-line interface version."""
     parser = argparse.ArgumentParser(description="Run the AI Video Generation Engine.")
@@ -586,9 +909,50 @@ def run_cli() -> None:
         # Optional YouTube upload
         if input("\nUpload to YouTube? (y/N): ").lower().strip() == 'y':
             description = f"Generated by AI Video Generator\nHeadline: {headline}"
-            video_url = asyncio.run(upload_to_youtube(video_path, title, description, tags))
-            if video_url:
-                print(f"Video uploaded successfully: {video_url}")
+            try:
+                # Authorize up front so the OAuth prompt doesn't race the next input()
+                get_upload_worker().get_credentials()
+            except Exception as e:
+                print(f"YouTube upload failed: {str(e)}")
+                continue
+            
+            def report_upload(future: Future) -> None:
+                try:
+                    print(f"\nVideo uploaded successfully: {future.result()}")
+                except Exception as e:
+                    print(f"\nYouTube upload failed: {str(e)}")
+            
+            # Upload in the background while the next video is being made
+            queue_youtube_upload(video_path, title, description, tags).add_done_callback(report_upload)
+            print("📤 Uploading to YouTube in the background...")
+
+def _show_video(video_path: str) -> None:
+    """Show a generated video with preview and download link in Streamlit.
+
+    When MEDIA_BASE_URL is configured the video is referenced by a media-server
+    URL (Range requests, sendfile). Otherwise Streamlit serves it, holding the
+    whole file in memory for the player and again for the download button.
+    """
+    if os.path.exists(video_path):
+        file_size = os.path.getsize(video_path)
+        st.info(f"📁 File: {video_path} ({file_size:,} bytes)")
+        
+        video_url = media_url(video_path)
+        if video_url:
+            st.html(video_html(video_url))
+            st.link_button("📥 Download Video", media_url(video_path, download=True))
+        else:
+            # Media server not configured or down: let Streamlit serve the file itself
+            st.video(video_path)
+            with open(video_path, "rb") as f:
+                st.download_button(
+                    "📥 Download Video",
+                    f,
+                    file_name=Path(video_path).name,
+                    mime="video/mp4"
+                )
+    else:
+        st.error(f"Video file not found: {video_path}")
 
 def run_streamlit() -> None:
     """Run the Streamlit web interface version."""
@@ -600,6 +964,7 @@ def run_streamlit() -> None:
         image_path = st.text_input("Enter an image file path (optional):")
         youtube_link = st.text_input("Enter a YouTube link (optional):")
         pdf_file = st.file_uploader("Upload a story PDF (optional):", type=["pdf"])
+        fast_preview = st.checkbox("⚡ Fast preview first (full quality renders in the background)", value=True)
         
         submit = st.form_submit_button("Generate Video")
         
@@ -613,41 +978,33 @@ def run_streamlit() -> None:
                     f.write(pdf_file.read())
             
             # Process video generation
-            video_path, title, tags = asyncio.run(process_video_generation(
-                script=script,
-                headline=headline,
-                image_path=image_path,
-                youtube_link=youtube_link,
-                pdf_path=pdf_path
-            ))
+            if fast_preview:
+                video_path, title, tags, job_id = asyncio.run(render_preview(
+                    script=script,
+                    headline=headline,
+                    image_path=image_path,
+                    youtube_link=youtube_link,
+                    pdf_path=pdf_path
+                ))
+                st.session_state["render_job_id"] = job_id
+            else:
+                video_path, title, tags = asyncio.run(process_video_generation(
+                    script=script,
+                    headline=headline,
+                    image_path=image_path,
+                    youtube_link=youtube_link,
+                    pdf_path=pdf_path
+                ))
+                st.session_state.pop("render_job_id", None)
             
             # Show results
-            st.success("Video generated successfully!")
+            if fast_preview:
+                st.success("Preview ready! The full-quality video is rendering in the background.")
+            else:
+                st.success("Video generated successfully!")
             
             # Show video info
-            if os.path.exists(video_path):
-                file_size = os.path.getsize(video_path)
-                st.info(f"📁 File: {video_path} ({file_size:,} bytes)")
-                
-                # Video preview (only for small files to avoid loading issues)
-                if file_size < 50_000_000:  # Less than 50MB
-                    try:
-                        with open(video_path, "rb") as video_file:
-                            video_bytes = video_file.read()
-                            st.video(video_bytes)
-                    except Exception as e:
-                        st.warning(f"Could not display video preview: {e}")
-                        
-                # Download button
-                with open(video_path, "rb") as f:
-                    st.download_button(
-                        "📥 Download Video",
-                        f,
-                        file_name=Path(video_path).name,
-                        mime="video/mp4"
-                    )
-            else:
-                st.error(f"Video file not found: {video_path}")
+            _show_video(video_path)
             
             # Show metadata
             st.subheader("Video Metadata")
@@ -665,6 +1022,20 @@ def run_streamlit() -> None:
                         st.success(f"Video uploaded successfully! View at {video_url}")
     elif submit:
         st.error("Please enter a script for the video.")
+    
+    # Background full-quality render for the last preview
+    job_id = st.session_state.get("render_job_id")
+    job = get_render_job(job_id) if job_id else None
+    if job and not submit:
+        if job["status"] == "rendering":
+            st.info("⏳ Full-quality render in progress, showing the preview.")
+            st.button("🔄 Check full-quality render")
+            _show_video(job["video_path"])
+        elif job["status"] == "complete":
+            st.success("✅ Full-quality video ready")
+            _show_video(job["video_path"])
+        elif job["status"] == "failed":
+            st.warning(f"Full-quality render failed: {job.get('error')}")
 
 def main() -> None:
     """Main entry point that decides which interface to run."""
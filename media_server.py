@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Static Media Server for generated videos
+- HTTP Range requests (seeking / progressive playback)
+- Zero-copy streaming through sendfile
+- Only files explicitly published by the app are served, under random tokens
+- Off unless MEDIA_BASE_URL says how browsers reach it (e.g. "/" behind nginx)
+"""
+
+import html
+import mimetypes
+import os
+import re
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
+
+MEDIA_SERVER_HOST = os.getenv("MEDIA_SERVER_HOST", "127.0.0.1")
+MEDIA_SERVER_PORT = int(os.getenv("MEDIA_SERVER_PORT", "8504"))
+# Public URL prefix the browser uses to reach the server ("/" when nginx proxies /media/).
+# Unset: the port is not exposed anywhere, so the server stays off and Streamlit serves
+# files itself, reading each one whole into memory (fine for short clips, not for long videos)
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL")
+
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+class MediaRegistry:
+    """Maps random tokens to absolute file paths that may be served"""
+
+    def __init__(self):
+        self._files: Dict[str, str] = {}
+        self._tokens: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, path: str) -> str:
+        """Register ``path`` and return its token (the same one on every call)"""
+        abs_path = os.path.abspath(path)
+        with self._lock:
+            token = self._tokens.get(abs_path)
+            if token is None:
+                # Random, not derived from the path: knowing a file name doesn't give its URL
+                token = secrets.token_urlsafe(18)
+                self._tokens[abs_path] = token
+                self._files[token] = abs_path
+        return token
+
+    def resolve(self, token: str) -> Optional[str]:
+        with self._lock:
+            return self._files.get(token)
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``Range: bytes=start-end`` header.
+
+    Returns:
+        (start, end) inclusive, None for a full response; raises ValueError
+        for unsatisfiable ranges
+    """
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None  # Multi-range or unknown unit: serve the whole file
+    start_text, end_text = match.groups()
+    if not start_text:
+        if not end_text:
+            raise ValueError("empty range")
+        # Suffix range: the last N bytes
+        length = min(int(end_text), size)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return size - length, size - 1
+    start = int(start_text)
+    end = min(int(end_text), size - 1) if end_text else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    """Serves published media files with Range support"""
+
+    registry: MediaRegistry = None
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        file_path = self.registry.resolve(parts[1]) if len(parts) >= 2 and parts[0] == "media" else None
+        if not file_path or not os.path.isfile(file_path):
+            self.send_error(404, "Not found")
+            return
+
+        size = os.path.getsize(file_path)
+        try:
+            byte_range = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range if byte_range else (0, size - 1)
+        length = max(0, end - start + 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", mimetypes.guess_type(file_path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", "no-cache")
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        if "download" in parse_qs(parsed.query):
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(file_path)}"')
+        self.end_headers()
+
+        if not send_body or length == 0:
+            return
+        try:
+            with open(file_path, "rb") as f:
+                # socket.sendfile uses os.sendfile (zero-copy) where available
+                self.connection.sendfile(f, offset=start, count=length)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client seeked or closed the player
+
+    def log_message(self, format, *args):
+        pass  # Players issue many range requests; keep the console quiet
+
+class MediaServer:
+    """Background HTTP server publishing generated videos by URL"""
+
+    def __init__(self, host: str = MEDIA_SERVER_HOST, port: int = MEDIA_SERVER_PORT,
+                 base_url: Optional[str] = MEDIA_BASE_URL):
+        self.host = host
+        self.port = port
+        self.base_url = base_url.rstrip("/") if base_url is not None else None
+        self.registry = MediaRegistry()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Start serving in a daemon thread (idempotent)"""
+        with self._lock:
+            if self._httpd is not None:
+                return True
+            handler = type("BoundMediaRequestHandler", (MediaRequestHandler,), {"registry": self.registry})
+            try:
+                self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+            except OSError as e:
+                print(f"⚠️ Media server could not bind {self.host}:{self.port}: {e}")
+                return False
+            self._httpd.daemon_threads = True
+            threading.Thread(target=self._httpd.serve_forever, name="media-server", daemon=True).start()
+            print(f"🎞️ Media server listening on {self.host}:{self.port}")
+            return True
+
+    def stop(self):
+        with self._lock:
+            if self._httpd is not None:
+                self._httpd.shutdown()
+                self._httpd.server_close()
+                self._httpd = None
+
+    def publish(self, path: str, download: bool = False) -> Optional[str]:
+        """Publish ``path`` and return the URL it is served at (None if not configured or down)"""
+        if self.base_url is None or not self.start():
+            return None
+        token = self.registry.publish(path)
+        url = f"{self.base_url}/media/{token}/{quote(os.path.basename(path))}"
+        return f"{url}?download=1" if download else url
+
+_media_server: Optional[MediaServer] = None
+_media_server_lock = threading.Lock()
+
+def get_media_server() -> MediaServer:
+    """Return the process-wide media server (survives Streamlit reruns)"""
+    global _media_server
+    with _media_server_lock:
+        if _media_server is None:
+            _media_server = MediaServer()
+        return _media_server
+
+def media_url(path: str, download: bool = False) -> Optional[str]:
+    """URL for a generated file, served with Range support (None: serve it through Streamlit)"""
+    return get_media_server().publish(path, download=download)
+
+def video_html(url: str) -> str:
+    """
+    ``<video>`` element for a media URL.
+
+    st.video opens anything that isn't an http(s) or data URL as a local
+    file, so page-relative URLs ("/media/...") are embedded as HTML instead.
+    """
+    return f'<video src="{html.escape(url, quote=True)}" controls preload="metadata" style="width: 100%"></video>'
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    server = get_media_server()
+    for file_arg in sys.argv[1:]:
+        print(media_url(file_arg))
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
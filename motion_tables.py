@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Motion Tables for the cv2 TV-style generators
+- Trajectories of procedural elements (sun rays, clouds, notes) computed for a whole clip
+- One vectorised NumPy call per clip; each frame is then a table lookup
+- Pure functions of the frame number, so every shard worker builds identical tables
+"""
+
+from typing import Callable, Dict
+
+import numpy as np
+
+# Smallest table built; rendering single frames shouldn't rebuild for each one
+MIN_TABLE_FRAMES = 300
+
+def wave(frames: np.ndarray, amplitude: float, rate: float, phase: float = 0.0,
+         func=np.sin) -> np.ndarray:
+    """``amplitude * func(frame * rate + phase)`` for every frame, in float64 like ``math``"""
+    return amplitude * func(frames * rate + phase)
+
+def truncate(values) -> np.ndarray:
+    """Round toward zero to int32, like ``int(v)``"""
+    return np.trunc(values).astype(np.int32)
+
+def ray_segments(frames: np.ndarray, center, count: int, rate: float, inner, outer) -> np.ndarray:
+    """
+    Endpoints of ``count`` rays spinning at ``rate`` radians per frame.
+
+    ``inner`` and ``outer`` are the ray start/end radii, either scalars or
+    per-frame arrays. Returns (frames, count, 2, 2) int32 start/end points.
+    """
+    angles = (np.arange(count) * 2 * np.pi / count)[None, :] + (frames * rate)[:, None]
+    cos, sin = np.cos(angles), np.sin(angles)
+    inner = np.asarray(inner, dtype=np.float64).reshape(-1, 1)
+    outer = np.asarray(outer, dtype=np.float64).reshape(-1, 1)
+    cx, cy = center
+    start = np.stack([cx + truncate(inner * cos), cy + truncate(inner * sin)], axis=-1)
+    end = np.stack([cx + truncate(outer * cos), cy + truncate(outer * sin)], axis=-1)
+    return np.stack([start, end], axis=2)
+
+def drift(frames: np.ndarray, starts, speeds, span: float, wrap_at: float, wrap_by: float) -> np.ndarray:
+    """
+    x positions of elements drifting right at ``speeds`` pixels per frame.
+
+    Each position cycles over ``span``; once past ``wrap_at`` it is moved
+    back by ``wrap_by`` to re-enter from the left. Returns (frames, n) float64.
+    """
+    x = np.asarray(starts, dtype=np.float64) + (frames[:, None] * np.asarray(speeds, dtype=np.float64)) % span
+    return np.where(x > wrap_at, x - wrap_by, x)
+
+class MotionTables:
+    """
+    Named per-frame tracks, built in bulk by ``build(frames)``.
+
+    ``build`` maps a float64 array of frame numbers to a dict of arrays
+    whose first axis is the frame. Call ``prepare`` with the clip length
+    to build the whole clip at once; looking up a frame past the end
+    rebuilds the tables with room to spare.
+    """
+
+    def __init__(self, build: Callable[[np.ndarray], Dict[str, np.ndarray]]):
+        self.build = build
+        self.frame_count = 0
+        self._tracks: Dict[str, np.ndarray] = {}
+
+    def prepare(self, frame_count: int):
+        """Make sure frames ``0 .. frame_count - 1`` are in the tables"""
+        if frame_count > self.frame_count:
+            frame_count = max(frame_count, MIN_TABLE_FRAMES)
+            self._tracks = self.build(np.arange(frame_count, dtype=np.float64))
+            self.frame_count = frame_count
+
+    def track(self, name: str, frame_num: int) -> np.ndarray:
+        """Value of track ``name`` at ``frame_num``"""
+        if frame_num >= self.frame_count:
+            self.prepare(max(frame_num + 1, 2 * self.frame_count))
+        return self._tracks[name][frame_num]
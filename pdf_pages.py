@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+PDF Page Extraction for story parsing
+- Page ranges extracted in a process pool and yielded in document order
+- Kept apart from main.py: worker processes only import this module and PyPDF2,
+  never the spaCy / coreferee / transformers models main.py loads at import
+- Workers are forked only from a single-threaded parent; otherwise spawned
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+import PyPDF2
+
+# Pages handed to each PDF extraction worker; small documents stay in-process
+PDF_PAGES_PER_TASK = 8
+
+def _extract_pdf_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from a PDF (process pool worker)."""
+    with open(pdf_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _pool_context():
+    """Start method for the extraction pool.
+
+    Forking a multi-threaded parent (the Streamlit server) can deadlock the
+    child on locks held by other threads, so fork is used only when this is
+    the sole Python thread; spawned workers import just this module.
+    """
+    if threading.active_count() == 1 and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+def iter_pdf_pages(pdf_path: str, max_workers: Optional[int] = None,
+                   pages_per_task: int = PDF_PAGES_PER_TASK) -> Iterator[str]:
+    """Yield the text of each PDF page in document order.
+
+    Page ranges are extracted in a process pool and yielded as soon as the
+    earliest outstanding range is done, so downstream NLP can start on the
+    first pages while later ones are still being extracted.
+    """
+    print(f"[PDF] Extracting story from: {pdf_path}")
+    try:
+        with open(pdf_path, "rb") as f:
+            page_count = len(PyPDF2.PdfReader(f).pages)
+    except Exception as e:
+        print(f"[PDF extraction error]: {e}")
+        return
+
+    ranges = [(start, min(start + pages_per_task, page_count))
+              for start in range(0, page_count, pages_per_task)]
+    if len(ranges) <= 1 or max_workers == 1:
+        for start, stop in ranges:
+            try:
+                yield from _extract_pdf_page_range(pdf_path, start, stop)
+            except Exception as e:
+                print(f"[PDF extraction error]: {e}")
+                return
+        return
+
+    workers = min(max_workers or os.cpu_count() or 1, len(ranges))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+        futures = [executor.submit(_extract_pdf_page_range, pdf_path, start, stop)
+                   for start, stop in ranges]
+        try:
+            for future in futures:
+                yield from future.result()
+        except Exception as e:
+            print(f"[PDF extraction error]: {e}")
+        finally:
+            for future in futures:
+                future.cancel()
+
+def extract_text_from_pdf(pdf_path: str) -> str:
+    """Extract text from a PDF file."""
+    return "".join(iter_pdf_pages(pdf_path))
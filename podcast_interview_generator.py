@@ -11,13 +11,19 @@ import random
 import json
 import time
 from datetime import datetime
+from audio_effects import EFFECT_CHAINS, apply_chain, load_segments, shared_encode_pool
 
 class PodcastInterviewGenerator:
     """Generate educational podcasts and interviews"""
     
-    def __init__(self):
+    def __init__(self, apply_effects=False):
         self.output_dir = Path("podcast_output")
         self.output_dir.mkdir(exist_ok=True)
+        # Opt-in: run the podcast/interview effect chains (filters, echo,
+        # normalisation) over finished episodes instead of the plain mix
+        self.apply_effects = apply_effects
+        # Encodes run in the background while the next episode is synthesised
+        self.encoder = shared_encode_pool()
         
         # Voice configurations for different characters
         self.voices = {
@@ -125,87 +131,33 @@ class PodcastInterviewGenerator:
     
     def add_audio_effects(self, input_file, output_file, effect_type='podcast'):
         """Add audio effects for professional sound"""
-        if effect_type == 'podcast':
-            # Add compression and normalization for podcast
-            cmd = [
-                'ffmpeg', '-y',
-                '-i', input_file,
-                '-af', 'dynaudnorm,highpass=f=80,lowpass=f=10000',
-                '-ar', '44100',
-                '-b:a', '128k',
-                output_file
-            ]
-        elif effect_type == 'interview':
-            # Add slight reverb for interview atmosphere
-            cmd = [
-                'ffmpeg', '-y',
-                '-i', input_file,
-                '-af', 'aecho=0.8:0.9:1000:0.3,dynaudnorm',
-                '-ar', '44100',
-                '-b:a', '128k',
-                output_file
-            ]
-        else:
-            # Default processing
-            cmd = [
-                'ffmpeg', '-y',
-                '-i', input_file,
-                '-af', 'dynaudnorm',
-                '-ar', '44100',
-                '-b:a', '128k',
-                output_file
-            ]
-        
+        # podcast: normalisation, highpass and lowpass; interview: slight echo for
+        # interview atmosphere; anything else: normalisation only
+        chain = EFFECT_CHAINS.get(effect_type, EFFECT_CHAINS['default'])
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            audio, sample_rate = sf.read(str(input_file), dtype='float32', always_2d=True)
+            audio, sample_rate = apply_chain(audio, sample_rate, chain)
+            self.encoder.submit(audio, sample_rate, output_file)
             return True
-        except:
+        except Exception as e:
+            print(f"Error adding audio effects: {e}")
             return False
     
-    def combine_audio_segments(self, segments, output_file, add_music=True):
-        """Combine multiple audio segments with optional background music"""
+    def combine_audio_segments(self, segments, output_file, add_music=True, effect_type=None):
+        """Combine multiple audio segments, with effects applied in the same pass"""
         if not segments:
             return False
         
-        # Create a temporary file list for ffmpeg
-        temp_list = self.output_dir / "temp_segments.txt"
-        
-        with open(temp_list, 'w') as f:
-            for segment in segments:
-                f.write(f"file '{segment}'\n")
-        
-        if add_music:
-            # Combine with background music
-            cmd = [
-                'ffmpeg', '-y',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', str(temp_list),
-                '-filter_complex', '[0:a]volume=1.0[a]',
-                '-map', '[a]',
-                '-c:a', 'mp3',
-                '-b:a', '128k',
-                str(output_file)
-            ]
-        else:
-            # Simple concatenation
-            cmd = [
-                'ffmpeg', '-y',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', str(temp_list),
-                '-c', 'copy',
-                str(output_file)
-            ]
-        
         try:
-            result = subprocess.run(cmd, check=True, capture_output=True)
-            temp_list.unlink()
+            # Segments are joined in memory; the episode is filtered once and
+            # handed to the encode pool, so the next one can start meanwhile
+            audio, sample_rate = load_segments(segments)
+            if effect_type:
+                audio, sample_rate = apply_chain(audio, sample_rate, EFFECT_CHAINS[effect_type])
+            self.encoder.submit(audio, sample_rate, output_file)
             return True
         except Exception as e:
             print(f"Error combining audio: {e}")
-            if temp_list.exists():
-                temp_list.unlink()
             return False
     
     def create_podcast_episode(self, topic_key, episode_data):
@@ -255,7 +207,8 @@ class PodcastInterviewGenerator:
         
         # Combine all segments
         final_file = self.output_dir / f"{episode_name}.mp3"
-        if self.combine_audio_segments(segments, final_file):
+        effect_type = 'podcast' if self.apply_effects else None
+        if self.combine_audio_segments(segments, final_file, effect_type=effect_type):
             # Clean up temporary files
             for segment in segments:
                 Path(segment).unlink()
@@ -362,9 +315,10 @@ class PodcastInterviewGenerator:
         if self.create_voice_audio(outro_text, self.voices['host'], outro_file):
             segments.append(str(outro_file))
         
-        # Combine all segments with interview effects
+        # Combine all segments (with interview effects if enabled)
         final_file = self.output_dir / f"{interview_name}.mp3"
-        if self.combine_audio_segments(segments, final_file):
+        effect_type = 'interview' if self.apply_effects else None
+        if self.combine_audio_segments(segments, final_file, effect_type=effect_type):
             # Clean up temporary files
             for segment in segments:
                 Path(segment).unlink()
@@ -427,6 +381,10 @@ class PodcastInterviewGenerator:
                 except Exception as e:
                     print(f"❌ Error creating podcast: {e}")
         
+        # Wait for the background encodes; drop episodes that failed to encode
+        failed = self.encoder.wait()
+        created_files = [f for f in created_files if f not in failed]
+        
         return created_files
     
     def generate_all_interviews(self):
@@ -444,6 +402,10 @@ class PodcastInterviewGenerator:
             except Exception as e:
                 print(f"❌ Error creating interview: {e}")
         
+        # Wait for the background encodes; drop episodes that failed to encode
+        failed = self.encoder.wait()
+        created_files = [f for f in created_files if f not in failed]
+        
         return created_files
     
     def create_podcast_metadata(self, podcast_files, interview_files):
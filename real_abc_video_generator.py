@@ -6,11 +6,13 @@ Create videos with real spoken alphabet and synchronized lyrics
 
 import cv2
 import numpy as np
-import soundfile as sf
 from pathlib import Path
 import math
-import subprocess
 import os
+from background_engine import BackgroundEngine
+from video_writer import FFmpegVideoWriter
+from text_cache import TextStampCache
+from audio_probe import probe_audio
 
 class RealABCVideoGenerator:
     """Generate videos with real ABC singing and lyrics display"""
@@ -24,6 +26,8 @@ class RealABCVideoGenerator:
         self.width = 1920
         self.height = 1080
         self.fps = 30
+        self.text = TextStampCache()
+        self.backgrounds = BackgroundEngine(self.width, self.height)
         
         # Colors (BGR format for OpenCV)
         self.colors = {
@@ -111,16 +115,17 @@ class RealABCVideoGenerator:
     
     def create_animated_background(self, frame_num):
         """Create animated background with floating elements"""
-        frame = np.full((self.height, self.width, 3), self.colors['background'], dtype=np.uint8)
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
         
-        # Animated gradient
+        # Animated gradient: per-row colour column, broadcast across the width
         wave_offset = frame_num * 0.02
-        for y in range(self.height):
-            wave = math.sin(y * 0.005 + wave_offset) * 20
-            gradient_color = int(240 + wave)
-            frame[y, :, 0] = min(255, max(200, gradient_color))
-            frame[y, :, 1] = min(255, max(210, gradient_color + 8))
-            frame[y, :, 2] = min(255, max(220, gradient_color + 15))
+        gradient_color = (240 + np.sin(self.backgrounds.rows * 0.005 + wave_offset) * 20).astype(np.int16)
+        column = np.stack([
+            np.clip(gradient_color, 200, 255),
+            np.clip(gradient_color + 8, 210, 255),
+            np.clip(gradient_color + 15, 220, 255)
+        ], axis=1).astype(np.uint8)
+        self.backgrounds.paint_rows(frame, column)
         
         # Floating alphabet letters
         letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
@@ -136,7 +141,7 @@ class RealABCVideoGenerator:
                 alpha = 0.3
                 color = self.colors['accent']
                 
-                cv2.putText(frame, letter, (x, y), font, font_size, color, 3)
+                self.text.put_text(frame, letter, (x, y), font, font_size, color, 3)
         
         return frame
     
@@ -147,27 +152,27 @@ class RealABCVideoGenerator:
         # Main title
         title_size = 2.5
         title_thickness = 6
-        (text_width, text_height), _ = cv2.getTextSize(title, font, title_size, title_thickness)
+        (text_width, text_height), _ = self.text.get_text_size(title, font, title_size, title_thickness)
         title_x = (self.width - text_width) // 2
         title_y = 120
         
         # Title shadow
-        cv2.putText(frame, title, (title_x + 3, title_y + 3), font, title_size, 
-                   (100, 100, 100), title_thickness)
+        self.text.put_text(frame, title, (title_x + 3, title_y + 3), font, title_size, 
+                          (100, 100, 100), title_thickness)
         # Main title
-        cv2.putText(frame, title, (title_x, title_y), font, title_size, 
-                   self.colors['primary'], title_thickness)
+        self.text.put_text(frame, title, (title_x, title_y), font, title_size, 
+                          self.colors['primary'], title_thickness)
         
         # Subtitle
         if subtitle:
             sub_size = 1.2
             sub_thickness = 3
-            (sub_width, sub_height), _ = cv2.getTextSize(subtitle, font, sub_size, sub_thickness)
+            (sub_width, sub_height), _ = self.text.get_text_size(subtitle, font, sub_size, sub_thickness)
             sub_x = (self.width - sub_width) // 2
             sub_y = title_y + 60
             
-            cv2.putText(frame, subtitle, (sub_x, sub_y), font, sub_size, 
-                       self.colors['secondary'], sub_thickness)
+            self.text.put_text(frame, subtitle, (sub_x, sub_y), font, sub_size, 
+                              self.colors['secondary'], sub_thickness)
         
         return frame
     
@@ -224,11 +229,11 @@ class RealABCVideoGenerator:
             font_size = 2.0
             font_thickness = 6
             
-            (text_width, text_height), _ = cv2.getTextSize(letter, font, font_size, font_thickness)
+            (text_width, text_height), _ = self.text.get_text_size(letter, font, font_size, font_thickness)
             text_x = x - text_width // 2
             text_y = y + text_height // 2
             
-            cv2.putText(frame, letter, (text_x, text_y), font, font_size, text_color, font_thickness)
+            self.text.put_text(frame, letter, (text_x, text_y), font, font_size, text_color, font_thickness)
         
         return frame
     
@@ -264,16 +269,16 @@ class RealABCVideoGenerator:
             font_size = 1.8
             font_thickness = 4
             
-            (text_width, text_height), _ = cv2.getTextSize(current_text, font, font_size, font_thickness)
+            (text_width, text_height), _ = self.text.get_text_size(current_text, font, font_size, font_thickness)
             text_x = (self.width - text_width) // 2
             text_y = lyrics_y_start + 80
             
             # Draw text shadow
-            cv2.putText(frame, current_text, (text_x + 2, text_y + 2), font, font_size, 
-                       (0, 0, 0), font_thickness)
+            self.text.put_text(frame, current_text, (text_x + 2, text_y + 2), font, font_size, 
+                              (0, 0, 0), font_thickness)
             # Draw main text
-            cv2.putText(frame, current_text, (text_x, text_y), font, font_size, 
-                       self.colors['lyrics_text'], font_thickness)
+            self.text.put_text(frame, current_text, (text_x, text_y), font, font_size, 
+                              self.colors['lyrics_text'], font_thickness)
         
         # Show progress indicator
         progress_width = int(self.width * 0.8)
@@ -304,10 +309,9 @@ class RealABCVideoGenerator:
         print(f"🎬 Creating video: {config['title']}")
         print(f"🎵 Audio: {audio_file}")
         
-        # Load audio to get duration
+        # Duration from the audio headers (no decoding)
         try:
-            audio_data, sample_rate = sf.read(str(audio_file))
-            audio_duration = len(audio_data) / sample_rate
+            audio_duration = probe_audio(audio_file).duration
             total_frames = int(audio_duration * self.fps)
             
             print(f"⏱️  Audio duration: {audio_duration:.1f} seconds")
@@ -317,70 +321,42 @@ class RealABCVideoGenerator:
             print(f"❌ Error reading audio: {e}")
             return None
         
-        # Create video writer
+        # Output files
         video_filename = f"abc_real_singing_{config['character_type']}.mp4"
         video_path = self.output_dir / video_filename
-        
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(str(video_path), fourcc, self.fps, (self.width, self.height))
+        final_video_path = self.output_dir / f"abc_real_singing_{config['character_type']}_with_audio.mp4"
         
         # Get lyrics for this style
         lyrics = self.lyrics_display.get(config['lyrics_style'], self.lyrics_display['educational'])
         
-        # Generate frames
-        for frame_num in range(total_frames):
-            current_time = frame_num / self.fps
-            
-            # Create base frame
-            frame = self.create_animated_background(frame_num)
-            
-            # Add title
-            frame = self.draw_title_section(frame, "🎵 ABC Song", config['description'])
-            
-            # Add alphabet display
-            frame = self.draw_alphabet_display(frame, current_time, audio_duration)
-            
-            # Add lyrics overlay
-            frame = self.draw_lyrics_overlay(frame, lyrics, current_time, audio_duration)
-            
-            # Write frame
-            video_writer.write(frame)
-            
-            # Progress indicator
-            if frame_num % 60 == 0:  # Every 2 seconds
-                progress = (frame_num / total_frames) * 100
-                print(f"📹 Progress: {progress:.1f}% ({frame_num}/{total_frames} frames)")
-        
-        # Release video writer
-        video_writer.release()
-        print(f"✅ Video created: {video_path}")
-        
-        # Combine video with audio using ffmpeg
-        final_video_path = self.output_dir / f"abc_real_singing_{config['character_type']}_with_audio.mp4"
+        # Generate frames, encoding them together with the audio in a single ffmpeg pass
+        with FFmpegVideoWriter(final_video_path, self.width, self.height, self.fps,
+                               audio_path=audio_file, fallback_path=video_path) as writer:
+            for frame_num in range(total_frames):
+                current_time = frame_num / self.fps
+                
+                # Create base frame
+                frame = self.create_animated_background(frame_num)
+                
+                # Add title
+                frame = self.draw_title_section(frame, "🎵 ABC Song", config['description'])
+                
+                # Add alphabet display
+                frame = self.draw_alphabet_display(frame, current_time, audio_duration)
+                
+                # Add lyrics overlay
+                frame = self.draw_lyrics_overlay(frame, lyrics, current_time, audio_duration)
+                
+                # Write frame
+                writer.write(frame)
+                
+                # Progress indicator
+                if frame_num % 60 == 0:  # Every 2 seconds
+                    progress = (frame_num / total_frames) * 100
+                    print(f"📹 Progress: {progress:.1f}% ({frame_num}/{total_frames} frames)")
         
-        try:
-            print("🎬 Combining video with audio...")
-            subprocess.run([
-                'ffmpeg', '-y',
-                '-i', str(video_path),
-                '-i', str(audio_file),
-                '-c:v', 'copy',
-                '-c:a', 'aac',
-                '-shortest',
-                str(final_video_path)
-            ], check=True, capture_output=True)
-            
-            print(f"✅ Final video with audio: {final_video_path}")
-            
-            # Remove the video-only file
-            if video_path.exists():
-                video_path.unlink()
-            
-            return str(final_video_path)
-            
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Error combining audio and video: {e}")
-            return str(video_path)  # Return video without audio
+        print(f"✅ Final video{' with audio' if writer.has_audio else ''}: {writer.path}")
+        return str(writer.path)
     
     def generate_all_videos(self):
         """Generate all ABC videos with real singing"""
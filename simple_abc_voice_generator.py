@@ -7,8 +7,8 @@ Generate clear spoken ABC songs using espeak
 import subprocess
 import os
 from pathlib import Path
-import soundfile as sf
 import numpy as np
+from audio_probe import probe_audio
 
 class SimpleABCVoiceGenerator:
     """Generate clear ABC voices using espeak"""
@@ -88,8 +88,7 @@ class SimpleABCVoiceGenerator:
                 
                 # Load and check audio duration
                 try:
-                    audio_data, sample_rate = sf.read(str(output_file))
-                    duration = len(audio_data) / sample_rate
+                    duration = probe_audio(output_file).duration
                     print(f"   ⏱️  Duration: {duration:.1f} seconds")
                     
                     if duration < 2:
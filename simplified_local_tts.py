@@ -18,6 +18,8 @@ import soundfile as sf
 from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
 
+from tts_cache import shared_tts_cache
+
 @dataclass
 class SimpleVoiceProfile:
     """Simplified voice profile."""
@@ -50,6 +52,9 @@ class SimplifiedLocalTTS:
             'expert': SimpleVoiceProfile('expert', 'neutral', 0.85, 0.95, 0.9)
         }
         
+        # Synthesised speech shared with the other TTS engines
+        self.cache = shared_tts_cache()
+        
         self.logger.info(f"Simplified Local TTS initialized with {len(self.engines)} engines")
     
     def _detect_engines(self) -> Dict[str, bool]:
@@ -82,7 +87,7 @@ class SimplifiedLocalTTS:
     
     def synthesize_speech(self, text: str, voice_profile: Union[str, SimpleVoiceProfile], 
                          output_path: str) -> Optional[str]:
-        """Synthesize speech using available engines."""
+        """Synthesize speech using available engines (cached on disk)."""
         try:
             # Get voice profile
             if isinstance(voice_profile, str):
@@ -97,11 +102,17 @@ class SimplifiedLocalTTS:
             
             # Try engines in order
             if 'espeak' in self.engines:
-                return self._synthesize_espeak(text, profile, output_path)
+                engine_name, synthesize = 'espeak', self._synthesize_espeak
             elif 'pyttsx3' in self.engines:
-                return self._synthesize_pyttsx3(text, profile, output_path)
+                engine_name, synthesize = 'pyttsx3', self._synthesize_pyttsx3
             else:
-                return self._synthesize_fallback(text, profile, output_path)
+                engine_name, synthesize = 'fallback', self._synthesize_fallback
+            
+            # Identical requests are served from the shared disk cache
+            key = self.cache.key(text, profile, f"simplified:{engine_name}", self.sample_rate)
+            return self.cache.synthesize(
+                key, output_path, lambda: (synthesize(text, profile, output_path), engine_name)
+            )
                 
         except Exception as e:
             self.logger.error(f"Speech synthesis failed: {e}")
@@ -17,11 +17,28 @@ from main import (
     parse_characters_and_scenes, 
     detect_emotion,
     upload_to_youtube,
-    extract_text_from_pdf
+    iter_pdf_pages,
+    render_preview,
+    make_preview_config,
+    new_render_job_id,
+    register_preview,
+    queue_full_render,
+    get_render_job,
+    ENCODER_PRESETS
 )
 from engine.core.video_engine import VideoConfig
+from media_server import media_url, video_html
 from enhanced_video_generator import AdvancedVideoGenerator
 
+def show_video(video_path):
+    """Play a generated video from the media server if MEDIA_BASE_URL is set, else via Streamlit
+    (which reads the whole file into memory)."""
+    video_url = media_url(video_path)
+    if video_url:
+        st.html(video_html(video_url))
+    else:
+        st.video(str(video_path))
+
 def main():
     """Streamlit web interface for AI Video Generator."""
     st.set_page_config(
@@ -43,6 +60,8 @@ def main():
         
         st.header("🎨 Visual Settings")
         use_enhanced_generator = st.checkbox("Use Enhanced Video Generator", value=True)
+        fast_preview = st.checkbox("⚡ Fast Preview First", value=True,
+                                   help="Show a low-resolution preview quickly and render full quality in the background")
         character_style = st.selectbox("Character Style", ["Cartoon", "Realistic", "Minimalist"], index=0)
         background_style = st.selectbox("Background Style", ["Gradient", "Scene-based", "Solid Color"], index=1)
         animation_speed = st.slider("Animation Speed", 0.5, 2.0, 1.0, 0.1)
@@ -112,8 +131,7 @@ def main():
             progress_bar.progress(40)
             
             if pdf_path:
-                story_text = extract_text_from_pdf(pdf_path)
-                characters, scenes = parse_characters_and_scenes(story_text)
+                characters, scenes = parse_characters_and_scenes(iter_pdf_pages(pdf_path))
             else:
                 characters, scenes = parse_characters_and_scenes(script)
             
@@ -146,26 +164,42 @@ def main():
                     'enable_particle_effects': enable_particle_effects
                 }
                 
-                # Generate enhanced video with audio and animation
-                generator.generate_story_video(
-                    script=script,
-                    characters=characters,
-                    scenes=scenes,
-                    output_path=video_path,
-                    width=width,
-                    height=height,
-                    fps=fps,
-                    duration=duration,
-                    style_settings={
-                        'character_style': character_style,
-                        'background_style': background_style,
-                        'animation_speed': animation_speed,
-                        'music_tempo': music_tempo,
-                        'music_volume': music_volume
-                    },
-                    audio_settings=audio_settings,
-                    animation_settings=animation_settings
-                )
+                def render_enhanced(render_generator, output_path, render_scenes, render_config):
+                    # Generate enhanced video with audio and animation
+                    return render_generator.generate_story_video(
+                        script=script,
+                        characters=characters,
+                        scenes=render_scenes,
+                        output_path=output_path,
+                        width=render_config.width,
+                        height=render_config.height,
+                        fps=render_config.fps,
+                        duration=render_config.duration,
+                        style_settings={
+                            'character_style': character_style,
+                            'background_style': background_style,
+                            'animation_speed': animation_speed,
+                            'music_tempo': music_tempo,
+                            'music_volume': music_volume
+                        },
+                        audio_settings=audio_settings,
+                        animation_settings=animation_settings,
+                        preset=ENCODER_PRESETS.get(render_config.quality, 'medium')
+                    )
+                
+                if fast_preview:
+                    job_id = new_render_job_id()
+                    preview_config, scene_limit = make_preview_config(config, max(1, len(scenes)))
+                    video_path = f"enhanced_video_{job_id}_preview.mp4"
+                    render_enhanced(generator, video_path, scenes[:scene_limit], preview_config)
+                    register_preview(job_id, video_path)
+                    queue_full_render(job_id, lambda: render_enhanced(
+                        AdvancedVideoGenerator(), f"enhanced_video_{job_id}.mp4", scenes, config
+                    ))
+                    st.session_state["render_job_id"] = job_id
+                else:
+                    render_enhanced(generator, video_path, scenes, config)
+                    st.session_state.pop("render_job_id", None)
                 
                 # Generate metadata
                 title = f"AI Generated Story: {headline or 'Video Story'}"
@@ -178,6 +212,17 @@ def main():
                     tags.append("music")
                 if enable_advanced_animation:
                     tags.append("animation")
+            elif fast_preview:
+                # Fast preview with the original method; full quality follows in the background
+                video_path, title, tags, job_id = asyncio.run(render_preview(
+                    script=script,
+                    headline=headline,
+                    image_path=image_path,
+                    youtube_link=youtube_link,
+                    pdf_path=pdf_path,
+                    config=config
+                ))
+                st.session_state["render_job_id"] = job_id
             else:
                 # Process video generation with original method
                 video_path, title, tags = asyncio.run(process_video_generation(
@@ -188,20 +233,21 @@ def main():
                     pdf_path=pdf_path,
                     config=config
                 ))
+                st.session_state.pop("render_job_id", None)
             
             progress_bar.progress(100)
-            status_text.text("✅ Video generation complete!")
+            status_text.text("✅ Preview ready!" if fast_preview else "✅ Video generation complete!")
             
         # Results section
-        st.success("🎉 Video generated successfully!")
+        if fast_preview:
+            st.success("⚡ Preview ready! The full-quality video is rendering in the background.")
+        else:
+            st.success("🎉 Video generated successfully!")
         
         # Video preview
         if video_path and Path(video_path).exists():
             st.subheader("🎬 Video Preview")
-            video_file = open(video_path, 'rb')
-            video_bytes = video_file.read()
-            st.video(video_bytes)
-            video_file.close()
+            show_video(video_path)
         
         # Display results in columns
         col1, col2 = st.columns([2, 1])
@@ -252,16 +298,22 @@ def main():
                     st.write("   • Basic Animation Only")
             
             # Download button
-            if video_path and Path(video_path).exists():
-                with open(video_path, 'rb') as f:
-                    video_data = f.read()
-                st.download_button(
+            download_url = media_url(video_path, download=True) if video_path and Path(video_path).exists() else None
+            if download_url:
+                st.link_button(
                     label="📥 Download Video",
-                    data=video_data,
-                    file_name=f"{title.replace(':', '-').replace(' ', '_')}.mp4",
-                    mime="video/mp4",
+                    url=download_url,
                     use_container_width=True
                 )
+            elif video_path and Path(video_path).exists():
+                with open(video_path, 'rb') as f:
+                    st.download_button(
+                        label="📥 Download Video",
+                        data=f,
+                        file_name=f"{title.replace(':', '-').replace(' ', '_')}.mp4",
+                        mime="video/mp4",
+                        use_container_width=True
+                    )
             else:
                 st.error("❌ Video file not found")
         
@@ -304,6 +356,21 @@ def main():
     elif submit:
         st.error("⚠️ Please enter a script or story to generate a video.")
 
+    # Full-quality render queued behind the last preview
+    job_id = st.session_state.get("render_job_id")
+    job = get_render_job(job_id) if job_id else None
+    if job and not submit:
+        st.subheader("🎬 Full-Quality Render")
+        if job["status"] == "rendering":
+            st.info("⏳ Full-quality render in progress. The preview is shown until it finishes.")
+            st.button("🔄 Check Status")
+        elif job["status"] == "complete":
+            st.success("✅ Full-quality video ready!")
+        elif job["status"] == "failed":
+            st.error(f"❌ Full-quality render failed: {job.get('error')}")
+        if Path(job["video_path"]).exists():
+            show_video(job["video_path"])
+
     # Footer
     st.markdown("---")
     st.markdown("🤖 **AI Video Generator v2.0** - Enhanced with Audio & Animation")
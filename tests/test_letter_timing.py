@@ -0,0 +1,57 @@
+"""Letter onset detection on synthetic, noisy recordings of the alphabet."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("soundfile")
+from letter_timing import LetterTimeline, intro_outro_times
+
+SAMPLE_RATE = 16000
+LETTERS = 26
+SPACING = 0.6
+NOISE_RMS = 0.005
+
+def syllable(frequency, level):
+    """Soft 40 ms attack, then a decay"""
+    t = np.arange(int(0.35 * SAMPLE_RATE)) / SAMPLE_RATE
+    return level * np.minimum(1.0, t / 0.04) * np.exp(-t * 6) * np.sin(2 * np.pi * frequency * t)
+
+def spoken_alphabet(seed, spacing=SPACING, letters_share=1.0):
+    """
+    Letters at ``spacing`` over a noise floor, each a vowel followed by a
+    weaker second syllable (about two flux peaks per letter). Returns the
+    audio and the true letter onsets.
+    """
+    rng = np.random.default_rng(seed)
+    letter_time = LETTERS * spacing / letters_share
+    intro = min(2.0, letter_time / 8)     # intro_outro_times' 10% of the whole song
+    duration = letter_time + 2 * intro
+    audio = rng.normal(0, NOISE_RMS, int(duration * SAMPLE_RATE))
+    onsets = intro + spacing * np.arange(LETTERS) + rng.uniform(-0.04, 0.04, LETTERS)
+    for onset in onsets:
+        for delay, level, frequency in ((0.0, 0.3, rng.uniform(150, 300)), (0.22, 0.12, rng.uniform(300, 600))):
+            start = int((onset + delay) * SAMPLE_RATE)
+            sound = syllable(frequency, level)[:len(audio) - start]
+            audio[start:start + len(sound)] += sound
+    return audio.astype(np.float32), onsets
+
+@pytest.mark.parametrize("seed", range(4))
+def test_soft_noisy_onsets_stay_on_their_letters(seed):
+    audio, onsets = spoken_alphabet(seed)
+    timeline = LetterTimeline.from_audio(audio, SAMPLE_RATE)
+
+    assert timeline.letter_count == LETTERS
+    assert np.abs(timeline.boundaries[:-1] - onsets).max() < 0.5 * SPACING
+    if timeline.detected:
+        # Second syllables are skipped rather than taken as letters
+        assert np.median(np.diff(timeline.boundaries[:-1])) == pytest.approx(SPACING, rel=0.1)
+
+def test_implausible_pace_falls_back_to_even_spacing():
+    # Letters twice as fast as the song's length implies: half the expected span
+    audio, _ = spoken_alphabet(0, spacing=SPACING / 2, letters_share=0.5)
+    duration = len(audio) / SAMPLE_RATE
+    timeline = LetterTimeline.from_audio(audio, SAMPLE_RATE)
+
+    assert not timeline.detected
+    np.testing.assert_allclose(timeline.boundaries, LetterTimeline.evenly_spaced(duration).boundaries)
+    assert timeline.boundaries[0] == pytest.approx(intro_outro_times(duration)[0])
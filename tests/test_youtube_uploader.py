@@ -0,0 +1,116 @@
+"""Resumable upload against a local mock of the YouTube upload endpoint."""
+
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+from google.oauth2.credentials import Credentials
+
+import youtube_uploader
+from youtube_uploader import YouTubeUploadWorker
+
+CHUNK_SIZE = 256 * 1024
+SESSION_PATH = "/upload/session/1"
+
+class MockUploadServer:
+    """Minimal resumable-upload protocol: session start, chunk PUTs, status query"""
+
+    def __init__(self):
+        self.received = bytearray()
+        self.fail_chunk = None      # 1-based chunk number answered with HTTP 400
+        self.chunk_offsets = []     # Start byte of every chunk PUT
+        self.status_queries = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.send_response(200)
+                self.send_header("Location", f"http://127.0.0.1:{server.port}{SESSION_PATH}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                total = int(self.headers["Content-Range"].rsplit("/", 1)[1])
+                match = re.match(r"bytes (\d+)-(\d+)/", self.headers["Content-Range"])
+                if match is None:
+                    server.status_queries += 1
+                else:
+                    start = int(match.group(1))
+                    server.chunk_offsets.append(start)
+                    if len(server.chunk_offsets) == server.fail_chunk:
+                        self._reply(400, b'{"error": {"code": 400, "message": "mock failure"}}')
+                        return
+                    assert start == len(server.received)
+                    server.received.extend(body)
+                if len(server.received) == total:
+                    self._reply(200, json.dumps({"id": "mockvideo"}).encode())
+                    return
+                self.send_response(308)
+                if server.received:
+                    self.send_header("Range", f"bytes=0-{len(server.received) - 1}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.port}/"
+
+@pytest.fixture
+def mock_server():
+    server = MockUploadServer()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+def make_worker(tmp_path, endpoint):
+    worker = YouTubeUploadWorker(max_workers=1, token_file=str(tmp_path / "token.json"),
+                                 state_dir=str(tmp_path / "state"), api_endpoint=endpoint,
+                                 chunk_size=CHUNK_SIZE)
+    worker._credentials = Credentials(token="test-token")
+    return worker
+
+def test_interrupted_upload_resumes_mid_file(tmp_path, mock_server, monkeypatch):
+    monkeypatch.setattr(youtube_uploader.time, "sleep", lambda seconds: None)
+    video_path = tmp_path / "video.mp4"
+    data = os.urandom(3 * CHUNK_SIZE + 1000)
+    video_path.write_bytes(data)
+
+    # First run dies on the second chunk, after the session was saved
+    mock_server.fail_chunk = 2
+    worker = make_worker(tmp_path, mock_server.endpoint)
+    with pytest.raises(youtube_uploader.HttpError):
+        worker.upload(str(video_path), "Title", "Description", ["tag"])
+    pending = worker.pending_uploads()
+    assert len(pending) == 1 and pending[0]["resumable_uri"].endswith(SESSION_PATH)
+
+    # A fresh worker (as after a restart) picks it up where the server left off
+    mock_server.fail_chunk = None
+    restarted = make_worker(tmp_path, mock_server.endpoint)
+    futures = restarted.resume_pending()
+    assert [future.result(timeout=30) for future in futures] == ["https://youtu.be/mockvideo"]
+
+    assert mock_server.status_queries == 1
+    assert mock_server.chunk_offsets == [0, CHUNK_SIZE, CHUNK_SIZE, 2 * CHUNK_SIZE, 3 * CHUNK_SIZE]
+    assert bytes(mock_server.received) == data
+    assert restarted.pending_uploads() == []
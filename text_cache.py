@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Text Stamp Cache for the cv2 generators
+- Each (text, font, scale, thickness, line type) rasterised once into a coverage mask
+- Text measured once; the stamp is reused for any position and colour
+- Bounded LRU with hit-rate statistics; drop-in for cv2.putText / cv2.getTextSize
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict
+
+import cv2
+import numpy as np
+
+# Colour blocks kept per stamp (text colours are few; pulsing colours are capped)
+MAX_COLORS_PER_STAMP = 8
+
+class TextStamp:
+    """Alpha mask of one rendered string, offset from the text origin"""
+
+    __slots__ = ('alpha', 'dx', 'dy', 'binary', 'blocks')
+
+    def __init__(self, alpha: np.ndarray, dx: int, dy: int):
+        self.alpha = alpha    # (h, w) uint8 coverage
+        self.dx = dx          # Top-left corner relative to the putText origin
+        self.dy = dy
+        # Non-antialiased text is fully opaque: a masked copy reproduces putText exactly
+        self.binary = bool(((alpha == 0) | (alpha == 255)).all())
+        self.blocks = OrderedDict()
+
+    def block(self, color) -> np.ndarray:
+        """Solid (h, w, 3) block in ``color``, cached per colour"""
+        key = tuple(int(c) for c in color)
+        block = self.blocks.get(key)
+        if block is None:
+            block = np.empty(self.alpha.shape + (3,), dtype=np.uint8)
+            block[:] = key[:3]
+            self.blocks[key] = block
+            if len(self.blocks) > MAX_COLORS_PER_STAMP:
+                self.blocks.popitem(last=False)
+        return block
+
+    def draw(self, frame: np.ndarray, org, color) -> bool:
+        """
+        Stamp the text at ``org``; returns False (drawing nothing) if the stamp
+        can't reproduce putText exactly: antialiased text (blending it measured
+        slower than putText itself) or text clipped by the frame edge (OpenCV
+        rasterises clipped strokes differently).
+        """
+        h, w = self.alpha.shape
+        x, y = org[0] + self.dx, org[1] + self.dy
+        if not self.binary or x < 0 or y < 0 or x + w > frame.shape[1] or y + h > frame.shape[0]:
+            return False
+        cv2.copyTo(self.block(color), self.alpha, frame[y:y + h, x:x + w])
+        return True
+
+class TextStampCache:
+    """
+    Cached replacement for ``cv2.putText`` / ``cv2.getTextSize``.
+
+    Strings that repeat from frame to frame are rasterised once and then
+    stamped with a masked copy of a solid colour block.
+    """
+
+    def __init__(self, max_entries: int = 512, size_cache_entries: int = 4096):
+        self.max_entries = max_entries
+        self.stamps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.get_text_size = lru_cache(maxsize=size_cache_entries)(cv2.getTextSize)
+
+    def stamp(self, text: str, font: int, scale: float, thickness: int = 1,
+              line_type: int = cv2.LINE_8) -> TextStamp:
+        """Cached alpha stamp for the given string and font settings"""
+        key = (text, font, scale, thickness, line_type)
+        stamp = self.stamps.get(key)
+        if stamp is not None:
+            self.stamps.move_to_end(key)
+            self.hits += 1
+            return stamp
+
+        self.misses += 1
+        (width, height), baseline = self.get_text_size(text, font, scale, thickness)
+        # Hershey strokes can overshoot the measured box by about the stroke width
+        pad = 2 * thickness + 4 + int(scale * 4)
+        canvas = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        cv2.putText(canvas, text, (pad, pad + height), font, scale, 255, thickness, line_type)
+        rows = np.flatnonzero(canvas.any(axis=1))
+        cols = np.flatnonzero(canvas.any(axis=0))
+        if len(rows) == 0:
+            stamp = TextStamp(np.zeros((0, 0), dtype=np.uint8), 0, 0)
+        else:
+            r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            stamp = TextStamp(canvas[r0:r1, c0:c1].copy(), c0 - pad, r0 - pad - height)
+
+        self.stamps[key] = stamp
+        if len(self.stamps) > self.max_entries:
+            self.stamps.popitem(last=False)
+        return stamp
+
+    def put_text(self, frame: np.ndarray, text: str, org, font: int, scale: float, color,
+                 thickness: int = 1, line_type: int = cv2.LINE_8) -> np.ndarray:
+        """Same arguments and result as ``cv2.putText``"""
+        if not self.stamp(text, font, scale, thickness, line_type).draw(frame, org, color):
+            cv2.putText(frame, text, org, font, scale, color, thickness, line_type)
+        return frame
+
+    def cache_info(self) -> Dict[str, float]:
+        """Stamp and measurement cache statistics"""
+        lookups = self.hits + self.misses
+        sizes = self.get_text_size.cache_info()
+        size_lookups = sizes.hits + sizes.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.stamps),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'measure_hit_rate': sizes.hits / size_lookups if size_lookups else 0.0
+        }
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Content-addressed TTS Result Cache shared by the TTS engines
+- Keyed by a hash of the normalised text, voice profile, engine, sample rate and emotion
+- Disk-backed; entries written atomically, so several processes can share one directory
+- Size-capped with least-recently-used eviction; a hit is a file link or copy, no synthesis
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", Path.home() / ".cache" / "tts_cache"))
+# Total size of the cached audio; 0 disables the cache
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(2 << 30)))
+# Hard-link hits instead of copying them (outputs then must not be rewritten in place)
+TTS_CACHE_LINK = os.getenv("TTS_CACHE_LINK", "false").lower() == "true"
+# Eviction trims the cache to this fraction of the cap, so it doesn't run on every store
+EVICT_LOW_WATER = 0.9
+# Stores between rescans of the directory (picks up entries written by other processes)
+RESCAN_INTERVAL = 64
+# Temporary files older than this were left by a crashed writer
+STALE_TEMP_SECONDS = 3600
+# Engines whose output is a placeholder (a tone, not speech): never cached, so a
+# transient engine failure isn't served for the key from then on
+UNCACHED_ENGINES = ('fallback',)
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with whitespace runs collapsed: the text as far as synthesis is concerned"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+def _profile_fields(voice) -> Dict:
+    if dataclasses.is_dataclass(voice) and not isinstance(voice, type):
+        return dataclasses.asdict(voice)
+    if isinstance(voice, dict):
+        return dict(voice)
+    return {'name': str(voice)}
+
+class TTSCache:
+    """
+    Disk cache of synthesised speech files.
+
+    Entries live at ``<directory>/<key[:2]>/<key><suffix>``, where the
+    suffix is the output file's extension. The file modification time
+    marks the last use and is what eviction orders by.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 link: bool = TTS_CACHE_LINK):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._size = None  # Bytes on disk, from the last scan plus our own stores
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, text: str, voice, engine: str, sample_rate: int, emotion: Optional[str] = None,
+            **options) -> str:
+        """SHA-256 of everything that determines the synthesised audio"""
+        payload = {
+            'text': normalize_text(text),
+            'voice': _profile_fields(voice),
+            'engine': engine,
+            'sample_rate': sample_rate,
+            'emotion': emotion,
+            'options': options
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def entry_path(self, key: str, output_path) -> Path:
+        return self.directory / key[:2] / f"{key}{Path(output_path).suffix}"
+
+    def fetch(self, key: str, output_path) -> bool:
+        """Put the cached audio for ``key`` at ``output_path``; False on a miss"""
+        if not self.enabled:
+            return False
+        entry = self.entry_path(key, output_path)
+        try:
+            os.utime(entry)  # Mark as recently used
+            self._materialize(entry, Path(output_path))
+        except OSError:
+            # Not cached, or evicted by another process in the meantime
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def _materialize(self, entry: Path, output_path: Path):
+        if self.link:
+            try:
+                if output_path.exists() or output_path.is_symlink():
+                    output_path.unlink()
+                os.link(entry, output_path)
+                return
+            except OSError:
+                pass  # Different filesystem, or links unsupported: copy instead
+        shutil.copyfile(entry, output_path)
+
+    def store(self, key: str, audio_path, output_path=None):
+        """Add the synthesised file ``audio_path`` under ``key`` (errors are logged, not raised)"""
+        if not self.enabled:
+            return
+        entry = self.entry_path(key, output_path or audio_path)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name and renamed into place: readers in other
+            # processes see either no entry or a complete one
+            fd, temp_path = tempfile.mkstemp(dir=entry.parent, prefix='.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as temp, open(audio_path, 'rb') as source:
+                    shutil.copyfileobj(source, temp)
+                os.replace(temp_path, entry)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"TTS cache store failed for {audio_path}: {e}")
+            return
+
+        self.stores += 1
+        if self._size is not None:
+            self._size += entry.stat().st_size
+        if self._size is None or self._size > self.max_bytes or self.stores % RESCAN_INTERVAL == 0:
+            self.evict()
+
+    def synthesize(self, key: str, output_path,
+                   synthesize: Callable[[], Tuple[Optional[str], Optional[str]]]) -> Optional[str]:
+        """
+        ``output_path`` from the cache if present, otherwise ``synthesize()``
+        and cache its file. ``synthesize`` returns (path, engine name); output
+        of UNCACHED_ENGINES is returned but not stored.
+        """
+        if self.fetch(key, output_path):
+            return output_path
+        result, engine_name = synthesize()
+        if result and engine_name not in UNCACHED_ENGINES and os.path.exists(result):
+            self.store(key, result, output_path)
+        return result
+
+    def evict(self):
+        """Rescan the directory and drop the least recently used entries while over the cap"""
+        entries = []
+        now = time.time()
+        for path in self.directory.glob('*/*'):
+            try:
+                stat = path.stat()
+                if path.name.endswith('.tmp'):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        path.unlink()
+                    continue
+            except OSError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size > self.max_bytes:
+            target = self.max_bytes * EVICT_LOW_WATER
+            for _, entry_size, path in sorted(entries, key=lambda entry: entry[0]):
+                if size <= target:
+                    break
+                try:
+                    path.unlink()
+                    self.evictions += 1
+                except OSError:
+                    pass
+                size -= entry_size
+        self._size = size
+
+    def clear(self):
+        """Delete every cached entry"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._size = 0
+
+    def cache_info(self) -> Dict[str, float]:
+        """Hit/miss statistics for this process and the cache's size on disk"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'size_bytes': self._size or 0,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+@lru_cache(maxsize=1)
+def shared_tts_cache() -> TTSCache:
+    """The process-wide TTS cache (created on first use)"""
+    return TTSCache()
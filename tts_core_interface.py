@@ -27,6 +27,7 @@ from pydub.playback import play
 import tempfile
 import markdown
 import re
+from audio_probe import AudioProbeError, probe_audio
 
 # Import our existing TTS engines
 try:
@@ -304,7 +305,7 @@ class CoreTTSInterface:
             timestamp = int(time.time())
             base_filename = f"tts_{voice_id}_{timestamp}"
             
-            # Synthesize with appropriate engine
+            # Synthesize with appropriate engine (the engines cache their own results)
             if engine_name == "tortoise" and 'advanced' in self.engines:
                 audio_path = self._synthesize_tortoise(text, voice_config, base_filename)
             elif engine_name == "coqui" and 'advanced' in self.engines:
@@ -423,7 +424,11 @@ class CoreTTSInterface:
         return output_path
     
     def _get_audio_duration(self, audio_path: str) -> float:
-        """Get audio duration in seconds"""
+        """Get audio duration in seconds (from the file headers when possible)"""
+        try:
+            return probe_audio(audio_path).duration
+        except (AudioProbeError, OSError):
+            pass
         try:
             audio = AudioSegment.from_file(audio_path)
             return len(audio) / 1000.0  # Convert to seconds
@@ -504,14 +509,7 @@ class CoreTTSInterface:
     
     def _calculate_total_duration(self, audio_files: List[str]) -> float:
         """Calculate total duration of audio files"""
-        total_duration = 0
-        for audio_file in audio_files:
-            try:
-                audio = AudioSegment.from_file(audio_file)
-                total_duration += len(audio) / 1000.0
-            except:
-                continue
-        return total_duration
+        return sum(self._get_audio_duration(audio_file) for audio_file in audio_files)
     
     def _prepare_voice_training_data(self, 
                                    audio_files: List[str], 
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Single-pass Video Writer for the cv2 generators
+- Raw BGR frames streamed over stdin into one ffmpeg process
+- Audio muxed as a second input, video encoded once straight to H.264
+- No intermediate mp4v file; falls back to cv2.VideoWriter when ffmpeg is missing
+- Closed-GOP segments joined by stream copy for frame-range sharded renders
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+# Frames kept while encoding with audio, so a failed audio input can be retried without it
+AUDIO_RETRY_BUFFER_BYTES = int(os.getenv("AUDIO_RETRY_BUFFER_BYTES", str(256 << 20)))
+
+class VideoWriterError(RuntimeError):
+    """ffmpeg exited or refused frames while encoding"""
+
+# Encoder flags for segments that are concatenated later: every GOP is
+# closed, so each segment decodes on its own and joins without re-encoding
+CLOSED_GOP_ARGS = ('-flags', '+cgop', '-x264-params', 'open-gop=0')
+
+def ffmpeg_available() -> bool:
+    """True if the ffmpeg binary can be found"""
+    return shutil.which(FFMPEG_BINARY) is not None
+
+class FFmpegVideoWriter:
+    """
+    Encode BGR frames (and optionally an audio file) to ``output_path`` in one pass.
+
+    Usable as a context manager; ``path`` is the file actually written and
+    ``has_audio`` tells whether the audio made it in. Without ffmpeg the
+    frames go to ``fallback_path`` (default ``output_path``) through
+    ``cv2.VideoWriter`` with no audio, as the generators did before.
+
+    If ffmpeg fails while audio is being muxed (typically an unreadable
+    audio file, which ffmpeg reports on its first frames), the encode is
+    restarted once without audio at ``fallback_path`` and the frames so far
+    are replayed. Frames are kept for that only up to
+    ``AUDIO_RETRY_BUFFER_BYTES``; later failures raise VideoWriterError.
+    """
+
+    def __init__(self, output_path, width: int, height: int, fps: float, audio_path=None,
+                 fallback_path=None, crf: int = 23, preset: str = 'medium', shortest: bool = True,
+                 video_args=()):
+        self.output_path = Path(output_path)
+        self.fallback_path = Path(fallback_path) if fallback_path else self.output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.audio_path = str(audio_path) if audio_path else None
+        self.crf = crf
+        self.preset = preset
+        self.shortest = shortest
+        self.video_args = list(video_args)
+
+        self.path = self.output_path
+        self.has_audio = False
+        self.frames_written = 0
+        self._process = None
+        self._stderr = None
+        self._cv2_writer = None
+        self._replay = [] if self.audio_path else None
+        self._replay_bytes = 0
+        self._open()
+
+    def command(self):
+        """ffmpeg argument list for this writer"""
+        cmd = [
+            FFMPEG_BINARY, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}', '-r', str(self.fps),
+            '-i', 'pipe:0',
+        ]
+        if self.audio_path:
+            cmd += ['-i', self.audio_path, '-map', '0:v:0', '-map', '1:a:0']
+        cmd += ['-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf), '-pix_fmt', 'yuv420p']
+        cmd += self.video_args
+        if self.audio_path:
+            cmd += ['-c:a', 'aac']
+            if self.shortest:
+                cmd.append('-shortest')
+        cmd += ['-movflags', '+faststart', str(self.output_path)]
+        return cmd
+
+    def _open(self):
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(self.command(), stdin=subprocess.PIPE,
+                                             stdout=subprocess.DEVNULL, stderr=self._stderr)
+            self.has_audio = self.audio_path is not None
+        except FileNotFoundError:
+            self._stderr.close()
+            self._stderr = None
+            print("⚠️  FFmpeg not found. Video will be created without audio.")
+            self.path = self.fallback_path
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            self._cv2_writer = cv2.VideoWriter(str(self.path), fourcc, self.fps, (self.width, self.height))
+
+    def _error_output(self) -> str:
+        if self._stderr is None:
+            return ''
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors='replace').strip()
+
+    def _keep_for_retry(self, frame: np.ndarray):
+        if self._replay is None:
+            return
+        self._replay_bytes += frame.nbytes
+        if self._replay_bytes > AUDIO_RETRY_BUFFER_BYTES:
+            self._replay = None  # Past the point where the audio input fails; stop buffering
+        else:
+            self._replay.append(np.array(frame))  # Callers reuse their frame buffers
+
+    def _retry_without_audio(self, error: str):
+        """Restart the encode without audio and replay the buffered frames, or raise ``error``"""
+        if self._replay is None:
+            raise VideoWriterError(error)
+        replay, self._replay = self._replay, None
+        print(f"⚠️  Encoding with audio failed ({error}); retrying without audio")
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+        if self.fallback_path != self.output_path:
+            try:
+                os.unlink(self.output_path)
+            except OSError:
+                pass
+        self.audio_path = None
+        self.output_path = self.path = self.fallback_path
+        self._open()
+        for frame in replay:
+            self._write_frame(frame)
+
+    def _write_frame(self, frame: np.ndarray):
+        if self._cv2_writer is not None:
+            self._cv2_writer.write(frame)
+            return
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(frame)))
+        except (BrokenPipeError, ValueError):
+            self._process.wait()
+            self._retry_without_audio(f"ffmpeg stopped accepting frames: {self._error_output()}")
+
+    def write(self, frame: np.ndarray):
+        """Append one (height, width, 3) uint8 BGR frame"""
+        self._keep_for_retry(frame)
+        self._write_frame(frame)
+        self.frames_written += 1
+
+    def close(self) -> Path:
+        """Finish encoding and return the written path"""
+        if self._cv2_writer is not None:
+            self._cv2_writer.release()
+            self._cv2_writer = None
+        elif self._process is not None:
+            process, self._process = self._process, None
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = process.wait()
+            error = self._error_output()
+            self._stderr.close()
+            self._stderr = None
+            if returncode != 0:
+                self._retry_without_audio(f"ffmpeg exited with code {returncode}: {error}")
+                return self.close()
+        self._replay = None
+        return self.path
+
+    def abort(self):
+        """Stop encoding without waiting for a complete file"""
+        self._replay = None
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+        if self._cv2_writer is not None:
+            self._cv2_writer.release()
+            self._cv2_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+def concat_segments(segment_paths, output_path, audio_path=None, shortest: bool = True,
+                    duration: Optional[float] = None) -> Path:
+    """
+    Join H.264 segments (encoded with identical settings) into ``output_path``.
+
+    Streams are copied, so the join is lossless; an external ``audio_path``,
+    if given, replaces the segments' audio and is encoded to AAC in the same pass.
+    """
+    output_path = Path(output_path)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', dir=output_path.parent, delete=False) as listing:
+        for path in segment_paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    cmd = [FFMPEG_BINARY, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', listing.name]
+    if audio_path:
+        cmd += ['-i', str(audio_path), '-map', '0:v:0', '-map', '1:a:0', '-c:v', 'copy', '-c:a', 'aac']
+        if shortest:
+            cmd.append('-shortest')
+    else:
+        cmd += ['-c', 'copy']
+    if duration:
+        cmd += ['-t', f'{duration:.3f}']  # Trimmed at packet level, still without re-encoding
+    cmd += ['-movflags', '+faststart', str(output_path)]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    finally:
+        os.unlink(listing.name)
+    if result.returncode != 0:
+        raise VideoWriterError(f"ffmpeg concat failed: {result.stderr.strip()}")
+    return output_path
@@ -6,13 +6,18 @@ Create TV-quality educational videos with professional animations and voices
 
 import cv2
 import numpy as np
-import soundfile as sf
 from pathlib import Path
 import random
 import math
-import subprocess
 import os
 import time
+from background_engine import BackgroundEngine
+from collection_runner import CollectionRunner, RenderJob, DONE, SKIPPED, estimate_frames
+from frame_sharding import default_shards, render_sharded
+from video_writer import FFmpegVideoWriter
+from text_cache import TextStampCache
+from motion_tables import MotionTables, drift, ray_segments, truncate, wave
+from audio_probe import probe_audio
 
 class YouTubeProfessionalABCGenerator:
     """Generate professional YouTube-style ABC educational videos"""
@@ -26,6 +31,9 @@ class YouTubeProfessionalABCGenerator:
         self.width = 1920
         self.height = 1080
         self.fps = 30
+        self.text = TextStampCache()
+        self.backgrounds = BackgroundEngine(self.width, self.height)
+        self.motion = MotionTables(self.build_motion_tables)
         
         # Professional TV-style colors
         self.colors = {
@@ -66,27 +74,37 @@ class YouTubeProfessionalABCGenerator:
         # Letter display timing (based on typical ABC song timing)
         self.letter_sequence = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
         
+    def build_motion_tables(self, frames):
+        """Trajectories of the background elements for the given frame numbers"""
+        sun_size = 70 + truncate(wave(frames, 10, 0.1))
+        return {
+            'cloud_x': drift(frames, (200, 400, 600), (1, 1.5, 0.8), self.width + 300,
+                             self.width + 150, self.width + 450),
+            'sun_size': sun_size,
+            'sun_rays': ray_segments(frames, (1650, 200), 16, 0.03, sun_size + 10, sun_size + 40),
+            'note_positions': np.stack([
+                np.stack([300 + truncate(wave(frames, 50, 0.05)),
+                          300 + truncate(wave(frames, 30, 0.07, func=np.cos))], axis=-1),
+                np.stack([1200 + truncate(wave(frames, 40, 0.06, func=np.cos)),
+                          250 + truncate(wave(frames, 25, 0.08))], axis=-1),
+                np.stack([800 + truncate(wave(frames, 35, 0.04)),
+                          400 + truncate(wave(frames, 20, 0.09, func=np.cos))], axis=-1),
+            ], axis=1),
+            'note_sizes': np.stack([truncate(15 + wave(frames, 5, 0.1, phase=i)) for i in range(3)], axis=1),
+        }
+    
     def create_tv_background(self, frame_num, total_frames):
         """Create animated TV-style background"""
-        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.motion.prepare(total_frames)
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
         
-        # Animated sky gradient
-        for y in range(self.height // 2):
-            ratio = y / (self.height // 2)
-            color1 = self.colors['sky_gradient_1']
-            color2 = self.colors['sky_gradient_2']
-            
-            # Animate gradient
-            time_shift = math.sin(frame_num * 0.02) * 20
-            b = int(color1[0] * (1 - ratio) + color2[0] * ratio + time_shift)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio + time_shift)
-            r = int(color1[2] * (1 - ratio) + color2[2] * ratio + time_shift)
-            
-            frame[y, :] = [max(0, min(255, b)), max(0, min(255, g)), max(0, min(255, r))]
+        # Animated sky gradient: cached ramp plus a per-frame shift
+        time_shift = math.sin(frame_num * 0.02) * 20
+        self.backgrounds.paint_gradient(frame, self.colors['sky_gradient_1'], self.colors['sky_gradient_2'],
+                                        self.height // 2, time_shift)
         
         # Ground
-        ground_color = self.colors['grass_green']
-        frame[self.height // 2:, :] = ground_color
+        self.backgrounds.paint_ground(frame, self.colors['grass_green'], self.height // 2)
         
         # Add animated elements
         self.add_animated_clouds(frame, frame_num)
@@ -98,16 +116,10 @@ class YouTubeProfessionalABCGenerator:
     
     def add_animated_clouds(self, frame, frame_num):
         """Add moving clouds"""
-        cloud_positions = [
-            (200 + (frame_num * 1) % (self.width + 300), 150),
-            (400 + (frame_num * 1.5) % (self.width + 300), 100),
-            (600 + (frame_num * 0.8) % (self.width + 300), 180),
-        ]
+        # Positions (already wrapped around the screen) come from the motion tables
+        cloud_x = self.motion.track('cloud_x', frame_num).tolist()
         
-        for x, y in cloud_positions:
-            if x > self.width + 150:
-                x -= self.width + 450
-            
+        for x, y in zip(cloud_x, (150, 100, 180)):
             # Draw fluffy cloud shape
             cv2.ellipse(frame, (int(x), int(y)), (60, 30), 0, 0, 360, self.colors['cloud_white'], -1)
             cv2.ellipse(frame, (int(x-30), int(y+10)), (40, 25), 0, 0, 360, self.colors['cloud_white'], -1)
@@ -117,26 +129,16 @@ class YouTubeProfessionalABCGenerator:
     def add_animated_sun(self, frame, frame_num):
         """Add animated sun with face"""
         sun_x, sun_y = 1650, 200
-        sun_size = 70
         
         # Pulsing effect
-        pulse = int(10 * math.sin(frame_num * 0.1))
-        current_size = sun_size + pulse
+        current_size = int(self.motion.track('sun_size', frame_num))
         
         # Sun body
         cv2.circle(frame, (sun_x, sun_y), current_size, self.colors['sun_yellow'], -1)
         
         # Sun rays
-        num_rays = 16
-        ray_length = 40
-        for i in range(num_rays):
-            angle = (i * 2 * math.pi / num_rays) + (frame_num * 0.03)
-            start_x = sun_x + int((current_size + 10) * math.cos(angle))
-            start_y = sun_y + int((current_size + 10) * math.sin(angle))
-            end_x = sun_x + int((current_size + ray_length) * math.cos(angle))
-            end_y = sun_y + int((current_size + ray_length) * math.sin(angle))
-            
-            cv2.line(frame, (start_x, start_y), (end_x, end_y), self.colors['sun_yellow'], 6)
+        for start, end in self.motion.track('sun_rays', frame_num).tolist():
+            cv2.line(frame, tuple(start), tuple(end), self.colors['sun_yellow'], 6)
         
         # Sun face
         # Eyes
@@ -172,17 +174,11 @@ class YouTubeProfessionalABCGenerator:
     
     def add_floating_musical_notes(self, frame, frame_num):
         """Add floating musical notes"""
-        notes = ['♪', '♫', '♬', '♩']
-        positions = [
-            (300 + int(50 * math.sin(frame_num * 0.05)), 300 + int(30 * math.cos(frame_num * 0.07))),
-            (1200 + int(40 * math.cos(frame_num * 0.06)), 250 + int(25 * math.sin(frame_num * 0.08))),
-            (800 + int(35 * math.sin(frame_num * 0.04)), 400 + int(20 * math.cos(frame_num * 0.09))),
-        ]
+        positions = self.motion.track('note_positions', frame_num).tolist()
+        sizes = self.motion.track('note_sizes', frame_num).tolist()
         
-        for i, (x, y) in enumerate(positions):
-            note = notes[i % len(notes)]
+        for (x, y), size in zip(positions, sizes):
             # Note: OpenCV doesn't support Unicode characters well, so we'll use circles instead
-            size = int(15 + 5 * math.sin(frame_num * 0.1 + i))
             cv2.circle(frame, (x, y), size, (255, 100, 255), -1)
             cv2.circle(frame, (x, y), size, (255, 255, 255), 2)
     
@@ -255,7 +251,7 @@ class YouTubeProfessionalABCGenerator:
         cv2.ellipse(frame, (char_x - 15, char_y + 110), (20, 8), 0, 0, 180, self.colors['black'], -1)
         cv2.ellipse(frame, (char_x + 15, char_y + 110), (20, 8), 0, 0, 180, self.colors['black'], -1)
     
-    def draw_alphabet_display(self, frame, current_time, total_time):
+    def draw_alphabet_display(self, frame, current_time, total_time, frame_num):
         """Draw animated alphabet letters"""
         letters_per_second = 26 / total_time  # Distribute 26 letters across total time
         
@@ -298,16 +294,17 @@ class YouTubeProfessionalABCGenerator:
                     letter_color = (255, 255, 255)  # White for current letter
                 
                 # Draw letter shadow
-                cv2.putText(frame, letter, (x + 3, y + 3), cv2.FONT_HERSHEY_SIMPLEX, 
-                           font_size, self.colors['text_shadow'], thickness)
+                self.text.put_text(frame, letter, (x + 3, y + 3), cv2.FONT_HERSHEY_SIMPLEX, 
+                                  font_size, self.colors['text_shadow'], thickness)
                 
                 # Draw main letter
-                cv2.putText(frame, letter, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 
-                           font_size, letter_color, thickness)
+                self.text.put_text(frame, letter, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 
+                                  font_size, letter_color, thickness)
     
-    def draw_title_and_progress(self, frame, title, current_time, total_time):
+    def draw_title_and_progress(self, frame, title, current_time, total_time, frame_num):
         """Draw animated title and progress"""
         # Title
+        # The scale changes every frame, so there is nothing to reuse from the text cache
         title_scale = 1.5 + 0.2 * math.sin(frame_num * 0.08)
         cv2.putText(frame, title, (50, 80), cv2.FONT_HERSHEY_DUPLEX, 
                    title_scale, self.colors['text_shadow'], 6)
@@ -330,81 +327,70 @@ class YouTubeProfessionalABCGenerator:
         
         # Progress text
         progress_text = f"Learning Progress: {int(progress * 100)}%"
-        cv2.putText(frame, progress_text, (bar_x, bar_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 
-                   0.6, self.colors['white'], 2)
+        self.text.put_text(frame, progress_text, (bar_x, bar_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 
+                          0.6, self.colors['white'], 2)
+    
+    def render_frame(self, frame_num, total_frames, duration, title, character_type='teacher'):
+        """Render one frame; a pure function of its arguments"""
+        current_time = frame_num / self.fps
+        
+        # Create TV-style background
+        frame = self.create_tv_background(frame_num, total_frames)
+        
+        # Draw animated character
+        self.draw_tv_character(frame, frame_num, character_type)
+        
+        # Draw animated alphabet
+        self.draw_alphabet_display(frame, current_time, duration, frame_num)
+        
+        # Draw title and progress
+        self.draw_title_and_progress(frame, title, current_time, duration, frame_num)
+        
+        return frame
     
-    def create_professional_youtube_video(self, audio_file, title, character_type='teacher'):
-        """Create professional YouTube-style video"""
+    def create_professional_youtube_video(self, audio_file, title, character_type='teacher', shards=None):
+        """
+        Create professional YouTube-style video
+        
+        Long videos are split into frame ranges rendered by separate processes
+        (``shards``, default: one per core when worthwhile).
+        """
         print(f"📺 Creating YouTube video: {title}")
         
-        # Load audio
-        audio_data, sample_rate = sf.read(audio_file)
-        duration = len(audio_data) / sample_rate
+        # Duration from the audio headers (no decoding)
+        duration = probe_audio(audio_file).duration
         total_frames = int(duration * self.fps)
         
         print(f"  📊 Duration: {duration:.1f}s, Frames: {total_frames}")
         
-        # Output files
+        # Output file
         video_name = f"youtube_professional_{Path(audio_file).stem}.mp4"
-        temp_video = self.output_dir / f"temp_{video_name}"
         final_video = self.output_dir / video_name
         
-        # Video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(temp_video), fourcc, self.fps, (self.width, self.height))
-        
         print("  🎨 Creating professional TV-style animation...")
         
-        global frame_num
-        for frame_num in range(total_frames):
-            current_time = frame_num / self.fps
-            
-            if frame_num % 90 == 0:  # Update every 3 seconds
-                progress = int((frame_num / total_frames) * 100)
-                print(f"    📹 Progress: {progress}% - Frame {frame_num}/{total_frames}")
-            
-            # Create TV-style background
-            frame = self.create_tv_background(frame_num, total_frames)
-            
-            # Draw animated character
-            self.draw_tv_character(frame, frame_num, character_type)
-            
-            # Draw animated alphabet
-            self.draw_alphabet_display(frame, current_time, duration)
-            
-            # Draw title and progress
-            self.draw_title_and_progress(frame, title, current_time, duration)
-            
-            # Write frame
-            out.write(frame)
-        
-        out.release()
-        print(f"  ✅ Animation complete: {temp_video}")
-        
-        # Combine with audio
-        print("  🎵 Adding professional audio...")
-        ffmpeg_cmd = [
-            'ffmpeg', '-y',
-            '-i', str(temp_video),
-            '-i', str(audio_file),
-            '-c:v', 'libx264',
-            '-c:a', 'aac',
-            '-shortest',
-            str(final_video)
-        ]
-        
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        render_args = (total_frames, duration, title, character_type)
+        shards = shards or default_shards(total_frames)
+        if shards > 1:
+            video_path = render_sharded(self, 'render_frame', render_args, total_frames, final_video,
+                                        audio_path=audio_file, shards=shards)
+            print(f"  🎊 YouTube video created: {video_path}")
+            return str(video_path)
+        
+        # Frames and audio are encoded together in a single ffmpeg pass
+        with FFmpegVideoWriter(final_video, self.width, self.height, self.fps, audio_path=audio_file) as writer:
+            for frame_num in range(total_frames):
+                if frame_num % 90 == 0:  # Update every 3 seconds
+                    progress = int((frame_num / total_frames) * 100)
+                    print(f"    📹 Progress: {progress}% - Frame {frame_num}/{total_frames}")
+                
+                writer.write(self.render_frame(frame_num, *render_args))
         
-        if result.returncode == 0:
-            temp_video.unlink()
-            print(f"  🎊 YouTube video created: {final_video}")
-            return str(final_video)
-        else:
-            print(f"  ❌ Audio error: {result.stderr}")
-            return str(temp_video)
+        print(f"  🎊 YouTube video created: {writer.path}")
+        return str(writer.path)
     
-    def generate_all_youtube_videos(self):
-        """Generate all professional YouTube videos"""
+    def generate_all_youtube_videos(self, max_workers=None):
+        """Generate all professional YouTube videos (rendered in parallel)"""
         print("📺 Creating Professional YouTube-Style ABC Educational Videos!")
         print("=" * 80)
         
@@ -418,24 +404,26 @@ class YouTubeProfessionalABCGenerator:
             ('super_fun_abc.wav', '🎉 Super Fun ABC Party', 'boy'),
         ]
         
-        created_videos = []
-        
+        jobs = []
         for audio_filename, title, character_type in video_configs:
             audio_file = self.audio_dir / audio_filename
             
             if audio_file.exists():
-                try:
-                    video_path = self.create_professional_youtube_video(
-                        str(audio_file), title, character_type
-                    )
-                    created_videos.append(video_path)
-                    print()  # Add spacing between videos
-                    
-                except Exception as e:
-                    print(f"❌ Error creating {title}: {e}")
+                jobs.append(RenderJob(
+                    title=title,
+                    method='create_professional_youtube_video',
+                    args=(str(audio_file), title, character_type),
+                    output_path=self.output_dir / f"youtube_professional_{audio_file.stem}.mp4",
+                    inputs=(audio_file,),
+                    estimated_frames=estimate_frames(audio_file, self.fps)
+                ))
             else:
                 print(f"⚠️  Audio file not found: {audio_file}")
         
+        # Render the collection across worker processes
+        CollectionRunner(self, max_workers=max_workers).run(jobs)
+        created_videos = [job.result for job in jobs if job.status in (DONE, SKIPPED)]
+        
         print("🎊 Professional YouTube Video Generation Complete!")
         print(f"✅ Created {len(created_videos)} TV-quality educational videos")
         print("\n📁 YouTube-Ready Videos:")
@@ -6,14 +6,17 @@ Create professional TV-quality educational videos with automatic animations
 
 import cv2
 import numpy as np
-import soundfile as sf
 from pathlib import Path
 import random
 import math
-import subprocess
 import os
 import json
 import time
+from background_engine import BackgroundEngine, saturate
+from video_writer import FFmpegVideoWriter
+from text_cache import TextStampCache
+from motion_tables import MotionTables, drift, ray_segments
+from audio_probe import probe_audio
 
 class YouTubeStyleABCGenerator:
     """Generate professional YouTube-style ABC educational videos"""
@@ -27,6 +30,13 @@ class YouTubeStyleABCGenerator:
         self.width = 1920  # Full HD
         self.height = 1080
         self.fps = 30
+        self.text = TextStampCache()
+        self.backgrounds = BackgroundEngine(self.width, self.height)
+        self.motion = MotionTables(self.build_motion_tables)
+        # Red channel of the moving gradient depends only on x + y + shift;
+        # shifts span [-50, 50], so one table covers every frame
+        diagonal = np.arange(-50, self.width + self.height + 50, dtype=np.float64)
+        self.gradient_red = saturate(200 + 55 * np.sin(diagonal * 0.01))
         
         # Professional color palette
         self.colors = {
@@ -76,22 +86,31 @@ class YouTubeStyleABCGenerator:
             'celebrating': {'eye_y': -10, 'mouth_curve': 25, 'arm_angle': 60}
         }
     
+    def build_motion_tables(self, frames):
+        """Trajectories of the background elements for the given frame numbers"""
+        sun_radius = 80
+        return {
+            'cloud_x': drift(frames, (100, 300, 500), (2, 1.5, 2.5), self.width + 200,
+                             self.width + 100, self.width + 300),
+            'sun_rays': ray_segments(frames, (1700, 200), 12, 0.05, sun_radius + 10, 120),
+        }
+    
     def create_animated_background(self, frame_num, total_frames):
         """Create animated background like TV shows"""
-        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.motion.prepare(total_frames)
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
         
         # Animated gradient background
         time_factor = frame_num / total_frames
         gradient_shift = int(50 * math.sin(time_factor * 4 * math.pi))
         
-        for y in range(self.height):
-            for x in range(self.width):
-                # Create moving gradient
-                r = int(200 + 55 * math.sin((x + y + gradient_shift) * 0.01))
-                g = int(220 + 35 * math.cos((x - gradient_shift) * 0.008))
-                b = int(255 - 30 * math.sin((y + gradient_shift) * 0.012))
-                
-                frame[y, x] = [max(0, min(255, b)), max(0, min(255, g)), max(0, min(255, r))]
+        # Moving gradient, one broadcast per channel:
+        # blue varies by row, green by column, red along the diagonal
+        x = self.backgrounds.columns
+        y = self.backgrounds.rows
+        frame[:, :, 0] = saturate(255 - 30 * np.sin((y + gradient_shift) * 0.012))[:, None]
+        frame[:, :, 1] = saturate(220 + 35 * np.cos((x - gradient_shift) * 0.008))[None, :]
+        frame[:, :, 2] = self.backgrounds.diagonal_field(self.gradient_red, gradient_shift + 50)
         
         # Add animated clouds
         self.draw_animated_clouds(frame, frame_num)
@@ -106,16 +125,10 @@ class YouTubeStyleABCGenerator:
     
     def draw_animated_clouds(self, frame, frame_num):
         """Draw moving clouds"""
-        cloud_positions = [
-            (100 + (frame_num * 2) % (self.width + 200), 100),
-            (300 + (frame_num * 1.5) % (self.width + 200), 150),
-            (500 + (frame_num * 2.5) % (self.width + 200), 80)
-        ]
+        # Positions (already wrapped around the screen) come from the motion tables
+        cloud_x = self.motion.track('cloud_x', frame_num).tolist()
         
-        for x, y in cloud_positions:
-            if x > self.width + 100:
-                x -= self.width + 300
-            
+        for x, y in zip(cloud_x, (100, 150, 80)):
             # Draw fluffy cloud
             cv2.circle(frame, (int(x), int(y)), 40, self.colors['cloud_white'], -1)
             cv2.circle(frame, (int(x-20), int(y+10)), 35, self.colors['cloud_white'], -1)
@@ -131,16 +144,8 @@ class YouTubeStyleABCGenerator:
         cv2.circle(frame, (sun_x, sun_y), sun_radius, self.colors['sun_yellow'], -1)
         
         # Animated sun rays
-        ray_length = 120
-        num_rays = 12
-        for i in range(num_rays):
-            angle = (i * 2 * math.pi / num_rays) + (frame_num * 0.05)
-            start_x = sun_x + int((sun_radius + 10) * math.cos(angle))
-            start_y = sun_y + int((sun_radius + 10) * math.sin(angle))
-            end_x = sun_x + int(ray_length * math.cos(angle))
-            end_y = sun_y + int(ray_length * math.sin(angle))
-            
-            cv2.line(frame, (start_x, start_y), (end_x, end_y), self.colors['sun_yellow'], 8)
+        for start, end in self.motion.track('sun_rays', frame_num).tolist():
+            cv2.line(frame, tuple(start), tuple(end), self.colors['sun_yellow'], 8)
         
         # Sun face
         # Eyes
@@ -289,12 +294,12 @@ class YouTubeStyleABCGenerator:
         
         # Draw letter shadow
         shadow_offset = max(2, int(5 * scale))
-        cv2.putText(frame, letter, (base_x + shadow_offset, letter_y + shadow_offset), 
-                   self.fonts['letter'], font_size, (50, 50, 50), thickness)
+        self.text.put_text(frame, letter, (base_x + shadow_offset, letter_y + shadow_offset), 
+                          self.fonts['letter'], font_size, (50, 50, 50), thickness)
         
         # Draw main letter
-        cv2.putText(frame, letter, (base_x, letter_y), 
-                   self.fonts['letter'], font_size, letter_color, thickness)
+        self.text.put_text(frame, letter, (base_x, letter_y), 
+                          self.fonts['letter'], font_size, letter_color, thickness)
         
         # Add sparkle effect when letter appears
         if current_time >= start_time and current_time <= start_time + 0.5:
@@ -340,95 +345,60 @@ class YouTubeStyleABCGenerator:
         
         # Progress text
         progress_text = f"{int(progress * 100)}%"
-        cv2.putText(frame, progress_text, (bar_x + bar_width + 20, bar_y + 15), 
-                   self.fonts['subtitle'], 0.7, (255, 255, 255), 2)
+        self.text.put_text(frame, progress_text, (bar_x + bar_width + 20, bar_y + 15), 
+                          self.fonts['subtitle'], 0.7, (255, 255, 255), 2)
     
     def create_youtube_style_video(self, audio_file, title, character_expression='happy'):
         """Create professional YouTube-style educational video"""
         print(f"🎬 Creating YouTube-style video: {title}")
         
-        # Load audio to get duration
-        audio_data, sample_rate = sf.read(audio_file)
-        duration = len(audio_data) / sample_rate
+        # Duration from the audio headers (no decoding)
+        duration = probe_audio(audio_file).duration
         total_frames = int(duration * self.fps)
         
         print(f"  📊 Duration: {duration:.1f}s, Frames: {total_frames}")
         
         # Output video file
         video_filename = f"youtube_style_{Path(audio_file).stem}.mp4"
-        temp_video = self.output_dir / f"temp_{video_filename}"
         final_video = self.output_dir / video_filename
         
-        # Video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(temp_video), fourcc, self.fps, (self.width, self.height))
-        
         print("  🎨 Generating frames...")
         
-        for frame_num in range(total_frames):
-            current_time = frame_num / self.fps
-            progress = int((frame_num / total_frames) * 100)
-            
-            if frame_num % 60 == 0:  # Update every 2 seconds
-                print(f"    📹 Progress: {progress}% ({frame_num}/{total_frames})")
-            
-            # Create base animated background
-            frame = self.create_animated_background(frame_num, total_frames)
-            
-            # Draw animated character
-            self.draw_animated_character(frame, frame_num, character_expression)
-            
-            # Draw title
-            title_y = 60
-            cv2.putText(frame, title, (50, title_y), self.fonts['title'], 2.0, 
-                       (255, 255, 255), 6)
-            cv2.putText(frame, title, (50, title_y), self.fonts['title'], 2.0, 
-                       (0, 100, 255), 4)
-            
-            # Draw all letters with animation
-            letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-            for letter in letters:
-                self.draw_animated_letter(frame, letter, current_time, frame_num)
-            
-            # Draw progress bar
-            self.draw_progress_bar(frame, current_time, duration)
-            
-            # Add frame to video
-            out.write(frame)
-        
-        out.release()
-        print(f"  ✅ Video frames created: {temp_video}")
-        
-        # Combine with audio using ffmpeg
-        print("  🎵 Adding audio...")
-        try:
-            # Use ffmpeg to combine video and audio
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',
-                '-i', str(temp_video),
-                '-i', str(audio_file),
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-shortest',
-                str(final_video)
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                # Cleanup temp file
-                if temp_video.exists():
-                    temp_video.unlink()
+        # Frames and audio are encoded together in a single ffmpeg pass
+        with FFmpegVideoWriter(final_video, self.width, self.height, self.fps, audio_path=audio_file) as writer:
+            for frame_num in range(total_frames):
+                current_time = frame_num / self.fps
+                progress = int((frame_num / total_frames) * 100)
                 
-                print(f"  🎉 YouTube-style video created: {final_video}")
-                return str(final_video)
-            else:
-                print(f"  ❌ FFmpeg error: {result.stderr}")
-                return str(temp_video)
-            
-        except Exception as e:
-            print(f"  ❌ Error combining audio: {e}")
-            return str(temp_video)
+                if frame_num % 60 == 0:  # Update every 2 seconds
+                    print(f"    📹 Progress: {progress}% ({frame_num}/{total_frames})")
+                
+                # Create base animated background
+                frame = self.create_animated_background(frame_num, total_frames)
+                
+                # Draw animated character
+                self.draw_animated_character(frame, frame_num, character_expression)
+                
+                # Draw title
+                title_y = 60
+                self.text.put_text(frame, title, (50, title_y), self.fonts['title'], 2.0, 
+                                  (255, 255, 255), 6)
+                self.text.put_text(frame, title, (50, title_y), self.fonts['title'], 2.0, 
+                                  (0, 100, 255), 4)
+                
+                # Draw all letters with animation
+                letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+                for letter in letters:
+                    self.draw_animated_letter(frame, letter, current_time, frame_num)
+                
+                # Draw progress bar
+                self.draw_progress_bar(frame, current_time, duration)
+                
+                # Add frame to video
+                writer.write(frame)
+        
+        print(f"  🎉 YouTube-style video created: {writer.path}")
+        return str(writer.path)
     
     def generate_all_youtube_videos(self):
         """Generate all YouTube-style ABC videos"""
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Background YouTube Upload Worker
+- OAuth credentials cached on disk and refreshed silently
+- Resumable chunked uploads with exponential backoff
+- Upload state persisted so an interrupted upload resumes mid-file
+- Uploads run in a thread pool, concurrently with rendering
+"""
+
+import hashlib
+import json
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+YOUTUBE_SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
+CLIENT_SECRETS_FILE = os.getenv("YOUTUBE_CLIENT_SECRETS", "client_secrets.json")
+TOKEN_FILE = os.getenv("YOUTUBE_TOKEN_FILE", "youtube_token.json")
+UPLOAD_STATE_DIR = os.getenv("YOUTUBE_UPLOAD_STATE_DIR", "upload_state")
+# Alternative API endpoint, e.g. a local mock server
+YOUTUBE_API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT")
+
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Must be a multiple of 256 KiB
+MAX_RETRIES = 8
+RETRIABLE_STATUS_CODES = {500, 502, 503, 504}
+# Network failures only: other OSErrors (e.g. the video file vanishing) fail immediately
+RETRIABLE_EXCEPTIONS = (ConnectionError, TimeoutError, socket.timeout)
+
+class YouTubeUploadWorker:
+    """Uploads videos to YouTube in background threads"""
+
+    def __init__(self, max_workers: int = 2, client_secrets_file: str = CLIENT_SECRETS_FILE,
+                 token_file: str = TOKEN_FILE, state_dir: str = UPLOAD_STATE_DIR,
+                 api_endpoint: Optional[str] = YOUTUBE_API_ENDPOINT,
+                 chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.client_secrets_file = client_secrets_file
+        self.token_file = token_file
+        self.state_dir = state_dir
+        self.api_endpoint = api_endpoint
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="youtube-upload")
+        self._credentials: Optional[Credentials] = None
+        self._credentials_lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+
+    # Credentials
+
+    def get_credentials(self) -> Credentials:
+        """Load cached credentials, refreshing or running the OAuth flow only when needed"""
+        with self._credentials_lock:
+            creds = self._credentials
+            if creds is None and os.path.exists(self.token_file):
+                creds = Credentials.from_authorized_user_file(self.token_file, YOUTUBE_SCOPES)
+
+            if creds and creds.valid:
+                self._credentials = creds
+                return creds
+
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(self.client_secrets_file, YOUTUBE_SCOPES)
+                creds = flow.run_console() if hasattr(flow, "run_console") else flow.run_local_server(port=0)
+
+            with open(self.token_file, "w") as f:
+                f.write(creds.to_json())
+            self._credentials = creds
+            return creds
+
+    def _build_service(self):
+        client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+        return build("youtube", "v3", credentials=self.get_credentials(),
+                     client_options=client_options, cache_discovery=False)
+
+    # Persistent upload state
+
+    def _state_path(self, video_path: str) -> str:
+        stat = os.stat(video_path)
+        key = f"{os.path.abspath(video_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return os.path.join(self.state_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:24] + ".json")
+
+    def _load_state(self, state_path: str) -> Dict:
+        try:
+            with open(state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state_path: str, state: Dict):
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    # Upload
+
+    def upload(self, video_path: str, title: str, description: str, tags: List[str],
+               privacy_status: str = "private", category_id: str = "22") -> str:
+        """
+        Upload a video synchronously with resumable chunks.
+
+        Returns:
+            str: The video URL
+        """
+        state_path = self._state_path(video_path)
+        state = self._load_state(state_path)
+        if state.get("video_id"):
+            print(f"Already uploaded: {video_path}")
+            return f"https://youtu.be/{state['video_id']}"
+
+        state.update(video_path=os.path.abspath(video_path), title=title, description=description,
+                     tags=tags, privacy_status=privacy_status, category_id=category_id)
+
+        youtube = self._build_service()
+        media = MediaFileUpload(video_path, mimetype="video/mp4",
+                                chunksize=self.chunk_size, resumable=True)
+        request = youtube.videos().insert(
+            part="snippet,status",
+            body={
+                "snippet": {
+                    "title": title,
+                    "description": description,
+                    "tags": tags,
+                    "categoryId": category_id
+                },
+                "status": {
+                    "privacyStatus": privacy_status
+                }
+            },
+            media_body=media
+        )
+        if self.api_endpoint:
+            # googleapiclient moves only the host of upload URLs to the endpoint, keeping https
+            endpoint = urlparse(self.api_endpoint)
+            request.uri = urlparse(request.uri)._replace(scheme=endpoint.scheme,
+                                                         netloc=endpoint.netloc).geturl()
+
+        response = None
+        if state.get("resumable_uri"):
+            response = self._resume_session(request, state, state_path, os.path.getsize(video_path))
+
+        retries = 0
+        while response is None:
+            try:
+                status, response = request.next_chunk()
+                retries = 0
+                if status:
+                    state["progress"] = status.resumable_progress
+                    print(f"Uploading {os.path.basename(video_path)}: {status.progress() * 100:.0f}%")
+                if request.resumable_uri:
+                    state["resumable_uri"] = request.resumable_uri
+                    self._save_state(state_path, state)
+            except HttpError as e:
+                if e.resp.status not in RETRIABLE_STATUS_CODES:
+                    if e.resp.status in (404, 410) and os.path.exists(state_path):
+                        # Upload session expired; start over next time
+                        os.remove(state_path)
+                    raise
+                retries = self._backoff(retries, e)
+            except RETRIABLE_EXCEPTIONS as e:
+                retries = self._backoff(retries, e)
+
+        state.update(video_id=response["id"], progress=os.path.getsize(video_path))
+        self._save_state(state_path, state)
+        video_url = f"https://youtu.be/{response['id']}"
+        print(f"Uploaded to YouTube: {video_url}")
+        return video_url
+
+    def _resume_session(self, request, state: Dict, state_path: str, size: int) -> Optional[Dict]:
+        """
+        Point ``request`` at the saved upload session, continuing after the
+        bytes the server already has.
+
+        Uses the resumable protocol's status query (an empty PUT with
+        ``Content-Range: bytes */<size>``). Returns the video resource if the
+        upload had in fact completed; an expired session starts a new upload.
+        """
+        uri = state["resumable_uri"]
+        resp, content = request.http.request(
+            uri, method="PUT", body=b"",
+            headers={"Content-Length": "0", "Content-Range": f"bytes */{size}"}
+        )
+        if resp.status in (200, 201):
+            return json.loads(content)
+        if resp.status != 308:
+            print(f"Upload session expired (HTTP {resp.status}); starting over")
+            state.pop("resumable_uri", None)
+            state.pop("progress", None)
+            self._save_state(state_path, state)
+            return None
+
+        # 308 Resume Incomplete; "Range: bytes=0-N" means N + 1 bytes were stored
+        received = int(resp["range"].rsplit("-", 1)[1]) + 1 if "range" in resp else 0
+        print(f"Resuming upload of {state['video_path']} at {received:,} bytes")
+        request.resumable_uri = uri
+        request.resumable_progress = received
+        return None
+
+    def _backoff(self, retries: int, error: Exception) -> int:
+        retries += 1
+        if retries > MAX_RETRIES:
+            raise RuntimeError(f"Upload failed after {MAX_RETRIES} retries: {error}")
+        delay = min(64, 2 ** retries) * random.uniform(0.5, 1.0)
+        print(f"Retriable upload error ({error}); retrying in {delay:.1f}s")
+        time.sleep(delay)
+        return retries
+
+    def submit(self, video_path: str, title: str, description: str, tags: List[str],
+               **kwargs) -> Future:
+        """Queue an upload on the worker pool; the future resolves to the video URL"""
+        return self.executor.submit(self.upload, video_path, title, description, tags, **kwargs)
+
+    def pending_uploads(self) -> List[Dict]:
+        """Persisted uploads that have not finished (e.g. after a crash)"""
+        pending = []
+        for name in os.listdir(self.state_dir):
+            if name.endswith(".json"):
+                state = self._load_state(os.path.join(self.state_dir, name))
+                if state.get("video_path") and not state.get("video_id"):
+                    pending.append(state)
+        return pending
+
+    def resume_pending(self) -> List[Future]:
+        """Re-queue every unfinished upload whose file is still on disk"""
+        futures = []
+        for state in self.pending_uploads():
+            if os.path.exists(state["video_path"]):
+                futures.append(self.submit(
+                    state["video_path"], state.get("title", ""), state.get("description", ""),
+                    state.get("tags", []), privacy_status=state.get("privacy_status", "private"),
+                    category_id=state.get("category_id", "22")
+                ))
+        return futures
+
+_upload_worker: Optional[YouTubeUploadWorker] = None
+_upload_worker_lock = threading.Lock()
+
+def get_upload_worker() -> YouTubeUploadWorker:
+    """Return the process-wide upload worker, resuming uploads a previous run left unfinished"""
+    global _upload_worker
+    with _upload_worker_lock:
+        if _upload_worker is None:
+            _upload_worker = YouTubeUploadWorker()
+            resumed = _upload_worker.resume_pending()
+            if resumed:
+                print(f"Resuming {len(resumed)} unfinished YouTube upload(s)")
+        return _upload_worker